@@ -0,0 +1,183 @@
+"""
+Offline benchmark suite for the scraper's hot paths (no network, no browser).
+
+Stages:
+  parse_pages   recorded Nitter pages (benchmarks/fixtures/*.html) through parse_nitter_page
+  csv_read      the data/*.csv corpus through iter_archive_rows
+  clean_text    every corpus text through clean_text
+  parse_date    every corpus date through parse_nitter_date
+  transform     the corpus through transform_tweets_for_csv (row dicts)
+  buffer_fill   the corpus into a TweetBuffer (its peak memory is the columnar footprint)
+  to_columns    the corpus through TweetBuffer.to_columns (the columns the writers consume)
+  csv_write     the transformed corpus through CSVStreamWriter, 20 tweets per page
+
+For each stage the throughput (items/s), wall time and peak traced memory are
+reported and compared with benchmarks/baseline.json.
+
+Usage:
+  python benchmarks/bench_offline.py                  # run and compare with the baseline
+  python benchmarks/bench_offline.py --save-baseline  # run and store the results as the new baseline
+"""
+import argparse
+import contextlib
+import gc
+import io
+import glob
+import json
+import platform
+import tempfile
+import time
+import tracemalloc
+
+from common import FIXTURES_DIR, ROOT, load_scraper
+
+BASELINE_PATH = ROOT / "benchmarks" / "baseline.json"
+PAGE_SIZE = 20
+
+
+def measure(name, func, items):
+    """
+    Runs func() twice and returns the stage result: once plain for the timing, once under
+    tracemalloc for the peak memory (tracing slows allocation-heavy code down several times).
+    """
+    gc.collect()
+    start = time.perf_counter()
+    func()
+    seconds = time.perf_counter() - start
+
+    gc.collect()
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        'stage': name,
+        'items': items,
+        'seconds': seconds,
+        'items_per_s': items / seconds if seconds else float('inf'),
+        'peak_mb': peak / (1024 * 1024),
+    }
+
+
+def load_corpus(scraper, pattern):
+    """
+    Reads the CSV archive into raw tweet dicts (the format the engines produce).
+    """
+    tweets = {}
+    for _, row in scraper.iter_archive_rows(glob.glob(pattern)):
+        tweets.setdefault(row['hashtag'].lstrip('#'), []).append({
+            'username': row.get('username', ''),
+            'date': row.get('post_date_iso', ''),
+            'content': row.get('text', ''),
+            'interactions': int(row.get('total_interactions') or 0),
+            'replies': int(row.get('replies') or 0),
+            'retweets': int(row.get('retweets') or 0),
+            'likes': int(row.get('likes') or 0),
+            'link': row.get('link', ''),
+        })
+    return tweets
+
+
+def run_suite(scraper, corpus_pattern, page_repeat):
+    results = []
+
+    pages = [(path, open(path, 'rb').read()) for path in sorted(glob.glob(str(FIXTURES_DIR / "*.html")))]
+    page_tweets = sum(len(scraper.parse_nitter_page(html, "https://nitter.net/search")[0]) for _, html in pages)
+
+    def parse_pages():
+        for _ in range(page_repeat):
+            for _, html in pages:
+                scraper.parse_nitter_page(html, "https://nitter.net/search")
+
+    results.append(measure("parse_pages", parse_pages, page_tweets * page_repeat))
+
+    corpus = {}
+
+    def csv_read():
+        corpus.update(load_corpus(scraper, corpus_pattern))
+
+    paths = glob.glob(corpus_pattern)
+    row_count = sum(1 for _ in scraper.iter_archive_rows(paths))
+    results.append(measure("csv_read", csv_read, row_count))
+
+    all_tweets = [tweet for tweets in corpus.values() for tweet in tweets]
+    results.append(measure("clean_text", lambda: [scraper.clean_text(t['content']) for t in all_tweets],
+                           len(all_tweets)))
+    results.append(measure("parse_date", lambda: [scraper.parse_nitter_date(t['date']) for t in all_tweets],
+                           len(all_tweets)))
+    results.append(measure("transform", lambda: scraper.transform_tweets_for_csv(corpus), len(all_tweets)))
+    results.append(measure("buffer_fill", lambda: scraper.TweetBuffer.from_tweets(corpus), len(all_tweets)))
+    results.append(measure("to_columns", lambda: scraper.TweetBuffer.from_tweets(corpus).to_columns(),
+                           len(all_tweets)))
+
+    def csv_write():
+        with tempfile.TemporaryDirectory() as output_dir, contextlib.redirect_stdout(io.StringIO()):
+            writer = scraper.CSVStreamWriter(output_dir, "bench")
+            for hashtag, tweets in corpus.items():
+                for start in range(0, len(tweets), PAGE_SIZE):
+                    writer.write_page(hashtag, tweets[start:start + PAGE_SIZE])
+            writer.close()
+
+    results.append(measure("csv_write", csv_write, len(all_tweets)))
+    return results
+
+
+def print_report(results, baseline, tolerance):
+    """
+    Prints the stage table; returns the names of stages slower than the baseline by more than `tolerance`.
+    """
+    baseline_by_stage = {r['stage']: r for r in (baseline or {}).get('results', [])}
+    regressions = []
+    print(f"\n{'stage':<12} {'items':>8} {'seconds':>9} {'items/s':>12} {'peak MB':>9} {'vs baseline':>12}")
+    for r in results:
+        comparison = ""
+        reference = baseline_by_stage.get(r['stage'])
+        if reference:
+            ratio = r['items_per_s'] / reference['items_per_s']
+            comparison = f"{ratio:.2f}x"
+            if ratio < 1.0 - tolerance:
+                comparison += " SLOWER"
+                regressions.append(r['stage'])
+        print(f"{r['stage']:<12} {r['items']:>8} {r['seconds']:>9.3f} {r['items_per_s']:>12.0f} "
+              f"{r['peak_mb']:>9.1f} {comparison:>12}")
+    total = sum(r['seconds'] for r in results)
+    print(f"\nTotal: {total:.2f} s")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--corpus', type=str, default=str(ROOT / "data" / "*.csv"),
+                        help='CSV files pushed through the pipeline (default: data/*.csv)')
+    parser.add_argument('--page-repeat', type=int, default=20,
+                        help='How many times the recorded pages are parsed (default: 20)')
+    parser.add_argument('--baseline', type=str, default=str(BASELINE_PATH), help='Baseline results file')
+    parser.add_argument('--save-baseline', action='store_true', help='Store the results as the new baseline')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='Allowed throughput drop before a stage is reported as a regression (default: 0.25)')
+    args = parser.parse_args()
+
+    scraper = load_scraper()
+    results = run_suite(scraper, args.corpus, args.page_repeat)
+
+    baseline = None
+    try:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+    except FileNotFoundError:
+        pass
+
+    regressions = print_report(results, None if args.save_baseline else baseline, args.tolerance)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump({'python': platform.python_version(), 'machine': platform.machine(),
+                       'results': results}, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+    elif regressions:
+        print(f"Regressions: {', '.join(regressions)}")
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+Benchmark: per-element WebDriver extraction vs. the single execute_script pass.
+
+Loads a recorded Nitter search page into headless Chrome and extracts it with
+both strategies, reporting WebDriver round-trips and wall time per page.
+
+Usage:
+  python benchmarks/bench_selenium_extraction.py [--page FILE] [--repeat 5]
+"""
+import argparse
+import os
+import time
+from pathlib import Path
+
+from selenium.webdriver.common.by import By
+
+from common import FIXTURES_DIR, load_scraper
+
+DEFAULT_PAGE = FIXTURES_DIR / "nitter_search_page.html"
+
+
+def count_round_trips(driver):
+    """
+    Wraps driver.execute (every WebDriver command goes through it) with a counter.
+    """
+    counter = {'commands': 0}
+    original_execute = driver.execute
+
+    def counting_execute(*args, **kwargs):
+        counter['commands'] += 1
+        return original_execute(*args, **kwargs)
+
+    driver.execute = counting_execute
+    return counter
+
+
+def legacy_extract(scraper, driver, tweet_selector):
+    """
+    The per-element extraction loop used before the batched script (kept here as the baseline).
+    """
+    tweets = []
+    for tweet in driver.find_elements(By.CSS_SELECTOR, tweet_selector):
+        try:
+            show_more = tweet.find_element(
+                By.XPATH, ".//a[contains(text(), 'Pokaż więcej') or contains(text(), 'Show more')]"
+            )
+            show_more.is_displayed()
+        except Exception:
+            pass
+
+        content = "No content"
+        for selector in scraper.CONTENT_SELECTORS:
+            try:
+                content = tweet.find_element(By.CSS_SELECTOR, selector).text.strip()
+                if content:
+                    break
+            except Exception:
+                continue
+
+        username = "Unknown"
+        for selector in scraper.USERNAME_SELECTORS:
+            try:
+                username = tweet.find_element(By.CSS_SELECTOR, selector).text.strip().replace('@', '')
+                if username:
+                    break
+            except Exception:
+                continue
+
+        date = "Unknown"
+        for selector in scraper.DATE_SELECTORS:
+            try:
+                elem = tweet.find_element(By.CSS_SELECTOR, selector)
+                date = elem.get_attribute("title") or elem.get_attribute("datetime") or elem.text.strip()
+                if date:
+                    break
+            except Exception:
+                continue
+
+        stats = {}
+        for key, selector in scraper.STAT_SELECTORS.items():
+            try:
+                text = tweet.find_element(By.CSS_SELECTOR, selector + " + span").text
+                stats[key] = int(''.join(c for c in text if c.isdigit()) or 0)
+            except Exception:
+                stats[key] = 0
+
+        link = "None"
+        for selector in scraper.LINK_SELECTORS:
+            try:
+                link = tweet.find_element(By.CSS_SELECTOR, selector).get_attribute("href") or link
+                break
+            except Exception:
+                continue
+
+        if content != "No content" and len(content) > 5:
+            tweets.append({'username': username, 'date': date, 'content': content, 'link': link, **stats})
+
+    next_url = None
+    for selector in scraper.NEXT_PAGE_SELECTORS:
+        elements = driver.find_elements(By.CSS_SELECTOR, selector)
+        if elements:
+            next_url = elements[0].get_attribute("href") if elements[0].is_displayed() else None
+            break
+    return tweets, next_url
+
+
+def run(label, extract, driver, counter, repeat):
+    timings = []
+    commands = 0
+    tweets = []
+    for _ in range(repeat):
+        counter['commands'] = 0
+        start = time.perf_counter()
+        tweets = extract()[0]
+        timings.append(time.perf_counter() - start)
+        commands = counter['commands']
+    mean_ms = sum(timings) / len(timings) * 1000
+    print(f"{label:<12} tweets={len(tweets):<4} round-trips={commands:<5} wall={mean_ms:8.1f} ms/page")
+    return mean_ms, commands
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--page', type=str, default=str(DEFAULT_PAGE), help='Recorded Nitter page to load')
+    parser.add_argument('--repeat', type=int, default=5, help='Extraction passes per strategy (default: 5)')
+    args = parser.parse_args()
+
+    scraper = load_scraper()
+    options = scraper.Options()
+    for argument in ("--headless", "--disable-gpu", "--no-sandbox", "--disable-dev-shm-usage"):
+        options.add_argument(argument)
+    driver = scraper.webdriver.Chrome(options=options)
+    try:
+        driver.get(Path(os.path.abspath(args.page)).as_uri())
+        selector = scraper.TWEET_SELECTORS[0]
+        counter = count_round_trips(driver)
+
+        before_ms, before_cmds = run("per-element", lambda: legacy_extract(scraper, driver, selector),
+                                     driver, counter, args.repeat)
+        after_ms, after_cmds = run("batched", lambda: scraper.extract_tweets_from_page(driver, selector),
+                                   driver, counter, args.repeat)
+
+        print(f"\nRound-trips: {before_cmds} -> {after_cmds}; "
+              f"wall time: {before_ms:.1f} ms -> {after_ms:.1f} ms ({before_ms / max(after_ms, 1e-9):.1f}x)")
+    finally:
+        driver.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,18 @@
+"""
+Helpers shared by the benchmark scripts.
+"""
+import importlib.util
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+FIXTURES_DIR = ROOT / "benchmarks" / "fixtures"
+
+
+def load_scraper():
+    """
+    Imports nitter-scraper.py as a module (its filename is not importable directly).
+    """
+    spec = importlib.util.spec_from_file_location("nitter_scraper", ROOT / "nitter-scraper.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
@@ -0,0 +1,431 @@
+"""
+Local Nitter stand-in for load and fault-injection testing.
+
+Starts one HTTP server per simulated instance on consecutive ports. Every
+instance serves Nitter-style /search pages (.timeline-item markup, "Load more"
+cursor links) and /<user>/status/<id> pages, with configurable latency,
+429/503 rates, truncated "Show more" tweets and dead instances.
+
+Timelines are generated deterministically from the query (honouring the
+since:/until: operators and "#a OR #b" queries, whose tweets carry one or
+more of the hashtags), or built from the recorded tweets of the data/
+archive with --corpus. With --growth, status pages show interaction counts
+that keep growing while the server runs (for --refresh-engagement).
+
+Usage:
+  python benchmarks/fake_nitter_server.py --instances 3 --dead 1 --rate-429 0.05
+  python nitter-scraper.py nawrocki --engine http \\
+      --instances http://127.0.0.1:8081,http://127.0.0.1:8082,http://127.0.0.1:8083
+
+Request counters per instance are served as JSON at /__stats and printed on exit.
+"""
+import argparse
+import base64
+import glob
+import html
+import json
+import math
+import random
+import re
+import threading
+import time
+import zlib
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, quote, urlencode, urlparse
+
+from common import load_scraper
+
+TWITTER_EPOCH_MS = 1288834974657
+SEARCH_OPERATOR_RE = re.compile(r'\b(since|until):(\d{4}-\d{2}-\d{2})\b')
+OR_RE = re.compile(r'\s+OR\s+')
+USERNAMES = ["nexta_tv", "LechMucha", "Simon01978377", "wPolityce_pl", "tvp_info", "RzeczpospolitaTV",
+             "PolsatNewsPL", "kowalski_jan", "anna_nowak", "OSWaw"]
+WORDS = ("wybory prezydent sejm ukraina rosja polska europa debata kampania sondaż głosowanie rząd "
+         "opozycja minister granica gospodarka inflacja armia bezpieczeństwo dyplomacja").split()
+DEAD_MODES = ("refuse", "hang", "error", "empty", "challenge")
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>{title} - Nitter</title>
+</head>
+<body class="fixed-nav">
+<nav><div class="inner-nav"><div class="nav-item"><a class="site-name" href="/">nitter</a></div></div></nav>
+<div class="container">
+{body}
+</div>
+</body>
+</html>
+"""
+
+TWEET_TEMPLATE = (
+    '<div class="timeline-item " data-username="{username}"><a class="tweet-link" href="{link}#m"></a>'
+    '<div class="tweet-body"><div><div class="tweet-header"><div class="tweet-name-row">'
+    '<div class="fullname-and-username"><a class="fullname" href="/{username}" title="{username}">{username}</a>'
+    '<a class="username" href="/{username}" title="@{username}">@{username}</a></div>'
+    '<span class="tweet-date"><a href="{link}#m" title="{date}">{age}</a></span></div></div></div>'
+    '<div class="tweet-content media-body" dir="auto">{content}</div>{show_more}'
+    '<div class="tweet-stats">'
+    '<span class="tweet-stat"><div class="icon-container"><span class="icon-comment" title=""></span> {replies}</div></span>'
+    '<span class="tweet-stat"><div class="icon-container"><span class="icon-retweet" title=""></span> {retweets}</div></span>'
+    '<span class="tweet-stat"><div class="icon-container"><span class="icon-quote" title=""></span> 0</div></span>'
+    '<span class="tweet-stat"><div class="icon-container"><span class="icon-heart" title=""></span> {likes}</div></span>'
+    '</div></div></div>'
+)
+
+RATE_LIMITED_BODY = "<h1>Instance has been rate limited.</h1><p>Use another instance or try again later.</p>"
+CHALLENGE_BODY = "<noscript>Please enable JavaScript to continue.</noscript><div id=\"challenge\"></div>"
+
+
+def encode_cursor(page):
+    return base64.urlsafe_b64encode(f"scroll:{page}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        return int(base64.urlsafe_b64decode(padded).decode().split(":", 1)[1])
+    except (ValueError, IndexError):
+        return None
+
+
+def format_nitter_date(moment):
+    hour = moment.strftime("%I").lstrip("0") or "12"
+    return f"{moment.strftime('%b')} {moment.day}, {moment.year} · {hour}:{moment.strftime('%M %p')} UTC"
+
+
+def parse_search_query(query):
+    """
+    Splits a search query into its search term and the since:/until: days (datetimes or None).
+    """
+    bounds = {}
+    for operator, value in SEARCH_OPERATOR_RE.findall(query):
+        bounds[operator] = datetime.strptime(value, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+    term = SEARCH_OPERATOR_RE.sub("", query).strip()
+    return term, bounds.get("since"), bounds.get("until")
+
+
+class Timelines:
+    """
+    Produces the tweets of a search query. Tweet i of a query always has the same
+    content, so every instance serves the same timeline (like real Nitter mirrors).
+    Tweet i was posted `minutes_per_tweet * i` minutes ago and its status ID is a
+    snowflake of that time, so since:/until: windows select a contiguous range of it.
+    """
+
+    def __init__(self, pages=10, per_page=20, corpus=None, seed=0, minutes_per_tweet=3.0, growth=0.0):
+        self.pages = pages
+        self.growth = growth
+        self.started = time.monotonic()
+        self.per_page = per_page
+        self.seed = seed
+        self.minutes_per_tweet = minutes_per_tweet
+        self.corpus = corpus or {}
+        self.now = datetime.now(timezone.utc).replace(second=0, microsecond=0)
+        self._issued = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_archive(cls, pattern, **kwargs):
+        scraper = load_scraper()
+        corpus = {}
+        seen = set()
+        for _, row in scraper.iter_archive_rows(sorted(glob.glob(pattern))):
+            if row.get('link') in seen:
+                continue
+            seen.add(row.get('link'))
+            corpus.setdefault(row['hashtag'].lstrip('#').lower(), []).append(row)
+        print(f"Loaded {len(seen)} recorded tweets for {len(corpus)} hashtags.")
+        return cls(corpus=corpus, **kwargs)
+
+    def posted_at(self, index):
+        return self.now - timedelta(minutes=self.minutes_per_tweet * index)
+
+    def tweet(self, term, index):
+        tags = [tag.strip().lstrip('#').lower() for tag in OR_RE.split(term)]
+        key = " OR ".join(tags)
+        rows = ([row for tag in tags for row in self.corpus.get(tag, [])]
+                or [row for rows in self.corpus.values() for row in rows])
+        rng = random.Random(zlib.crc32(f"{self.seed}:{key}:{index}".encode()))
+        # An OR query matches tweets with any of its hashtags; each tweet carries one or more of them
+        tweet_tags = [tag for tag in tags if rng.random() < 0.5] or [rng.choice(tags)]
+        posted_at = self.posted_at(index)
+        timestamp_ms = int(posted_at.timestamp() * 1000) - TWITTER_EPOCH_MS
+        status_id = (timestamp_ms << 22) | (zlib.crc32(key.encode()) & 0x3FFFFF)
+        if rows:
+            row = rows[index % len(rows)]
+            username = row.get('username') or rng.choice(USERNAMES)
+            content = row.get('text') or ""
+            missing = [tag for tag in tweet_tags if f"#{tag}" not in content.lower()]
+            if len(tags) > 1 and missing:
+                content = " ".join(f"#{tag}" for tag in missing) + " " + content
+            stats = [int(row.get(name) or 0) for name in ('replies', 'retweets', 'likes')]
+        else:
+            username = rng.choice(USERNAMES)
+            content = (" ".join(f"#{tag}" for tag in tweet_tags) + " "
+                       + " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 60))))
+            stats = [rng.randint(0, 50), rng.randint(0, 200), rng.randint(0, 1000)]
+        return {
+            'id': status_id,
+            'username': username,
+            'content': content,
+            'date': posted_at,
+            'replies': stats[0], 'retweets': stats[1], 'likes': stats[2],
+        }
+
+    def page(self, query, page):
+        """
+        Returns (tweets, has_more) for page `page` of a search query.
+        """
+        term, since, until = parse_search_query(query)
+        step = timedelta(minutes=self.minutes_per_tweet)
+        first, end = 0, self.pages * self.per_page
+        if until is not None:
+            first = max(first, math.floor((self.now - until) / step) + 1)
+        if since is not None:
+            end = min(end, math.floor((self.now - since) / step) + 1)
+        start = first + page * self.per_page
+        indexes = range(start, min(start + self.per_page, end))
+        tweets = [self.tweet(term, i) for i in indexes]
+        with self._lock:
+            self._issued.update((tweet['id'], (term, i)) for i, tweet in zip(indexes, tweets))
+        return tweets, start + self.per_page < end
+
+    def find(self, status_id):
+        """
+        Returns a tweet that was served on a search page, or None.
+        """
+        with self._lock:
+            issued = self._issued.get(status_id)
+        return self.tweet(*issued) if issued else None
+
+    def grown(self, tweet):
+        """
+        The tweet with the interactions gained since the server started (--growth per
+        minute on average); some tweets gain nothing, others up to twice the average.
+        """
+        if not self.growth:
+            return tweet
+        minutes = (time.monotonic() - self.started) / 60.0
+        gained = int(self.growth * (tweet['id'] % 7) / 3.0 * minutes)
+        return dict(tweet, likes=tweet['likes'] + gained, retweets=tweet['retweets'] + gained // 4,
+                    replies=tweet['replies'] + gained // 10)
+
+
+class FakeInstance:
+    """
+    Fault settings and request counters of one simulated instance.
+    """
+
+    def __init__(self, name, timelines, latency_ms=0.0, jitter_ms=0.0, rate_429=0.0, rate_503=0.0,
+                 truncate_rate=0.0, dead_mode=None, hang_seconds=30.0, seed=0):
+        self.name = name
+        self.timelines = timelines
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.rate_429 = rate_429
+        self.rate_503 = rate_503
+        self.truncate_rate = truncate_rate
+        self.dead_mode = dead_mode
+        self.hang_seconds = hang_seconds
+        self.counters = Counter()
+        self._random = random.Random(f"{seed}:{name}")
+        self._lock = threading.Lock()
+
+    def roll(self):
+        with self._lock:
+            return self._random.random()
+
+    def count(self, key):
+        with self._lock:
+            self.counters[key] += 1
+
+
+class FakeNitterHandler(BaseHTTPRequestHandler):
+    server_version = "nitter"
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_page(self, status, title, body, headers=None):
+        payload = PAGE_TEMPLATE.format(title=html.escape(title), body=body).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+        self.server.instance.count(status)
+
+    def do_GET(self):
+        instance = self.server.instance
+        parsed = urlparse(self.path)
+
+        if parsed.path == "/__stats":
+            payload = json.dumps({str(k): v for k, v in instance.counters.items()}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+            return
+
+        instance.count("requests")
+        delay = instance.latency_ms + instance.roll() * instance.jitter_ms
+        if delay:
+            time.sleep(delay / 1000.0)
+
+        if instance.dead_mode == "hang":
+            time.sleep(instance.hang_seconds)
+            self.close_connection = True
+            return
+        if instance.dead_mode == "error":
+            return self.send_page(502, "Bad Gateway", "<h1>502 Bad Gateway</h1>")
+        if instance.dead_mode == "challenge":
+            return self.send_page(200, "Verifying your browser", CHALLENGE_BODY)
+
+        roll = instance.roll()
+        if roll < instance.rate_429:
+            return self.send_page(429, "Error", RATE_LIMITED_BODY, {"Retry-After": "30"})
+        if roll < instance.rate_429 + instance.rate_503:
+            return self.send_page(503, "Error", "<h1>503 Service Unavailable</h1>")
+
+        if parsed.path == "/":
+            return self.send_page(200, "nitter", '<div class="panel-container"><form action="/search"></form></div>')
+        if parsed.path == "/search":
+            return self.search(parse_qs(parsed.query))
+        parts = parsed.path.strip("/").split("/")
+        if len(parts) == 3 and parts[1] == "status" and parts[2].isdigit():
+            return self.status(int(parts[2]))
+        self.send_page(404, "Error", "<div class=\"error-panel\"><span>Page not found</span></div>")
+
+    def search(self, params):
+        instance = self.server.instance
+        query = params.get("q", [""])[0]
+        cursor = params.get("cursor", [None])[0]
+        page = decode_cursor(cursor) if cursor else 0
+        if page is None:
+            return self.send_page(400, "Error", "<div class=\"error-panel\"><span>Invalid cursor</span></div>")
+
+        tweets, has_more = ([], False) if instance.dead_mode == "empty" else instance.timelines.page(query, page)
+        newest = urlencode({"f": "tweets", "q": query})
+        items = [f'<div class="timeline-item show-more"><a href="?{html.escape(newest)}">Load newest</a></div>']
+        for tweet in tweets:
+            items.append(self.render_tweet(tweet, truncate=instance.roll() < instance.truncate_rate))
+        if not tweets:
+            items.append('<div class="timeline-none">No items found</div>')
+        elif has_more:
+            more = urlencode({"f": "tweets", "q": query, "cursor": encode_cursor(page + 1)})
+            items.append(f'<div class="show-more"><a href="?{html.escape(more)}">Load more</a></div>')
+        body = '<div class="timeline-container"><div class="timeline">\n' + "\n".join(items) + '\n</div></div>'
+        with instance._lock:
+            instance.counters["tweets_served"] += len(tweets)
+        self.send_page(200, f"{query} - Nitter search", body)
+
+    def status(self, status_id):
+        tweet = self.server.instance.timelines.find(status_id)
+        if tweet is None:
+            return self.send_page(404, "Error", "<div class=\"error-panel\"><span>Tweet not found</span></div>")
+        tweet = self.server.instance.timelines.grown(tweet)
+        body = ('<div class="conversation"><div class="main-thread"><div class="main-tweet">'
+                + self.render_tweet(tweet) + '</div></div></div>')
+        self.send_page(200, f"{tweet['username']} on Nitter", body)
+
+    @staticmethod
+    def render_tweet(tweet, truncate=False):
+        link = f"/{quote(tweet['username'])}/status/{tweet['id']}"
+        content = tweet['content']
+        show_more = ""
+        if truncate and len(content) > 80:
+            content = content[:80].rsplit(" ", 1)[0] + "…"
+            show_more = f'<a class="show-more-link" href="{link}#m">Show more</a>'
+        age = tweet['date']
+        return TWEET_TEMPLATE.format(
+            username=html.escape(tweet['username']), link=link, date=format_nitter_date(age),
+            age=age.strftime("%b %d"), content=html.escape(content).replace("\n", "<br>"),
+            show_more=show_more, replies=tweet['replies'], retweets=tweet['retweets'], likes=tweet['likes'],
+        )
+
+
+def start_instances(args, timelines):
+    """
+    Starts the instance servers in background threads. Returns [(url, FakeInstance, server or None)].
+    """
+    started = []
+    for i in range(args.instances):
+        port = args.port + i
+        url = f"http://{args.host}:{port}"
+        dead = i >= args.instances - args.dead
+        instance = FakeInstance(
+            url, timelines, latency_ms=args.latency, jitter_ms=args.jitter, rate_429=args.rate_429,
+            rate_503=args.rate_503, truncate_rate=args.truncate_rate,
+            dead_mode=args.dead_mode if dead else None, hang_seconds=args.hang_seconds, seed=args.seed,
+        )
+        server = None
+        if not (dead and args.dead_mode == "refuse"):
+            server = ThreadingHTTPServer((args.host, port), FakeNitterHandler)
+            server.daemon_threads = True
+            server.instance = instance
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+        started.append((url, instance, server))
+        print(f"  {url}  {'dead (' + args.dead_mode + ')' if dead else 'alive'}")
+    return started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', type=str, default="127.0.0.1", help='Interface to bind (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8081, help='Port of the first instance (default: 8081)')
+    parser.add_argument('--instances', type=int, default=3, help='Number of simulated instances (default: 3)')
+    parser.add_argument('--pages', type=int, default=10, help='Pages per search timeline (default: 10)')
+    parser.add_argument('--minutes-per-tweet', type=float, default=3.0,
+                        help='Time between consecutive tweets of a timeline (default: 3)')
+    parser.add_argument('--per-page', type=int, default=20, help='Tweets per page (default: 20)')
+    parser.add_argument('--corpus', type=str, default=None,
+                        help='Serve recorded tweets from these CSV files (e.g. "data/*.csv") instead of generated ones')
+    parser.add_argument('--latency', type=float, default=0.0, help='Base response latency in ms (default: 0)')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Random extra latency in ms (default: 0)')
+    parser.add_argument('--rate-429', type=float, default=0.0,
+                        help='Fraction of requests answered with 429 Too Many Requests (default: 0)')
+    parser.add_argument('--rate-503', type=float, default=0.0,
+                        help='Fraction of requests answered with 503 Service Unavailable (default: 0)')
+    parser.add_argument('--truncate-rate', type=float, default=0.0,
+                        help='Fraction of long tweets truncated behind a "Show more" link (default: 0)')
+    parser.add_argument('--dead', type=int, default=0, help='How many of the instances (the last ones) are dead')
+    parser.add_argument('--dead-mode', choices=DEAD_MODES, default="refuse",
+                        help='How dead instances behave: refuse connections, hang, answer 502, return empty '
+                             'timelines or a JavaScript challenge page (default: refuse)')
+    parser.add_argument('--hang-seconds', type=float, default=30.0,
+                        help='How long hanging instances stall each request (default: 30)')
+    parser.add_argument('--growth', type=float, default=0.0,
+                        help='Average interactions per minute that tweets gain on their status pages (default: 0)')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed for content and fault injection')
+    args = parser.parse_args()
+
+    options = dict(pages=args.pages, per_page=args.per_page, seed=args.seed, minutes_per_tweet=args.minutes_per_tweet,
+                   growth=args.growth)
+    timelines = Timelines.from_archive(args.corpus, **options) if args.corpus else Timelines(**options)
+    print(f"Starting {args.instances} fake Nitter instances:")
+    started = start_instances(args, timelines)
+    print(f"\nScrape them with: --instances {','.join(url for url, _, _ in started)}")
+    print("Press Ctrl+C to stop.")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    print("\nRequests per instance:")
+    for url, instance, server in started:
+        counters = ", ".join(f"{key}={value}" for key, value in sorted(instance.counters.items(), key=str))
+        print(f"  {url}: {counters or 'none'}")
+        if server is not None:
+            server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
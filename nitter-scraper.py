@@ -1,22 +1,70 @@
+import bisect
 import csv
-from datetime import datetime, timedelta
+from array import array
+from datetime import date, datetime, timedelta
 import time
 import random
 import argparse
 import sys
 import os
+import glob
+import gzip
+import hashlib
+import io
 import re
+import socket
+import json
+import queue
+import sqlite3
+import threading
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, as_completed, wait
+from contextlib import contextmanager
+from functools import lru_cache
 import unicodedata
+from urllib.parse import parse_qs, parse_qsl, quote, urlencode, urljoin, urlparse, urlunparse
 import requests
+from requests.adapters import HTTPAdapter
+from bs4 import BeautifulSoup
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+try:
+    import lxml  # noqa: F401 - optional, much faster than the built-in parser
+    HTML_PARSER = "lxml"
+except ImportError:
+    HTML_PARSER = "html.parser"
+
+USER_AGENT = "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/126.0.0.0 Safari/537.36"
+
+# --- SELECTORS (shared by the Selenium and HTTP engines) ---
+TWEET_SELECTORS = [".timeline-item", ".tweet", "article.tweet", ".post", ".timeline-tweet"]
+CONTENT_SELECTORS = [".tweet-content", ".content", ".tweet-text", "p.tweet-content",
+                     ".timeline-item-content", ".post-content"]
+USERNAME_SELECTORS = [".username", "a[href^='/']", ".tweet-name", ".tweet-header a"]
+DATE_SELECTORS = [".tweet-date a", "a[title*='20']", ".timestamp", "time", "time[datetime]"]
+STAT_SELECTORS = {
+    'replies': ".tweet-stats .icon-comment",
+    'retweets': ".tweet-stats .icon-retweet",
+    'likes': ".tweet-stats .icon-heart",
+}
+LINK_SELECTORS = ["a[href*='/status/']"]
+NEXT_PAGE_SELECTORS = [".show-more a", "a.more-results", "a[href*='cursor']"]
+SHOW_MORE_LABELS = ["Show more", "Pokaż więcej"]
+STATUS_CONTENT_SELECTORS = [".main-tweet .tweet-content", ".main-tweet .content"] + CONTENT_SELECTORS
+NO_RESULTS_SELECTORS = [".timeline-none", ".timeline-end"]
+ERROR_SELECTORS = [".error-panel", "body.neterror", "#main-frame-error"]
+RATE_LIMIT_MARKERS = ["rate limited", "too many requests"]
 
 # --- CRITICAL: Dynamic Nitter Instance Fetching ---
-def get_nitter_instances(url="[https://github.com/zedeus/nitter/wiki/Instances](https://github.com/zedeus/nitter/wiki/Instances)"):
+FALLBACK_INSTANCES = [
+    "nitter.net", "nitter.cz", "nitter.unixfox.eu", "nitter.moomoo.me", 
+    "nitter.privacydev.net", "nitter.poast.org", "nitter.projectsegfau.lt"
+]
+
+def get_nitter_instances(url="https://github.com/zedeus/nitter/wiki/Instances"):
     """
     Fetches the current list of Nitter instances from the GitHub page.
     Uses simple heuristics to parse the markdown/HTML content.
@@ -48,10 +96,7 @@ def get_nitter_instances(url="[https://github.com/zedeus/nitter/wiki/Instances](
         if not domains:
             print("Warning: Failed to dynamically fetch the instance list.")
             # Fallback static list
-            return [
-                "nitter.net", "nitter.cz", "nitter.unixfox.eu", "nitter.moomoo.me", 
-                "nitter.privacydev.net", "nitter.poast.org", "nitter.projectsegfau.lt"
-            ]
+            return list(FALLBACK_INSTANCES)
         
         sorted_domains = sorted(list(domains))
         print(f"Fetched {len(sorted_domains)} unique instances.")
@@ -59,11 +104,233 @@ def get_nitter_instances(url="[https://github.com/zedeus/nitter/wiki/Instances](
 
     except requests.exceptions.RequestException as e:
         print(f"Error while fetching instances, using static list. Error: {e}")
-        return [
-            "nitter.net", "nitter.cz", "nitter.unixfox.eu", "nitter.moomoo.me", 
-            "nitter.privacydev.net", "nitter.poast.org", "nitter.projectsegfau.lt"
-        ]
+        return list(FALLBACK_INSTANCES)
+
+def instance_base_url(instance):
+    """
+    Returns the base URL of an instance entry. Entries are bare hostnames
+    (served over https) or full URLs such as http://127.0.0.1:8081 for local instances.
+    """
+    return instance.rstrip('/') if "://" in instance else f"https://{instance}"
+
+def instance_from_url(url):
+    """
+    Inverse of instance_base_url: the instance entry a page URL belongs to.
+    """
+    parsed = urlparse(url)
+    if not parsed.netloc:
+        return url
+    return parsed.netloc if parsed.scheme == "https" else f"{parsed.scheme}://{parsed.netloc}"
+
+def search_query(hashtag, since=None, until=None):
+    """
+    Search query for a hashtag, or for a list of hashtags combined with OR, optionally
+    limited to the days [since, until) with the since:/until: search operators.
+    """
+    hashtags = [hashtag] if isinstance(hashtag, str) else hashtag
+    query = " OR ".join(f"#{tag}" for tag in hashtags)
+    if since is not None:
+        query += f" since:{since.isoformat()}"
+    if until is not None:
+        query += f" until:{until.isoformat()}"
+    return query
+
+def build_search_url(instance, hashtag, since=None, until=None):
+    """
+    Search URL for a hashtag (or a list of hashtags, see search_query) on an instance.
+    """
+    query = search_query(hashtag, since, until)
+    return f"{instance_base_url(instance)}/search?" + urlencode({"f": "tweets", "q": query})
+
+def cursor_matches_query(cursor_url, hashtag, since=None, until=None):
+    """
+    Whether a saved "Load more" URL continues the search for hashtag (or list of hashtags).
+    """
+    return parse_qs(urlparse(cursor_url).query).get("q") == [search_query(hashtag, since, until)]
+
+def parse_instance_list(value):
+    """
+    Reads the --instances value: a comma-separated list or a file with one instance per line.
+    """
+    if os.path.isfile(value):
+        with open(value, encoding='utf-8') as f:
+            entries = [line.split('#', 1)[0] for line in f]
+    else:
+        entries = value.split(',')
+    return [entry.strip().rstrip('/') for entry in entries if entry.strip()]
+
+
+# --- INSTANCE REGISTRY (cached, health-ranked) ---
+
+class InstanceRegistry:
+    """
+    Persistent, health-ranked list of Nitter instances.
+
+    The candidate list from the wiki is cached on disk for `ttl` seconds and all
+    candidates are probed concurrently when it is refreshed. Every probe and
+    scrape attempt updates the instance's latency and success rate; instances
+    that keep failing are put on a cooldown (circuit breaker) and skipped.
+    With `candidates`, that fixed list replaces the wiki list (e.g. local test instances).
+    """
+    FAILURE_THRESHOLD = 3
+    BASE_COOLDOWN = 300.0
+    MAX_COOLDOWN = 6 * 3600.0
+    MIN_PAGE_TIMEOUT = 4.0
+    MAX_PAGE_TIMEOUT = 15.0
+
+    def __init__(self, path=None, ttl=6 * 3600.0, probe_timeout=5.0, candidates=None):
+        self.path = path
+        self.ttl = ttl
+        self.probe_timeout = probe_timeout
+        self.candidates = candidates
+        self.fetched_at = 0.0
+        self.instances = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                data = json.load(f)
+            self.fetched_at = data.get("fetched_at", 0.0)
+            self.instances = data.get("instances", {})
+        except (OSError, ValueError) as e:
+            print(f"Warning: Ignoring unreadable instance registry {self.path}: {e}")
 
+    def save(self):
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with self._lock:
+            data = {"fetched_at": self.fetched_at, "instances": self.instances}
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.path)
+
+    def _stats(self, instance):
+        return self.instances.setdefault(instance, {
+            "successes": 0, "failures": 0, "consecutive_failures": 0,
+            "latency_ms": None, "last_failure": None, "last_error": "", "cooldown_until": 0.0,
+            "page_rate": None,
+        })
+
+    def refresh(self, force=False, probe=True):
+        """
+        Re-fetches and re-probes the candidate list if it is older than the TTL.
+        Meant to be called once per run. probe=False only loads the list (e.g. for a replay).
+        """
+        if not force and self.instances and time.time() - self.fetched_at < self.ttl:
+            print(f"Using cached instance registry ({len(self.instances)} instances).")
+            return
+        for instance in self.candidates or get_nitter_instances():
+            with self._lock:
+                self._stats(instance)
+        self.fetched_at = time.time()
+        if probe:
+            self.probe_all()
+        self.save()
+
+    def probe_all(self):
+        """
+        Probes every known instance concurrently with a cheap GET of the front page.
+        """
+        instances = list(self.instances)
+        print(f"Probing {len(instances)} instances...")
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            results = list(executor.map(self._probe, instances))
+        alive = sum(1 for ok in results if ok)
+        print(f"{alive}/{len(instances)} instances responded.")
+
+    def _probe(self, instance):
+        start = time.monotonic()
+        try:
+            response = get_http_session().get(f"{instance_base_url(instance)}/", timeout=self.probe_timeout, stream=True)
+            response.close()
+            if response.status_code >= 400:
+                raise requests.exceptions.HTTPError(f"HTTP {response.status_code}")
+        except requests.exceptions.RequestException as e:
+            self.record_failure(instance, str(e))
+            return False
+        self.record_success(instance, (time.monotonic() - start) * 1000)
+        return True
+
+    def record_success(self, instance, latency_ms=None):
+        with self._lock:
+            stats = self._stats(instance)
+            stats["successes"] += 1
+            stats["consecutive_failures"] = 0
+            stats["cooldown_until"] = 0.0
+            if latency_ms is not None:
+                previous = stats["latency_ms"]
+                stats["latency_ms"] = latency_ms if previous is None else 0.7 * previous + 0.3 * latency_ms
+
+    def record_failure(self, instance, error="", rate_limited=False):
+        """
+        Counts a failed attempt. Rate-limited instances go on cooldown right away,
+        others only after FAILURE_THRESHOLD consecutive failures.
+        """
+        with self._lock:
+            stats = self._stats(instance)
+            stats["failures"] += 1
+            stats["consecutive_failures"] += 1
+            stats["last_failure"] = time.time()
+            stats["last_error"] = error[:200]
+            excess = stats["consecutive_failures"] - self.FAILURE_THRESHOLD
+            if excess >= 0 or rate_limited:
+                cooldown = min(self.BASE_COOLDOWN * (2 ** max(0, excess)), self.MAX_COOLDOWN)
+                stats["cooldown_until"] = time.time() + cooldown
+
+    def page_rate(self, instance):
+        """
+        The page rate (pages per second) learned for the instance by the adaptive rate controller, or None.
+        """
+        with self._lock:
+            return self.instances.get(instance, {}).get("page_rate")
+
+    def record_page_rate(self, instance, rate):
+        with self._lock:
+            self._stats(instance)["page_rate"] = rate
+
+    def page_timeout(self, instance):
+        """
+        How long to wait for a page of this instance: a few times its observed
+        latency, between MIN_PAGE_TIMEOUT and MAX_PAGE_TIMEOUT seconds.
+        """
+        with self._lock:
+            latency_ms = self.instances.get(instance, {}).get("latency_ms")
+        if latency_ms is None:
+            return self.MAX_PAGE_TIMEOUT
+        return min(self.MAX_PAGE_TIMEOUT, max(self.MIN_PAGE_TIMEOUT, 4 * latency_ms / 1000.0 + 2.0))
+
+    def score(self, instance):
+        stats = self.instances[instance]
+        success_rate = (stats["successes"] + 1) / (stats["successes"] + stats["failures"] + 2)
+        latency_s = (stats["latency_ms"] or 2000.0) / 1000.0
+        return success_rate / (1.0 + latency_s)
+
+    def ranked(self):
+        """
+        Returns instances ordered by score, skipping those on cooldown
+        (unless every instance is on cooldown).
+        """
+        with self._lock:
+            now = time.time()
+            ordered = sorted(self.instances, key=self.score, reverse=True)
+            available = [i for i in ordered if self.instances[i]["cooldown_until"] <= now]
+        return available or ordered
+
+
+def parse_day(value):
+    """
+    argparse type for YYYY-MM-DD dates.
+    """
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid date '{value}', expected YYYY-MM-DD")
 
 def parse_arguments():
     """
@@ -80,7 +347,7 @@ Usage Examples:
     
     parser.add_argument(
         'hashtags',
-        nargs='+',
+        nargs='*',
         help='List of hashtags to search for (without the # sign)'
     )
     
@@ -110,7 +377,7 @@ Usage Examples:
         '--delay',
         type=float,
         default=5.0,
-        help='Delay in seconds between hashtags (default: 5.0)'
+        help='Delay in seconds between hashtags with --fixed-delays (default: 5.0)'
     )
     
     parser.add_argument(
@@ -120,28 +387,385 @@ Usage Examples:
         help='Number of sample tweets to display (default: 3)'
     )
     
+    parser.add_argument(
+        '--profile',
+        action='store_true',
+        help='Log per-phase timings to <state-dir>/metrics/events.jsonl and print a profile summary at the end'
+    )
+    
+    parser.add_argument(
+        '--metrics-file',
+        type=str,
+        default=None,
+        help='Write a Prometheus text-format snapshot of the run metrics to this file '
+             '(default with --profile: <state-dir>/metrics/metrics.prom)'
+    )
+    
     parser.add_argument(
         '--page-delay',
         type=float,
         default=3.0,
-        help='Delay between pages in seconds (default: 3.0)'
+        help='Delay between pages in seconds; with adaptive pacing the starting rate of an instance '
+             'with no learned rate yet (default: 3.0)'
+    )
+    
+    parser.add_argument(
+        '--fixed-delays',
+        action='store_true',
+        help='Sleep a random --delay/--page-delay between hashtags and pages instead of adapting '
+             'the page rate of every instance to its rate limiting'
+    )
+    
+    parser.add_argument(
+        '--engine',
+        choices=['selenium', 'http'],
+        default='selenium',
+        help='Page fetching engine: headless Chrome or plain HTTP with Selenium fallback (default: selenium)'
+    )
+    
+    parser.add_argument(
+        '--concurrency',
+        type=int,
+        default=1,
+        help='Number of hashtags scraped in parallel; pages are then paced per instance (default: 1)'
+    )
+    
+    parser.add_argument(
+        '--browser-pool-size',
+        type=int,
+        default=None,
+        help='Number of long-lived browsers shared by the whole run (default: same as --concurrency)'
+    )
+    
+    parser.add_argument(
+        '--driver-max-pages',
+        type=int,
+        default=50,
+        help='Restart a browser after it has loaded this many pages (default: 50)'
+    )
+    
+    parser.add_argument(
+        '--since',
+        type=parse_day,
+        default=None,
+        help='Only search tweets from this day on (YYYY-MM-DD, since: operator); paging stops at the first '
+             'page older than this day'
+    )
+    
+    parser.add_argument(
+        '--until',
+        type=parse_day,
+        default=None,
+        help='Only search tweets before this day (YYYY-MM-DD, until: operator, exclusive); newer tweets are dropped'
+    )
+    
+    parser.add_argument(
+        '--shard-days',
+        type=int,
+        default=None,
+        help='Split each hashtag into date windows of about this many days (adapted to the tweet density) '
+             'and scrape them in parallel on different instances. Requires --since'
+    )
+    
+    parser.add_argument(
+        '--batch-hashtags',
+        type=int,
+        default=None,
+        metavar='N',
+        help='Search up to N hashtags with one OR query and assign each tweet to the hashtags in its text; '
+             '--max-tweets still applies per hashtag'
+    )
+    
+    parser.add_argument(
+        '--hydration-workers',
+        type=int,
+        default=4,
+        help='Parallel /status/ page fetches for the full text of truncated tweets; 0 disables (default: 4)'
+    )
+    
+    parser.add_argument(
+        '--lean-browser',
+        action='store_true',
+        help='Block images, media and fonts in Chrome and skip waiting for them to load'
+    )
+    
+    parser.add_argument(
+        '--state-dir',
+        type=str,
+        default='.nitter_state',
+        help='Directory for state kept between runs, e.g. the instance registry (default: .nitter_state)'
+    )
+    
+    parser.add_argument(
+        '--instance-ttl',
+        type=float,
+        default=6.0,
+        help='Hours before the cached instance list is re-fetched and re-probed (default: 6)'
+    )
+    
+    parser.add_argument(
+        '--refresh-instances',
+        action='store_true',
+        help='Re-fetch and re-probe the instance list even if the cache is fresh'
+    )
+    
+    parser.add_argument(
+        '--instances',
+        type=str,
+        default=None,
+        help='Comma-separated instances (or a file with one per line) to use instead of the public list, '
+             'e.g. http://127.0.0.1:8081,http://127.0.0.1:8082. These are not cached in the registry'
+    )
+    
+    parser.add_argument(
+        '--page-cache',
+        action='store_true',
+        help='Keep fetched pages gzip-compressed in <state-dir>/page_cache.sqlite and reuse fresh copies '
+             'instead of fetching them again'
+    )
+    
+    parser.add_argument(
+        '--cache-ttl',
+        type=float,
+        default=24.0,
+        help='Hours before a cached page is fetched again (default: 24)'
+    )
+    
+    parser.add_argument(
+        '--cache-size',
+        type=int,
+        default=500,
+        help='Maximum size of the page cache in MB; least recently used pages are evicted (default: 500)'
+    )
+    
+    parser.add_argument(
+        '--replay',
+        action='store_true',
+        help='Serve every page from the page cache without any network access, e.g. to re-run '
+             'extraction over a past run (implies --page-cache)'
+    )
+    
+    parser.add_argument(
+        '--replay-workers',
+        type=int,
+        default=None,
+        help='Processes parsing cached pages ahead during --replay (default: all cores)'
     )
     
-    return parser.parse_args()
+    parser.add_argument(
+        '--incremental',
+        action='store_true',
+        help='Track collected status IDs per hashtag and stop paging at tweets fetched by earlier runs'
+    )
+    
+    parser.add_argument(
+        '--only-new',
+        action='store_true',
+        help='Write only tweets not collected by earlier runs (implies --incremental)'
+    )
+    
+    parser.add_argument(
+        '--output-format',
+        choices=sorted(OUTPUT_WRITERS),
+        default='csv',
+        help='Output file format; parquet requires pyarrow (default: csv)'
+    )
+    
+    parser.add_argument(
+        '--compact-archive',
+        type=str,
+        metavar='DEST',
+        help='Merge the CSV archive (--archive-glob) into a Parquet dataset in DEST, partitioned by hashtag, and exit'
+    )
+    
+    parser.add_argument(
+        '--reprocess',
+        type=str,
+        metavar='DEST',
+        help='Normalize the CSV archive (--archive-glob): clean the text, recompute the features and '
+             'convert dates to ISO on all cores, write the files to DEST and exit'
+    )
+    
+    parser.add_argument(
+        '--reprocess-workers',
+        type=int,
+        default=None,
+        help='Processes used by --reprocess (default: all cores)'
+    )
+    
+    parser.add_argument(
+        '--index-archive',
+        type=str,
+        metavar='DB',
+        help='Load the CSV archive (--archive-glob) into the SQLite tweet store DB and exit'
+    )
+    
+    parser.add_argument(
+        '--query-store',
+        type=str,
+        metavar='DB',
+        help='Search the SQLite tweet store DB (with --match, --user, --tag, --since, --until) and exit'
+    )
+    
+    parser.add_argument(
+        '--match',
+        type=str,
+        default=None,
+        help='Full-text query for --query-store, e.g. \'"drugiej turze"\' or \'wybor*\''
+    )
+    
+    parser.add_argument(
+        '--user',
+        type=str,
+        default=None,
+        help='Username filter for --query-store'
+    )
+    
+    parser.add_argument(
+        '--tag',
+        type=str,
+        default=None,
+        help='Hashtag filter for --query-store'
+    )
+    
+    parser.add_argument(
+        '--limit',
+        type=int,
+        default=20,
+        help='Maximum number of tweets shown by --query-store (default: 20)'
+    )
+    
+    parser.add_argument(
+        '--refresh-engagement',
+        type=str,
+        metavar='DB',
+        help='Re-fetch the likes/retweets/replies of already-collected tweets (from the tweet store DB, '
+             'or else from --archive-glob) and record them as a time series in DB, then exit'
+    )
+    
+    parser.add_argument(
+        '--refresh-budget',
+        type=int,
+        default=500,
+        help='Maximum number of status pages fetched by --refresh-engagement, the tweets with the '
+             'fastest-changing counts first (default: 500)'
+    )
+    
+    parser.add_argument(
+        '--refresh-workers',
+        type=int,
+        default=8,
+        help='Concurrent status page requests of --refresh-engagement (default: 8)'
+    )
+    
+    parser.add_argument(
+        '--archive-glob',
+        type=str,
+        default='data/*.csv',
+        help='CSV files used by --compact-archive, --reprocess, --index-archive and --refresh-engagement '
+             '(default: data/*.csv)'
+    )
+    
+    parser.add_argument(
+        '--queue',
+        type=str,
+        default=None,
+        help='SQLite job queue shared by distributed workers, e.g. on a shared disk '
+             '(default: <state-dir>/jobs.sqlite)'
+    )
+    
+    parser.add_argument(
+        '--enqueue',
+        action='store_true',
+        help='Coordinator: add the hashtags as jobs to --queue (one per --shard-days window '
+             'with --since) and exit'
+    )
+    
+    parser.add_argument(
+        '--worker',
+        action='store_true',
+        help='Worker: lease jobs from --queue and scrape them until no pending jobs are left'
+    )
+    
+    parser.add_argument(
+        '--lease-seconds',
+        type=float,
+        default=300.0,
+        help='How long a leased job stays reserved without a heartbeat before it is re-queued (default: 300)'
+    )
+    
+    parser.add_argument(
+        '--queue-status',
+        action='store_true',
+        help='Print the number of pending, leased, done and failed jobs in --queue and exit'
+    )
+    
+    parser.add_argument(
+        '--resume',
+        nargs='?',
+        const='latest',
+        default=None,
+        metavar='CHECKPOINT',
+        help='Continue an interrupted run from its checkpoint (default: the latest one in --state-dir)'
+    )
+    
+    args = parser.parse_args()
+    if args.shard_days and args.since is None:
+        parser.error("--shard-days requires --since")
+    if args.batch_hashtags and args.shard_days:
+        parser.error("--batch-hashtags cannot be combined with --shard-days")
+    if sum(map(bool, (args.enqueue, args.worker, args.queue_status, args.resume))) > 1:
+        parser.error("--enqueue, --worker, --queue-status and --resume cannot be combined")
+    if not args.hashtags and not (args.resume or args.compact_archive or args.reprocess or args.index_archive
+                                  or args.query_store or args.refresh_engagement or args.worker
+                                  or args.queue_status):
+        parser.error("at least one hashtag is required (or --resume / --compact-archive / --reprocess / "
+                     "--index-archive / --query-store / --refresh-engagement / --worker / --queue-status)")
+    return args
 
 
 # --- DATE AND TEXT PARSING TOOLS (ML READY) ---
+
+# The lookbehind only lets "\S+\.com" start at the beginning of a word, which is the only place it
+# can match first anyway; without it the regex rescans every position of every word
+LINK_RE = re.compile(r'http\S+|www\S+|(?<!\S)\S+\.com\S+|t.co\S+', flags=re.MULTILINE)
+# Necessary condition for the "t.co" alternative (the dot is a wildcard in LINK_RE)
+SHORT_LINK_RE = re.compile(r't.co\S')
+# "mo" has to be tried before "m", otherwise "2mo" is read as two minutes
+RELATIVE_DATE_RE = re.compile(r'(\d+)\s*(mo|s|m|h|d|w|y)')
+
+# Absolute format (example: Feb 25, 2022 · 12:00 AM UTC)
+DATE_FORMATS = [
+    "%b %d, %Y · %I:%M %p %Z",
+    "%b %d, %Y",
+    "%d %b %Y",
+    "%Y/%m/%d",
+    # Formats found in previously saved output files
+    "%Y-%m-%d %H:%M:%S",
+    "%d-%m-%y"
+]
+
 def clean_text(text):
     """
     Cleans text: removes excessive whitespace and links.
     """
     if not isinstance(text, str):
         return ""
-    # Remove links (URL)
-    text = re.sub(r'http\S+|www\S+|\S+\.com\S+|t.co\S+', '', text, flags=re.MULTILINE)
-    # Remove excessive whitespace
-    text = re.sub(r'\s+', ' ', text).strip()
-    return text
+    # Remove links (URL); the substring checks skip the regex for the many texts without one
+    if 'http' in text or 'www' in text or '.com' in text or SHORT_LINK_RE.search(text):
+        text = LINK_RE.sub('', text)
+    # Remove excessive whitespace (str.split() splits on the same characters as \s)
+    return ' '.join(text.split())
+
+@lru_cache(maxsize=65536)
+def _parse_absolute_date(date_str):
+    # Memoized: archives and timelines repeat the same few dates over and over
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(date_str, fmt)
+        except ValueError:
+            pass
+    return None
 
 def parse_nitter_date(date_str, base_time=None):
     """
@@ -151,22 +775,13 @@ def parse_nitter_date(date_str, base_time=None):
         base_time = datetime.now()
         
     date_str = date_str.strip().lower()
-
-    # Absolute format (example: Feb 25, 2022 · 12:00 AM UTC)
-    date_formats = [
-        "%b %d, %Y · %I:%M %p %Z",
-        "%b %d, %Y",
-        "%d %b %Y",
-        "%Y/%m/%d"
-    ]
-    for fmt in date_formats:
-        try:
-            return datetime.strptime(date_str, fmt)
-        except ValueError:
-            pass
+    
+    parsed = _parse_absolute_date(date_str)
+    if parsed is not None:
+        return parsed
 
     # Relative format (e.g., 1h, 5d, 2mo)
-    match = re.match(r'(\d+)\s*(s|m|h|d|w|mo|y)', date_str)
+    match = RELATIVE_DATE_RE.match(date_str)
     if match:
         value = int(match.group(1))
         unit = match.group(2)
@@ -184,411 +799,3713 @@ def parse_nitter_date(date_str, base_time=None):
         
     return None
 
-def transform_tweets_for_csv(tweets_by_hashtag):
+# --- TWEET BUFFER (columnar storage) ---
+
+ISO_DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+class TweetBuffer:
     """
-    Transforms raw tweet data into structured rows ready for CSV saving.
-    Adds feature engineering columns.
+    Column store for scraped tweets: one list or typed array per field instead of a
+    dict per tweet. Counters and status IDs are kept in array('q') (status ID 0 when
+    unknown), usernames and raw dates are interned, and hashtags are stored as small
+    integer codes into `hashtags`. Texts are kept UTF-8 encoded: a str holding a single
+    Polish letter stores every character in two bytes. Tweet dicts are only rebuilt on
+    demand (tweet()).
     """
-    transformed_rows = []
-    tweet_id = 1
-    for hashtag, tweets in tweets_by_hashtag.items():
+    def __init__(self):
+        self.hashtags = []
+        self._hashtag_codes = {}
+        self.hashtag_codes = array('I')
+        self.usernames = []
+        self.contents = []
+        self.dates = []
+        self.posted_at = []
+        self.links = []
+        self.status_ids = array('q')
+        self.likes = array('q')
+        self.retweets = array('q')
+        self.replies = array('q')
+        self.interactions = array('q')
+        self.known = array('b')
+
+    @classmethod
+    def from_tweets(cls, tweets_by_hashtag):
+        buffer = cls()
+        for hashtag, tweets in tweets_by_hashtag.items():
+            buffer.extend(hashtag, tweets)
+        return buffer
+
+    def __len__(self):
+        return len(self.contents)
+
+    def extend(self, hashtag, tweets):
+        """
+        Appends tweet dicts (in the format the engines produce) under a hashtag.
+        """
+        code = self._hashtag_codes.get(hashtag)
+        if code is None:
+            code = self._hashtag_codes[hashtag] = len(self.hashtags)
+            self.hashtags.append(hashtag)
         for tweet in tweets:
-            cleaned_text = clean_text(tweet.get("content", ""))
-            
-            # Date parsing
-            post_date_raw = tweet.get("date", "")
-            parsed_date = parse_nitter_date(post_date_raw)
-            formatted_date_iso = parsed_date.strftime("%Y-%m-%d %H:%M:%S") if parsed_date else post_date_raw
-            
-            row = {
-                "id": tweet_id,
-                "hashtag": f"#{hashtag}",
-                "username": tweet.get("username", ""),
-                "text": cleaned_text,
-                "likes": tweet.get("likes", 0),
-                "retweets": tweet.get("retweets", 0),
-                "replies": tweet.get("replies", 0),
-                "total_interactions": tweet.get("interactions", 0),
-                "post_date_iso": formatted_date_iso, 
-                "text_length": len(cleaned_text),
-                "word_count": len(cleaned_text.split()),
-                "sentiment_label": "", 
-                "link": tweet.get("link", "")
-            }
-            transformed_rows.append(row)
-            tweet_id += 1
-    return transformed_rows
+            self.hashtag_codes.append(code)
+            self.usernames.append(sys.intern(tweet.get("username") or ""))
+            self.contents.append((tweet.get("content") or "").encode('utf-8'))
+            self.dates.append(sys.intern(tweet.get("date") or ""))
+            self.posted_at.append(tweet.get("posted_at"))
+            self.links.append(tweet.get("link") or "")
+            self.status_ids.append(tweet.get("status_id") or 0)
+            self.likes.append(int(tweet.get("likes") or 0))
+            self.retweets.append(int(tweet.get("retweets") or 0))
+            self.replies.append(int(tweet.get("replies") or 0))
+            self.interactions.append(int(tweet.get("interactions") or 0))
+            self.known.append(bool(tweet.get("known")))
 
+    def tweet(self, i):
+        """
+        Rebuilds the tweet dict at position i.
+        """
+        return {
+            'username': self.usernames[i],
+            'date': self.dates[i],
+            'content': self.contents[i].decode('utf-8'),
+            'interactions': self.interactions[i],
+            'replies': self.replies[i],
+            'retweets': self.retweets[i],
+            'likes': self.likes[i],
+            'link': self.links[i],
+            'status_id': self.status_ids[i] or None,
+            'posted_at': self.posted_at[i],
+            'known': bool(self.known[i]),
+        }
 
-# --- MAIN SCRAPER LOGIC ---
+    def grouped_order(self):
+        """
+        Positions of all tweets grouped by hashtag (hashtags in order of first appearance,
+        tweets in insertion order within a hashtag).
+        """
+        if len(self.hashtags) <= 1:
+            return range(len(self))
+        return sorted(range(len(self)), key=self.hashtag_codes.__getitem__)
+
+    def to_columns(self, start_id=1):
+        """
+        The CSV columns (see CSV_FIELDNAMES) of all tweets grouped by hashtag, computed
+        one column at a time: the text is cleaned once per tweet, and every distinct
+        raw date is parsed and formatted only once. Row IDs are numbered from start_id.
+        """
+        order = self.grouped_order()
+        contents = self.contents
+        texts = [clean_text(contents[i].decode('utf-8')) for i in order]
+        post_dates = iso_post_dates([self.dates[i] for i in order], [self.posted_at[i] for i in order])
+
+        hashtag_labels = [f"#{hashtag}" for hashtag in self.hashtags]
+        codes = self.hashtag_codes
+        return {
+            "id": list(range(start_id, start_id + len(texts))),
+            "hashtag": [hashtag_labels[codes[i]] for i in order],
+            "username": [self.usernames[i] for i in order],
+            "text": texts,
+            "likes": [self.likes[i] for i in order],
+            "retweets": [self.retweets[i] for i in order],
+            "replies": [self.replies[i] for i in order],
+            "total_interactions": [self.interactions[i] for i in order],
+            "post_date_iso": post_dates,
+            "text_length": [len(text) for text in texts],
+            "word_count": [len(text.split()) for text in texts],
+            "sentiment_label": [""] * len(texts),
+            "link": [self.links[i] for i in order],
+        }
 
-def scrape_nitter_with_selenium(url, max_tweets=100, page_delay=3.0):
+def iso_post_dates(dates, posted_at):
     """
-    Function to fetch tweets from Nitter using Selenium.
-    Uses automatic Chrome configuration (Selenium Manager).
+    The post_date_iso values of raw Nitter dates. Dates already parsed while scraping
+    (posted_at, when a date window was applied) are only formatted, every distinct raw
+    date is parsed once, and unparseable dates are kept as they are.
     """
-    all_tweets = []
-    current_url = url
-    page_num = 1
-    
-    # Selenium Configuration - relies on Selenium Manager
-    options = Options()
-    options.add_argument("--headless")
-    options.add_argument("--disable-gpu")
-    options.add_argument("--no-sandbox")
-    options.add_argument("--disable-dev-shm-usage")
-    options.add_argument("--window-size=1920,1080")
-    options.add_argument("user-agent=Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/126.0.0.0 Safari/537.36")
-    
-    print("Initializing browser (automatic configuration)...")
-    
-    try:
-        driver = webdriver.Chrome(options=options)
-        driver.set_page_load_timeout(30)
-    except WebDriverException as e:
-        print(f"Browser initialization error: {e}")
-        print("Ensure Chrome is installed and up-to-date.")
-        return []
-        
-    try:
-        while len(all_tweets) < max_tweets:
-            print(f"Opening page {page_num}: {current_url}")
-            try:
-                driver.get(current_url)
-                
-                wait = WebDriverWait(driver, 15)
-                
-                # Attempt to find elements containing tweets
-                selectors = [".timeline-item", ".tweet", "article.tweet", ".post", ".timeline-tweet"]
-                tweet_elements = []
-                
-                for selector in selectors:
-                    try:
-                        elements = wait.until(EC.presence_of_all_elements_located((By.CSS_SELECTOR, selector)))
-                        if elements:
-                            print(f"Found {len(elements)} elements matching selector: {selector}")
-                            tweet_elements = elements
-                            break
-                    except TimeoutException:
-                        continue
-                
-                if not tweet_elements:
-                    print("No tweet elements found. Ending or instance error.")
-                    break
-                    
-            except TimeoutException:
-                print("Page load timeout exceeded. Trying a different instance/hashtag.")
+    base_time = datetime.now()
+    formatted = {}
+    post_dates = []
+    for raw, parsed in zip(dates, posted_at):
+        if parsed is not None:
+            post_dates.append(parsed.strftime(ISO_DATE_FORMAT))
+            continue
+        value = formatted.get(raw)
+        if value is None:
+            parsed = parse_nitter_date(raw, base_time)
+            value = formatted[raw] = parsed.strftime(ISO_DATE_FORMAT) if parsed else raw
+        post_dates.append(value)
+    return post_dates
+
+def tweet_columns(tweets_by_hashtag, start_id=1):
+    """
+    The same columns as TweetBuffer.to_columns, built straight from the tweet dicts.
+    Tweets that are transformed and written right away (a page) skip the buffer, which
+    only pays off while many tweets are held.
+    """
+    hashtags = []
+    tweets = []
+    for hashtag, page in tweets_by_hashtag.items():
+        hashtags.extend([f"#{hashtag}"] * len(page))
+        tweets.extend(page)
+    texts = [clean_text(tweet.get("content") or "") for tweet in tweets]
+    return {
+        "id": list(range(start_id, start_id + len(texts))),
+        "hashtag": hashtags,
+        "username": [tweet.get("username") or "" for tweet in tweets],
+        "text": texts,
+        "likes": [int(tweet.get("likes") or 0) for tweet in tweets],
+        "retweets": [int(tweet.get("retweets") or 0) for tweet in tweets],
+        "replies": [int(tweet.get("replies") or 0) for tweet in tweets],
+        "total_interactions": [int(tweet.get("interactions") or 0) for tweet in tweets],
+        "post_date_iso": iso_post_dates([tweet.get("date") or "" for tweet in tweets],
+                                        [tweet.get("posted_at") for tweet in tweets]),
+        "text_length": [len(text) for text in texts],
+        "word_count": [len(text.split()) for text in texts],
+        "sentiment_label": [""] * len(texts),
+        "link": [tweet.get("link") or "" for tweet in tweets],
+    }
+
+def transform_tweets_for_csv(tweets_by_hashtag, start_id=1):
+    """
+    Transforms raw tweet data into structured rows ready for CSV saving.
+    Adds feature engineering columns. Row IDs are numbered from start_id.
+    The work is done column by column (see tweet_columns).
+    """
+    columns = tweet_columns(tweets_by_hashtag, start_id)
+    return [dict(zip(CSV_FIELDNAMES, values)) for values in zip(*(columns[name] for name in CSV_FIELDNAMES))]
+
+
+# --- METRICS (per-phase timings, counters, event log) ---
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+class Metrics:
+    """
+    Thread-safe counters and latency histograms, keyed by name plus labels
+    (e.g. instance="nitter.net"), with an optional JSON-lines event log.
+    Exported as a Prometheus text snapshot and summarized by --profile.
+    """
+    def __init__(self):
+        self.counters = {}
+        self.gauges = {}
+        self.histograms = {}
+        self.started = time.monotonic()
+        self._events = None
+        self._lock = threading.Lock()
+
+    def open_event_log(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._events = open(path, 'a', encoding='utf-8')
+
+    def close(self):
+        with self._lock:
+            if self._events is not None:
+                self._events.close()
+                self._events = None
+
+    def event(self, name, **fields):
+        if self._events is None:
+            return
+        record = {"ts": round(time.time(), 3), "event": name, "thread": threading.current_thread().name, **fields}
+        line = json.dumps(record, ensure_ascii=False, default=str)
+        with self._lock:
+            if self._events is not None:
+                self._events.write(line + "\n")
+
+    def count(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def set_gauge(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.gauges[key] = value
+
+    def observe(self, name, seconds, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = {
+                    "buckets": [0] * len(LATENCY_BUCKETS), "count": 0, "sum": 0.0, "max": 0.0,
+                }
+            index = bisect.bisect_left(LATENCY_BUCKETS, seconds)
+            if index < len(LATENCY_BUCKETS):
+                histogram["buckets"][index] += 1
+            histogram["count"] += 1
+            histogram["sum"] += seconds
+            histogram["max"] = max(histogram["max"], seconds)
+
+    @contextmanager
+    def phase(self, name, **labels):
+        """
+        Times a block as phase `name`: adds it to the phase_seconds histogram and the event log.
+        """
+        start = time.perf_counter()
+        error = None
+        try:
+            yield
+        except BaseException as e:
+            error = type(e).__name__
+            raise
+        finally:
+            seconds = time.perf_counter() - start
+            self.observe("phase_seconds", seconds, phase=name, **labels)
+            self.event("phase", phase=name, seconds=round(seconds, 6), error=error, **labels)
+
+    def prometheus_text(self):
+        """
+        Renders all counters, gauges and histograms in the Prometheus text exposition format.
+        """
+        def label_text(labels, extra=()):
+            pairs = list(labels) + list(extra)
+            if not pairs:
+                return ""
+            escaped = (str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, v in pairs)
+            return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+        with self._lock:
+            counters = sorted(self.counters.items())
+            gauges = sorted(self.gauges.items())
+            histograms = sorted((key, dict(h, buckets=list(h["buckets"]))) for key, h in self.histograms.items())
+        lines = []
+        typed = set()
+        for (name, labels), value in counters:
+            if name not in typed:
+                lines.append(f"# TYPE nitter_{name}_total counter")
+                typed.add(name)
+            lines.append(f"nitter_{name}_total{label_text(labels)} {value}")
+        for (name, labels), value in gauges:
+            if name not in typed:
+                lines.append(f"# TYPE nitter_{name} gauge")
+                typed.add(name)
+            lines.append(f"nitter_{name}{label_text(labels)} {value:.6f}")
+        for (name, labels), histogram in histograms:
+            if name not in typed:
+                lines.append(f"# TYPE nitter_{name} histogram")
+                typed.add(name)
+            cumulative = 0
+            for bound, hits in zip(LATENCY_BUCKETS, histogram["buckets"]):
+                cumulative += hits
+                lines.append(f"nitter_{name}_bucket{label_text(labels, [('le', bound)])} {cumulative}")
+            lines.append(f"nitter_{name}_bucket{label_text(labels, [('le', '+Inf')])} {histogram['count']}")
+            lines.append(f"nitter_{name}_sum{label_text(labels)} {histogram['sum']:.6f}")
+            lines.append(f"nitter_{name}_count{label_text(labels)} {histogram['count']}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(self.prometheus_text())
+        os.replace(tmp_path, path)
+
+    def print_summary(self):
+        """
+        Prints where the run spent its time (per phase and per instance) and the main counters.
+        """
+        wall = time.monotonic() - self.started
+        with self._lock:
+            histograms = dict(self.histograms)
+            counters = dict(self.counters)
+            rates = {dict(labels).get("instance", "?"): value
+                     for (name, labels), value in self.gauges.items() if name == "page_rate"}
+
+        phases = {}
+        pages = {}
+        for (name, labels), histogram in histograms.items():
+            labels = dict(labels)
+            if name == "phase_seconds":
+                total = phases.setdefault(labels["phase"], {"count": 0, "sum": 0.0, "max": 0.0})
+            elif name == "page_seconds":
+                total = pages.setdefault(labels.get("instance", "?"), {"count": 0, "sum": 0.0, "max": 0.0})
+            else:
+                continue
+            total["count"] += histogram["count"]
+            total["sum"] += histogram["sum"]
+            total["max"] = max(total["max"], histogram["max"])
+
+        print(f"\n{'='*60}")
+        print(f"PROFILE (wall time {wall:.1f} s)")
+        print(f"{'='*60}")
+        print(f"{'phase':<16} {'count':>7} {'total s':>9} {'mean ms':>9} {'max ms':>9} {'share':>7}")
+        for phase, total in sorted(phases.items(), key=lambda item: item[1]["sum"], reverse=True):
+            print(f"{phase:<16} {total['count']:>7} {total['sum']:>9.2f} {total['sum'] / total['count'] * 1000:>9.1f} "
+                  f"{total['max'] * 1000:>9.1f} {total['sum'] / wall:>7.0%}")
+        if pages:
+            page_bytes = {}
+            for (name, labels), value in counters.items():
+                if name == "bytes":
+                    instance = dict(labels).get("instance", "?")
+                    page_bytes[instance] = page_bytes.get(instance, 0) + value
+            print(f"\n{'instance':<32} {'pages':>7} {'mean ms':>9} {'max ms':>9} {'KB/page':>9} {'pages/s':>9}")
+            for instance, total in sorted(pages.items()):
+                kb_per_page = page_bytes.get(instance, 0) / total['count'] / 1024
+                rate = f"{rates[instance]:.2f}" if instance in rates else "-"
+                print(f"{instance:<32} {total['count']:>7} {total['sum'] / total['count'] * 1000:>9.1f} "
+                      f"{total['max'] * 1000:>9.1f} {kb_per_page:>9.1f} {rate:>9}")
+        totals = {}
+        for (name, _), value in counters.items():
+            totals[name] = totals.get(name, 0) + value
+        if totals:
+            print("\n" + ", ".join(f"{name}={value}" for name, value in sorted(totals.items())))
+
+METRICS = Metrics()
+
+
+# --- BROWSER POOL ---
+
+# Nitter proxies avatars and media under /pic/ and /video/; none of it is needed for text and counters
+LEAN_BLOCKED_URLS = [
+    "*/pic/*", "*/video/*", "*.jpg*", "*.jpeg*", "*.png*", "*.gif*", "*.webp*", "*.svg*", "*.ico*",
+    "*.mp4*", "*.m3u8*", "*.webm*", "*.woff*", "*.ttf*", "*.otf*",
+]
+LEAN_CHROME_ARGUMENTS = [
+    "--blink-settings=imagesEnabled=false",
+    "--disable-extensions",
+    "--disable-background-networking",
+    "--disable-component-update",
+    "--disable-default-apps",
+    "--disable-sync",
+    "--disable-notifications",
+    "--mute-audio",
+    "--no-first-run",
+    "--disable-features=Translate,MediaRouter,OptimizationHints,AutofillServerCommunication,InterestFeedContentSuggestions",
+]
+
+def create_chrome_driver(lean=False):
+    """
+    Starts a headless Chrome instance (relies on Selenium Manager for the driver binary).
+    With lean=True, images, media and fonts are blocked through DevTools, unneeded
+    Chrome features are turned off and pages count as loaded once the DOM is ready.
+    """
+    options = Options()
+    options.add_argument("--headless")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--window-size=1920,1080")
+    options.add_argument(f"user-agent={USER_AGENT}")
+    if lean:
+        for argument in LEAN_CHROME_ARGUMENTS:
+            options.add_argument(argument)
+        # driver.get() returns at DOMContentLoaded; page_ready() does the rest of the waiting
+        options.page_load_strategy = "eager"
+    
+    print(f"Initializing {'lean ' if lean else ''}browser (automatic configuration)...")
+    driver = webdriver.Chrome(options=options)
+    driver.set_page_load_timeout(30)
+    if lean:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": LEAN_BLOCKED_URLS})
+    return driver
+
+class BrowserPool:
+    """
+    Hands out warm Chrome instances instead of starting a new browser per instance/hashtag.
+    Browsers are started lazily (at most `size` at once), reset between uses and
+    recycled after `max_pages_per_driver` pages or when they stop responding.
+    With lean=True the browsers use the lean profile (see create_chrome_driver).
+    """
+    def __init__(self, size=1, max_pages_per_driver=50, lean=False):
+        self.size = max(1, size)
+        self.max_pages_per_driver = max_pages_per_driver
+        self.lean = lean
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._pages = {}
+        self._drivers = set()
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def acquire(self):
+        """
+        Returns an idle browser or starts a new one. Blocks while all `size` browsers are in use.
+        Raises WebDriverException if a new browser cannot be started.
+        """
+        if self._closed:
+            raise RuntimeError("Browser pool is closed")
+        self._slots.acquire()
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        try:
+            with METRICS.phase("driver_start"):
+                driver = create_chrome_driver(self.lean)
+        except BaseException:
+            self._slots.release()
+            raise
+        METRICS.count("browsers_started")
+        with self._lock:
+            self._drivers.add(driver)
+            self._pages[driver] = 0
+        return driver
+
+    def count_page(self, driver):
+        with self._lock:
+            self._pages[driver] = self._pages.get(driver, 0) + 1
+
+    def release(self, driver):
+        """
+        Returns a browser to the pool after clearing cookies and storage.
+        Browsers that crashed or served too many pages are shut down instead.
+        """
+        try:
+            with self._lock:
+                worn_out = self._pages.get(driver, 0) >= self.max_pages_per_driver
+            if self._closed or worn_out or not self._reset(driver):
+                if worn_out:
+                    print("Recycling browser after reaching the page limit...")
+                self._discard(driver)
+            else:
+                self._idle.put(driver)
+        finally:
+            self._slots.release()
+
+    def close(self):
+        """
+        Shuts down every browser the pool has started (also on Ctrl+C).
+        """
+        self._closed = True
+        with self._lock:
+            drivers = list(self._drivers)
+        if drivers:
+            print(f"Closing {len(drivers)} browser(s)...")
+        for driver in drivers:
+            self._discard(driver)
+
+    def _reset(self, driver):
+        try:
+            with METRICS.phase("driver_reset"):
+                driver.execute_script("try { localStorage.clear(); sessionStorage.clear(); } catch (e) {}")
+                driver.delete_all_cookies()
+                driver.get("about:blank")
+            return True
+        except WebDriverException as e:
+            print(f"Browser did not survive reset, replacing it: {type(e).__name__}")
+            return False
+
+    def _discard(self, driver):
+        with self._lock:
+            self._drivers.discard(driver)
+            self._pages.pop(driver, None)
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+
+# --- RATE LIMITING & SCHEDULING ---
+
+# Set on Ctrl+C: scraping threads stop after their current page and pacing sleeps end early
+STOP_EVENT = threading.Event()
+
+def stop_workers(executor, futures):
+    """
+    Stops a pool of scraping threads after Ctrl+C: sets STOP_EVENT, cancels the tasks
+    that have not started and waits for the running ones, so that nothing is written
+    after the caller closes its writer.
+    """
+    STOP_EVENT.set()
+    for future in futures:
+        future.cancel()
+    executor.shutdown(wait=True)
+
+class TokenBucket:
+    """
+    Classic token bucket: `rate` tokens per second, at most `capacity` stored.
+    The rate can be changed while the bucket is in use, and hold() stops handing
+    out tokens for a while (e.g. for a Retry-After header).
+    """
+    def __init__(self, rate, capacity=1.0):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._held_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def set_rate(self, rate):
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = rate
+
+    def hold(self, seconds):
+        with self._lock:
+            self._held_until = max(self._held_until, time.monotonic() + seconds)
+
+    def acquire(self):
+        """
+        Takes one token, sleeping until one is available (or STOP_EVENT is set).
+        Returns the time spent waiting.
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now < self._held_until:
+                    wait_time = self._held_until - now
+                elif self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return waited
+                else:
+                    wait_time = (1.0 - self._tokens) / self.rate
+            if STOP_EVENT.wait(wait_time):
+                return waited
+            waited += wait_time
+
+class InstanceRateLimiter:
+    """
+    Enforces politeness per Nitter instance (one token bucket per host) and keeps
+    track of how many workers are using each instance, so concurrent hashtags
+    spread over different instances.
+    With adaptive=True every bucket's rate is driven by an AIMD controller: after
+    INCREASE_AFTER successful pages in a row the rate grows by INCREASE_STEP pages/s,
+    and every rate-limit or error page multiplies it by DECREASE_FACTOR (and honours
+    Retry-After). Buckets start at the rate learned in earlier runs (kept in the
+    InstanceRegistry) or at one page per `page_delay` seconds.
+    """
+    INCREASE_AFTER = 5
+    INCREASE_STEP = 0.1
+    DECREASE_FACTOR = 0.5
+    MIN_RATE = 1 / 60.0
+    MAX_RATE = 5.0
+    MAX_RETRY_AFTER = 300.0
+
+    def __init__(self, page_delay=3.0, burst=1.0, registry=None, adaptive=False):
+        self.rate = 1.0 / max(page_delay, 0.01)
+        self.burst = burst
+        self.registry = registry
+        self.adaptive = adaptive
+        self._buckets = {}
+        self._active = {}
+        self._streaks = {}
+        self._lock = threading.Lock()
+
+    def _bucket(self, instance):
+        with self._lock:
+            bucket = self._buckets.get(instance)
+            if bucket is None:
+                learned = self.registry.page_rate(instance) if self.adaptive and self.registry is not None else None
+                rate = learned or self.rate
+                if self.adaptive:
+                    # The controller only moves rates within [MIN_RATE, MAX_RATE]; start inside it too
+                    rate = min(self.MAX_RATE, max(self.MIN_RATE, rate))
+                bucket = self._buckets[instance] = TokenBucket(rate, self.burst)
+            return bucket
+
+    def wait(self, url_or_instance):
+        return self._bucket(instance_from_url(url_or_instance)).acquire()
+
+    def record_success(self, instance):
+        """
+        Counts a successful page; every INCREASE_AFTER in a row probe a higher rate.
+        """
+        if not self.adaptive:
+            return
+        bucket = self._bucket(instance)
+        with self._lock:
+            self._streaks[instance] = self._streaks.get(instance, 0) + 1
+            if self._streaks[instance] < self.INCREASE_AFTER:
+                return
+            self._streaks[instance] = 0
+            rate = min(self.MAX_RATE, bucket.rate + self.INCREASE_STEP)
+        self._set_rate(instance, bucket, rate)
+
+    def record_failure(self, instance, retry_after=None):
+        """
+        Backs off after a rate-limit or error page: the rate is cut by DECREASE_FACTOR
+        and, with a Retry-After value, no page is loaded before it has passed.
+        """
+        if not self.adaptive:
+            return
+        bucket = self._bucket(instance)
+        with self._lock:
+            self._streaks[instance] = 0
+            rate = max(self.MIN_RATE, bucket.rate * self.DECREASE_FACTOR)
+        if retry_after:
+            bucket.hold(min(retry_after, self.MAX_RETRY_AFTER))
+        self._set_rate(instance, bucket, rate)
+
+    def _set_rate(self, instance, bucket, rate):
+        bucket.set_rate(rate)
+        METRICS.set_gauge("page_rate", rate, instance=instance)
+        METRICS.event("page_rate", instance=instance, rate=round(rate, 4))
+        if self.registry is not None:
+            self.registry.record_page_rate(instance, rate)
+
+    def rates(self):
+        """
+        Returns the current rate (pages per second) of every instance used so far.
+        """
+        with self._lock:
+            return {instance: bucket.rate for instance, bucket in self._buckets.items()}
+
+    def claim(self, instances):
+        """
+        Picks the instance with the fewest workers on it (ties keep preference order)
+        and marks it as used until release() is called.
+        """
+        with self._lock:
+            instance = min(instances, key=lambda candidate: self._active.get(candidate, 0))
+            self._active[instance] = self._active.get(instance, 0) + 1
+            return instance
+
+    def release(self, instance):
+        with self._lock:
+            self._active[instance] -= 1
+
+def make_rate_limiter(page_delay=3.0, concurrency=1, registry=None, adaptive=True):
+    """
+    Returns the rate limiter for a run: an adaptive one (which replaces all fixed sleeps),
+    a fixed-rate one for concurrent runs with fixed delays, or None (random sleeps).
+    """
+    if adaptive:
+        return InstanceRateLimiter(page_delay, registry=registry, adaptive=True)
+    return InstanceRateLimiter(page_delay) if concurrency > 1 else None
+
+def print_page_rates(rate_limiter):
+    rates = rate_limiter.rates() if rate_limiter is not None else {}
+    if rates:
+        print("\n📶 Learned page rates: " + ", ".join(
+            f"{instance} {rate:.2f}/s" for instance, rate in sorted(rates.items(), key=lambda item: -item[1])))
+
+
+# --- SEEN-TWEET INDEX (incremental scraping) ---
+
+STATUS_ID_RE = re.compile(r'/status/(\d+)')
+
+def extract_status_id(link):
+    """
+    Returns the numeric status ID from a tweet link (.../status/<id>#m), or None.
+    """
+    match = STATUS_ID_RE.search(link or "")
+    return int(match.group(1)) if match else None
+
+class SeenTweetIndex:
+    """
+    Persistent SQLite index of the status IDs already collected for each query,
+    used to stop paging once a run reaches tweets fetched by an earlier run.
+    """
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS seen ("
+                " query TEXT NOT NULL, status_id INTEGER NOT NULL, first_seen REAL NOT NULL,"
+                " PRIMARY KEY (query, status_id)) WITHOUT ROWID"
+            )
+
+    def known(self, query, status_ids):
+        """
+        Returns the subset of status_ids already recorded for the query.
+        """
+        status_ids = list(status_ids)
+        found = set()
+        with self._lock:
+            for start in range(0, len(status_ids), 500):
+                chunk = status_ids[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT status_id FROM seen WHERE query = ? AND status_id IN ({placeholders})",
+                    [query.lower()] + chunk
+                )
+                found.update(row[0] for row in rows)
+        return found
+
+    def add(self, query, status_ids):
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO seen (query, status_id, first_seen) VALUES (?, ?, ?)",
+                [(query.lower(), status_id, now) for status_id in status_ids if status_id is not None]
+            )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+class TweetPage(list):
+    """
+    A page of tweet dicts (a plain list) that also remembers the page URL and the
+    URL of the next page ("Load more" cursor), which is what checkpoints persist,
+    plus how long the page took to load.
+    """
+    def __init__(self, tweets=(), url=None, next_url=None, seconds=None):
+        super().__init__(tweets)
+        self.url = url
+        self.next_url = next_url
+        self.seconds = seconds
+
+def filter_page_tweets(page_tweets, limit, run_ids, seen_index=None, query=None):
+    """
+    Selects up to `limit` tweets (all of them with limit=None) from a page, dropping
+    tweets already fetched earlier in this run. With a SeenTweetIndex, tweets collected by earlier runs are marked
+    with 'known': True.
+    Returns (accepted_tweets, page_fully_known).
+    """
+    fresh = []
+    for tweet in page_tweets:
+        status_id = extract_status_id(tweet.get('link'))
+        tweet['status_id'] = status_id
+        if status_id is not None:
+            if status_id in run_ids:
+                continue
+            run_ids.add(status_id)
+        fresh.append(tweet)
+
+    known = set()
+    if seen_index is not None:
+        known = seen_index.known(query, [t['status_id'] for t in fresh if t['status_id'] is not None])
+    for tweet in fresh:
+        tweet['known'] = tweet['status_id'] in known
+
+    page_fully_known = bool(known) and all(tweet['known'] for tweet in fresh)
+    return (fresh if limit is None else fresh[:max(0, limit)]), page_fully_known
+
+def filter_date_window(page_tweets, since=None, until=None):
+    """
+    Parses the tweets' dates (stored as 'posted_at') and keeps the tweets posted
+    in the days [since, until); tweets with an unparseable date are kept.
+    Returns (kept_tweets, page_too_old), where page_too_old means that every dated
+    tweet on the page is older than since, so the following pages will be too.
+    """
+    kept = []
+    dated = older = 0
+    for tweet in page_tweets:
+        posted_at = tweet.get('posted_at') or parse_nitter_date(tweet.get('date') or "")
+        tweet['posted_at'] = posted_at
+        if posted_at is None:
+            kept.append(tweet)
+            continue
+        dated += 1
+        day = posted_at.date()
+        if since is not None and day < since:
+            older += 1
+        elif until is None or day < until:
+            kept.append(tweet)
+    dropped = len(page_tweets) - len(kept)
+    if dropped:
+        METRICS.count("tweets_out_of_window", dropped)
+    return kept, since is not None and dated > 0 and older == dated
+
+def iter_page_tweets(pages, max_tweets=100, seen_index=None, query=None, hydrate_workers=4, since=None, until=None,
+                     rate_limiter=None, registry=None):
+    """
+    Applies the per-run limits to a stream of pages from one of the engines: drops
+    duplicates, stops at max_tweets (never with max_tweets=None) and (with a SeenTweetIndex)
+    at the first page made up only of tweets collected by earlier runs. With since/until (dates), tweets posted
+    outside [since, until) are dropped and paging stops at the first page older than since.
+    Truncated tweets among the accepted ones get their full text (see
+    hydrate_truncated_tweets; hydrate_workers=0 turns this off), paced by rate_limiter and
+    reported to it and the registry.
+    Yields the accepted tweets page by page as TweetPage lists; the last page has
+    next_url=None when paging was ended on purpose.
+    """
+    run_ids = set()
+    total = 0
+    try:
+        for page_tweets in pages:
+            page_too_old = False
+            in_window = page_tweets
+            if since is not None or until is not None:
+                in_window, page_too_old = filter_date_window(page_tweets, since, until)
+            limit = None if max_tweets is None else max_tweets - total
+            added, page_fully_known = filter_page_tweets(in_window, limit, run_ids, seen_index, query)
+            if any(tweet.get('truncated') for tweet in added):
+                with METRICS.phase("hydrate"):
+                    hydrate_truncated_tweets(added, hydrate_workers, rate_limiter=rate_limiter, registry=registry)
+            for number, tweet_data in enumerate(added, start=total + 1):
+                content = tweet_data['content']
+                content_preview = clean_text(content)[:50] + "..." if len(content) > 50 else content
+                print(f"Tweet #{number}: {tweet_data['username']} - {content_preview}")
+            total += len(added)
+            
+            print(f"Fetched {len(added)} tweets from this page. Total: {total}"
+                  + (f"/{max_tweets}" if max_tweets is not None else ""))
+            if added or page_fully_known or page_too_old:
+                # A final page is passed on even when empty, so the hashtag is marked as done
+                next_url = None if page_fully_known or page_too_old else getattr(page_tweets, 'next_url', None)
+                yield TweetPage(added, getattr(page_tweets, 'url', None), next_url,
+                                getattr(page_tweets, 'seconds', None))
+            
+            if page_fully_known:
+                print("All tweets on this page were collected by an earlier run, ending.")
                 break
-            except Exception as e:
-                print(f"Error while loading page: {e}")
+            
+            if page_too_old:
+                print(f"All tweets on this page are older than {since}, ending.")
                 break
             
-            # Processing each found tweet
-            tweets_on_page = 0
-            for i, tweet in enumerate(tweet_elements):
-                if len(all_tweets) >= max_tweets:
+            if not added and total > 0:
+                print("No new tweets found on this page, ending (might be a duplicate page).")
+                break
+            
+            if max_tweets is not None and total >= max_tweets:
+                print(f"Reached maximum number of tweets ({max_tweets}), ending.")
+                break
+    finally:
+        pages.close()
+
+
+# --- PAGE CACHE (offline replay) ---
+
+def normalize_page_url(url):
+    """
+    Cache key form of a page URL: lowercase scheme and host, no fragment, sorted query parameters.
+    """
+    parts = urlparse(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunparse((parts.scheme.lower(), parts.netloc.lower(), parts.path or "/", "", query, ""))
+
+class PageCache:
+    """
+    On-disk cache of fetched pages (search and status pages) under every engine.
+    Pages are stored gzip-compressed in one SQLite file, addressed by the SHA-256 of
+    their normalized URL, together with the next-page URL that was followed from them.
+    Entries older than `ttl` seconds are fetched again, and once the stored pages
+    exceed `max_bytes` the least recently used ones are evicted.
+    With replay=True nothing is fetched: every page is served from the cache whatever
+    its age, and a page that is not cached fails like an unreachable instance.
+    """
+    EVICT_TO = 0.9
+
+    def __init__(self, path, ttl=24 * 3600.0, max_bytes=500 * 1024 * 1024, replay=False, workers=None):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.replay = replay
+        self.workers = workers or os.cpu_count() or 1
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._touched = {}
+        self._executor = None
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS pages ("
+                " key TEXT PRIMARY KEY, url TEXT NOT NULL, instance TEXT NOT NULL, next_url TEXT,"
+                " fetched_at REAL NOT NULL, last_used REAL NOT NULL, size INTEGER NOT NULL, body BLOB NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS pages_last_used ON pages (last_used)")
+            self.total_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+
+    @staticmethod
+    def _key(url):
+        return hashlib.sha256(normalize_page_url(url).encode('utf-8')).hexdigest()
+
+    def lookup(self, url):
+        """
+        Returns (gzip-compressed body, next_url) of a usable cached copy of the page, or None.
+        """
+        key = self._key(url)
+        with self._lock:
+            row = self._conn.execute("SELECT body, next_url, fetched_at FROM pages WHERE key = ?",
+                                     (key,)).fetchone()
+            if row is not None and (self.replay or time.time() - row[2] < self.ttl):
+                # Usage times are written in batches (see _flush_touched)
+                self._touched[key] = time.time()
+            else:
+                row = None
+        METRICS.count("cache_hits" if row is not None else "cache_misses", instance=instance_from_url(url))
+        return (row[0], row[1]) if row is not None else None
+
+    def get(self, url):
+        """
+        Returns the cached HTML (bytes) of the page, or None.
+        """
+        entry = self.lookup(url)
+        return gzip.decompress(entry[0]) if entry is not None else None
+
+    def put(self, url, html, next_url=None):
+        """
+        Stores a fetched page (bytes or str), replacing an older copy, and evicts
+        the least recently used pages if the cache has grown beyond max_bytes.
+        """
+        if self.replay:
+            return
+        if isinstance(html, str):
+            html = html.encode('utf-8')
+        body = gzip.compress(html, compresslevel=5)
+        key = self._key(url)
+        now = time.time()
+        with self._lock, self._conn:
+            old = self._conn.execute("SELECT size FROM pages WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages (key, url, instance, next_url, fetched_at, last_used, size, body)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, url, instance_from_url(url), next_url, now, now, len(body), body)
+            )
+            self.total_bytes += len(body) - (old[0] if old else 0)
+            if self.total_bytes > self.max_bytes:
+                self._evict()
+
+    def _flush_touched(self):
+        if self._touched:
+            self._conn.executemany("UPDATE pages SET last_used = ? WHERE key = ?",
+                                   [(used, key) for key, used in self._touched.items()])
+            self._touched.clear()
+
+    def _evict(self):
+        self._flush_touched()
+        target = self.max_bytes * self.EVICT_TO
+        evicted = 0
+        while self.total_bytes > target:
+            rows = self._conn.execute("SELECT key, size FROM pages ORDER BY last_used LIMIT 100").fetchall()
+            if not rows:
+                break
+            for key, size in rows:
+                if self.total_bytes <= target:
                     break
-                    
-                try:
-                    # Expand long content ("Show more")
+                self._conn.execute("DELETE FROM pages WHERE key = ?", (key,))
+                self.total_bytes -= size
+                evicted += 1
+        METRICS.count("cache_evictions", evicted)
+
+    def instances(self):
+        """
+        The instances of all cached pages (the instance list of a replay).
+        """
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT DISTINCT instance FROM pages ORDER BY instance")]
+
+    def parse_executor(self):
+        """
+        The process pool that parses pages ahead during a replay (started on first use).
+        """
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            return self._executor
+
+    def close(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+            with self._conn:
+                self._flush_touched()
+            self._conn.close()
+
+
+_page_cache = None
+
+def set_page_cache(cache):
+    """
+    Puts a PageCache under all page fetches of the process (None turns it off).
+    """
+    global _page_cache
+    _page_cache = cache
+
+def load_cached_page(url):
+    """
+    Returns the TweetPage of a search page parsed from the page cache, or None if there
+    is no usable copy (and no cache). In replay mode a missing page raises PageLoadError.
+    Cached pages have seconds=None, as nothing was loaded.
+    """
+    if _page_cache is None:
+        return None
+    html = _page_cache.get(url)
+    if html is None:
+        if _page_cache.replay:
+            raise PageLoadError("error", f"{url} is not in the page cache")
+        return None
+    print(f"Using cached page: {url}")
+    instance = instance_from_url(url)
+    with METRICS.phase("parse", instance=instance):
+        tweets, next_url, _ = parse_nitter_page(html, url)
+    METRICS.count("pages", instance=instance, engine="cache")
+    METRICS.count("tweets_fetched", len(tweets), instance=instance)
+    return TweetPage(tweets, url, None if next_url == url else next_url)
+
+def store_cached_page(url, html, next_url=None):
+    if _page_cache is not None:
+        _page_cache.put(url, html, next_url)
+
+def _parse_cached_page(body, url):
+    tweets, next_url, _ = parse_nitter_page(gzip.decompress(body), url)
+    return tweets, next_url
+
+def iter_replay_pages(url, page_cache):
+    """
+    Replays a chain of cached search pages without any network access, yielding
+    TweetPages like the engines do. The chain is followed through the next-page URLs
+    stored with the pages, so up to two pages per worker are parsed ahead on the cache's
+    process pool. Every page is parsed with the current parse_nitter_page; if that finds
+    a different next page than the stored one, the chain continues from there.
+    Raises PageLoadError when a page of the chain is not cached.
+    """
+    executor = page_cache.parse_executor()
+    lookahead = 2 * page_cache.workers
+    pending = deque()
+    current_url = url
+    ahead_url = url
+    try:
+        while True:
+            while ahead_url and len(pending) < lookahead:
+                entry = page_cache.lookup(ahead_url)
+                if entry is None:
+                    ahead_url = None
+                    break
+                pending.append((ahead_url, executor.submit(_parse_cached_page, entry[0], ahead_url)))
+                ahead_url = entry[1]
+            if not pending:
+                raise PageLoadError("error", f"{current_url} is not in the page cache")
+
+            page_url, future = pending.popleft()
+            tweets, next_url = future.result()
+            instance = instance_from_url(page_url)
+            METRICS.count("pages", instance=instance, engine="cache")
+            METRICS.count("tweets_fetched", len(tweets), instance=instance)
+            if next_url == page_url:
+                next_url = None
+            yield TweetPage(tweets, page_url, next_url)
+
+            if not next_url:
+                print("Did not find a link to the next page, ending.")
+                break
+            current_url = next_url
+            if not pending or pending[0][0] != current_url:
+                for _, stale in pending:
+                    stale.cancel()
+                pending.clear()
+                ahead_url = current_url
+    finally:
+        for _, stale in pending:
+            stale.cancel()
+
+# --- MAIN SCRAPER LOGIC ---
+
+class PageLoadError(Exception):
+    """
+    Raised by the page engines when an instance answers with an error or rate-limit
+    page (or not at all). `outcome` is "rate_limited" or "error"; `retry_after` is the
+    instance's Retry-After in seconds, if it sent one.
+    """
+    def __init__(self, outcome, message, retry_after=None):
+        super().__init__(message)
+        self.outcome = outcome
+        self.retry_after = retry_after
+
+# Runs in the page: classifies it as soon as its state is decided, otherwise returns null.
+CLASSIFY_PAGE_JS = """
+const [tweetSelectors, noResultsSelectors, errorSelectors, rateLimitMarkers] = arguments;
+for (const s of tweetSelectors) {
+    if (document.querySelector(s)) return {outcome: 'tweets', selector: s};
+}
+if (noResultsSelectors.some(s => document.querySelector(s))) return {outcome: 'empty'};
+const text = document.body ? (document.body.innerText || '').slice(0, 5000).toLowerCase() : '';
+if (rateLimitMarkers.some(m => text.includes(m))) return {outcome: 'rate_limited'};
+if (errorSelectors.some(s => document.querySelector(s))) return {outcome: 'error'};
+if (document.readyState === 'complete' && document.querySelector('.timeline')) return {outcome: 'empty'};
+return null;
+"""
+
+class page_ready:
+    """
+    WebDriverWait condition that is met as soon as the page shows tweets, the
+    "no results" marker, or an error or rate-limit page (one script call per poll).
+    Returns {'outcome': 'tweets' | 'empty' | 'rate_limited' | 'error', 'selector': ...}.
+    """
+    def __init__(self, tweet_selectors=TWEET_SELECTORS):
+        self.tweet_selectors = tweet_selectors
+
+    def __call__(self, driver):
+        return driver.execute_script(CLASSIFY_PAGE_JS, self.tweet_selectors, NO_RESULTS_SELECTORS,
+                                     ERROR_SELECTORS, RATE_LIMIT_MARKERS) or False
+
+def wait_for_page_ready(driver, timeout=15.0):
+    """
+    Waits once for whichever comes first instead of trying every tweet selector with
+    its own timeout. Returns (outcome, tweet_selector); a page that never settles is an "error".
+    """
+    try:
+        result = WebDriverWait(driver, timeout, poll_frequency=0.25).until(page_ready())
+    except TimeoutException:
+        return "error", None
+    return result["outcome"], result.get("selector")
+
+# Runs in the page: extracts every tweet plus the next-page link in a single round-trip.
+# Mirrors parse_nitter_page(), including the selector fallback order.
+EXTRACT_PAGE_JS = """
+const sel = arguments[0];
+const first = (root, selectors) => {
+    for (const s of selectors) {
+        const el = root.querySelector(s);
+        if (el) return el;
+    }
+    return null;
+};
+const tweets = [];
+for (const tweet of document.querySelectorAll(sel.tweet)) {
+    const contentEl = first(tweet, sel.content);
+    const usernameEl = first(tweet, sel.username);
+    const dateEl = first(tweet, sel.date);
+    const linkEl = first(tweet, sel.link);
+    const truncated = Array.from(tweet.querySelectorAll('a')).some(
+        a => sel.show_more.some(label => (a.textContent || '').includes(label)));
+    const stats = {};
+    for (const [key, iconSelector] of Object.entries(sel.stats)) {
+        const icon = tweet.querySelector(iconSelector);
+        let text = '';
+        if (icon) {
+            const sibling = icon.nextElementSibling;
+            text = (sibling && sibling.tagName === 'SPAN') ? sibling.textContent : icon.parentElement.textContent;
+        }
+        const digits = text.replace(/\\D/g, '');
+        stats[key] = digits ? parseInt(digits, 10) : 0;
+    }
+    tweets.push({
+        content: contentEl ? contentEl.innerText.trim() : '',
+        username: usernameEl ? usernameEl.innerText.trim().replace(/@/g, '') : '',
+        date: dateEl ? (dateEl.getAttribute('title') || dateEl.getAttribute('datetime') || dateEl.innerText.trim()) : '',
+        link: linkEl ? linkEl.href : '',
+        replies: stats.replies,
+        retweets: stats.retweets,
+        likes: stats.likes,
+        truncated: truncated
+    });
+}
+let next = null;
+for (const s of sel.next_page) {
+    const links = Array.from(document.querySelectorAll(s)).filter(a => a.getAttribute('href'));
+    if (!links.length) continue;
+    const withCursor = links.filter(a => a.getAttribute('href').includes('cursor'));
+    if (!withCursor.length && location.search.includes('cursor=')) break;
+    const candidate = (withCursor.length ? withCursor : links).slice(-1)[0];
+    if (candidate.offsetParent !== null) next = candidate.href;
+    break;
+}
+if (next === null) {
+    const more = Array.from(document.querySelectorAll('a')).filter(
+        a => (a.textContent || '').includes('Więcej') || (a.textContent || '').includes('More'));
+    if (more.length && more[more.length - 1].offsetParent !== null) next = more[more.length - 1].href;
+}
+// Bytes actually transferred for this page (0 for blocked and cached resources)
+let bytes = 0;
+for (const entry of performance.getEntriesByType('navigation').concat(performance.getEntriesByType('resource'))) {
+    bytes += entry.transferSize || 0;
+}
+return JSON.stringify({tweets: tweets, next: next, bytes: bytes});
+"""
+
+def extract_tweets_from_page(driver, tweet_selector):
+    """
+    Extracts all tweets on the current page with a single execute_script call.
+    Returns (tweets, next_page_url, transferred_bytes) with tweets in the same dict
+    format as parse_nitter_page(); the byte count comes from the Resource Timing API.
+    """
+    selectors = {
+        'tweet': tweet_selector,
+        'content': CONTENT_SELECTORS,
+        'username': USERNAME_SELECTORS,
+        'date': DATE_SELECTORS,
+        'stats': STAT_SELECTORS,
+        'link': LINK_SELECTORS,
+        'next_page': NEXT_PAGE_SELECTORS,
+        'show_more': SHOW_MORE_LABELS,
+    }
+    page = json.loads(driver.execute_script(EXTRACT_PAGE_JS, selectors))
+
+    tweets = []
+    for raw in page['tweets']:
+        content = raw['content']
+        if len(content) <= 5:
+            continue
+        tweets.append({
+            'username': raw['username'] or "Unknown",
+            'date': raw['date'] or "Unknown",
+            'content': content,
+            'interactions': raw['replies'] + raw['retweets'] + raw['likes'],
+            'replies': raw['replies'],
+            'retweets': raw['retweets'],
+            'likes': raw['likes'],
+            'link': raw['link'] or "None",
+            'truncated': raw['truncated']
+        })
+    return tweets, page['next'], page['bytes']
+
+def pause_before_page(url, page_num, page_delay=3.0, rate_limiter=None):
+    """
+    Paces page loads: through the instance's token bucket if a rate limiter is given,
+    otherwise with a random sleep between pages.
+    """
+    if rate_limiter is not None:
+        with METRICS.phase("sleep", instance=instance_from_url(url)):
+            rate_limiter.wait(url)
+    elif page_num > 1:
+        # Delay with randomness
+        sleep_time = random.uniform(page_delay, page_delay + 2.0)
+        print(f"Waiting {sleep_time:.1f} seconds before the next page...")
+        with METRICS.phase("sleep", instance=instance_from_url(url)):
+            STOP_EVENT.wait(sleep_time)
+
+def iter_selenium_pages(url, page_delay=3.0, pool=None, rate_limiter=None, page_timeout=15.0, lean=False):
+    """
+    Generator that loads Nitter search pages in Chrome, following the "Load more" links,
+    and yields the tweets of each page.
+    Uses automatic Chrome configuration (Selenium Manager).
+    If a BrowserPool is given, a warm browser is borrowed from it instead of starting a new one
+    (otherwise a browser is started, with the lean profile if lean=True).
+    If an InstanceRateLimiter is given, it paces the page loads instead of fixed random sleeps.
+    Each page gets `page_timeout` seconds to show tweets, a "no results" marker or an
+    error; error and rate-limit pages raise PageLoadError, and so does a browser that
+    cannot be started (an error, not an empty result).
+    With a page cache (see set_page_cache), cached pages are parsed instead of being
+    loaded, and the HTML of loaded pages is stored; the browser is only borrowed once
+    a page has to be loaded.
+    The browser is released as soon as the generator is exhausted or closed.
+    """
+    current_url = url
+    page_num = 1
+    own_pool = pool is None
+    if own_pool:
+        pool = BrowserPool(size=1, lean=lean)
+    driver = None
+    
+    try:
+        while True:
+            page = load_cached_page(current_url)
+            if page is None:
+                if driver is None:
                     try:
-                        show_more_button = tweet.find_element(
-                            By.XPATH, ".//a[contains(text(), 'Pokaż więcej') or contains(text(), 'Show more')]"
-                        )
-                        if show_more_button.is_displayed():
-                            driver.execute_script("arguments[0].click();", show_more_button)
-                            time.sleep(0.5)
-                    except NoSuchElementException:
-                        pass
+                        driver = pool.acquire()
                     except Exception as e:
-                        print(f"Warning: Error while trying to click 'Show more': {e}")
-                        
-                    # --- Data Fetching ---
-                    
-                    # Fetching tweet content
-                    content = "No content"
-                    content_selectors = [".tweet-content", ".content", ".tweet-text", "p.tweet-content", 
-                                       ".timeline-item-content", ".post-content"]
-                    for selector in content_selectors:
-                        try:
-                            content_elem = tweet.find_element(By.CSS_SELECTOR, selector)
-                            content = content_elem.text.strip()
-                            if content:
-                                break
-                        except:
-                            continue
-                            
-                    # Fetching username
-                    username = "Unknown"
-                    try:
-                        username_selectors = [".username", "a[href^='/']", ".tweet-name", ".tweet-header a"]
-                        for selector in username_selectors:
-                            try:
-                                username_elem = tweet.find_element(By.CSS_SELECTOR, selector)
-                                username = username_elem.text.strip().replace('@', '')
-                                if username: break
-                            except: continue
-                    except: pass
-                    
-                    # Fetching tweet date
-                    date = "Unknown"
-                    try:
-                        date_selectors = [".tweet-date a", "a[title*='20']", ".timestamp", "time", "time[datetime]"]
-                        for selector in date_selectors:
-                            try:
-                                date_elem = tweet.find_element(By.CSS_SELECTOR, selector)
-                                date = date_elem.get_attribute("title") or date_elem.get_attribute("datetime") or date_elem.text.strip()
-                                if date: break
-                            except: continue
-                    except: pass
-                    
-                    # Fetching interactions
-                    interactions = {'replies': 0, 'retweets': 0, 'likes': 0, 'total': 0}
-                    
-                    stat_selectors = [".tweet-stats .icon-comment + span", ".tweet-stats .icon-retweet + span", ".tweet-stats .icon-heart + span"]
-                    
-                    for key, selector in zip(['replies', 'retweets', 'likes'], stat_selectors):
-                        try:
-                            elem = tweet.find_element(By.CSS_SELECTOR, selector)
-                            text = elem.text.strip()
-                            text_num = ''.join(c for c in text if c.isdigit())
-                            if text_num:
-                                interactions[key] = int(text_num)
-                        except:
-                            continue
-                    
-                    # Calculate total interactions
-                    interactions['total'] = interactions['replies'] + interactions['retweets'] + interactions['likes']
-                    
-                    # Fetching tweet link
-                    link = "None"
-                    try:
-                        link_selectors = ["a[href*='/status/']"]
-                        for selector in link_selectors:
-                            try:
-                                link_elem = tweet.find_element(By.CSS_SELECTOR, selector)
-                                link_attr = link_elem.get_attribute("href")
-                                if link_attr:
-                                    if link_attr.startswith('/'):
-                                        base_url = "/".join(current_url.split('/')[:3])
-                                        link = base_url + link_attr
-                                    else:
-                                        link = link_attr
-                                    break
-                            except: continue
-                    except: pass
-                    
-                    # Add tweet to the list only if it has meaningful content
-                    if content != "No content" and len(content.strip()) > 5:
-                        tweet_data = {
-                            'username': username,
-                            'date': date,
-                            'content': content,
-                            'interactions': interactions['total'],
-                            'replies': interactions['replies'],
-                            'retweets': interactions['retweets'],
-                            'likes': interactions['likes'],
-                            'link': link
-                        }
-                        
-                        all_tweets.append(tweet_data)
-                        tweets_on_page += 1
-                        content_preview = clean_text(content)[:50] + "..." if len(content) > 50 else content
-                        print(f"Tweet #{len(all_tweets)}: {username} - {content_preview}")
-                    
+                        # Not an answer from the instance, so it must not count as "no results"
+                        print("Ensure Chrome is installed and up-to-date.")
+                        METRICS.count("page_errors", instance=instance_from_url(current_url), reason="browser_init")
+                        raise PageLoadError("error", f"Browser initialization error: {type(e).__name__} - {e}")
+                pause_before_page(current_url, page_num, page_delay, rate_limiter)
+                print(f"Opening page {page_num}: {current_url}")
+                instance = instance_from_url(current_url)
+                page_start = time.perf_counter()
+                try:
+                    with METRICS.phase("driver_get", instance=instance):
+                        driver.get(current_url)
+                    pool.count_page(driver)
+                    with METRICS.phase("wait_timeline", instance=instance):
+                        outcome, tweet_selector = wait_for_page_ready(driver, page_timeout)
+                except TimeoutException:
+                    METRICS.count("page_errors", instance=instance, reason="timeout")
+                    raise PageLoadError("error", f"Page load timeout exceeded for {current_url}")
+                except WebDriverException as e:
+                    METRICS.count("page_errors", instance=instance, reason=type(e).__name__)
+                    raise PageLoadError("error", f"Error while loading page: {e.msg}")
+                
+                if outcome == "empty":
+                    if _page_cache is not None:
+                        store_cached_page(current_url, driver.page_source)
+                    print("No tweets on this page, ending.")
+                    break
+                if outcome != "tweets":
+                    METRICS.count("page_errors", instance=instance, reason=outcome)
+                    raise PageLoadError(outcome, f"Instance answered with a {outcome.replace('_', '-')} page "
+                                                 f"(waited at most {page_timeout:.0f} s)")
+                print(f"Found tweets matching selector: {tweet_selector}")
+                
+                # Truncated ("Show more") tweets are only marked here; see hydrate_truncated_tweets()
+                try:
+                    with METRICS.phase("extract", instance=instance):
+                        page_tweets, next_url, page_bytes = extract_tweets_from_page(driver, tweet_selector)
                 except Exception as e:
-                    print(f"Error while processing tweet {i+1}: {type(e).__name__} - {e}")
-                    continue
-            
-            print(f"Fetched {tweets_on_page} tweets from this page. Total: {len(all_tweets)}/{max_tweets}")
+                    print(f"Error while extracting tweets: {type(e).__name__} - {e}")
+                    METRICS.count("page_errors", instance=instance, reason="extract")
+                    break
+                
+                page_seconds = time.perf_counter() - page_start
+                METRICS.observe("page_seconds", page_seconds, instance=instance)
+                METRICS.count("pages", instance=instance, engine="selenium")
+                METRICS.count("bytes", page_bytes, instance=instance)
+                METRICS.count("tweets_fetched", len(page_tweets), instance=instance)
+                if next_url == current_url:
+                    next_url = None
+                if _page_cache is not None:
+                    store_cached_page(current_url, driver.page_source, next_url)
+                page = TweetPage(page_tweets, current_url, next_url, page_seconds)
+            yield page
             
-            if tweets_on_page == 0 and len(all_tweets) > 0:
-                print("No new tweets found on this page, ending (might be a duplicate page).")
+            if not page.next_url:
+                print("Did not find a link to the next page, ending.")
                 break
             
-            if len(all_tweets) >= max_tweets:
-                print(f"Reached maximum number of tweets ({max_tweets}), ending.")
-                break
+            current_url = page.next_url
+            page_num += 1
+    
+    except PageLoadError:
+        raise
+    except Exception as e:
+        raise PageLoadError("error", f"An unexpected error occurred in Selenium: {type(e).__name__} - {e}")
+    
+    finally:
+        if own_pool:
+            pool.close()
+        elif driver is not None:
+            pool.release(driver)
+
+def scrape_nitter_with_selenium(url, max_tweets=100, page_delay=3.0, pool=None, rate_limiter=None,
+                                seen_index=None, query=None, lean=False):
+    """
+    Function to fetch tweets from Nitter using Selenium (see iter_selenium_pages).
+    If a SeenTweetIndex is given, paging stops at the first page made up only of known tweets.
+    With lean=True (and no pool), images, media and fonts are not downloaded.
+    """
+    selenium_pages = iter_selenium_pages(url, page_delay, pool, rate_limiter, lean=lean)
+    pages = iter_page_tweets(selenium_pages, max_tweets, seen_index, query, rate_limiter=rate_limiter)
+    return [tweet for page in pages for tweet in page]
+
+# --- HTTP ENGINE (no browser) ---
+
+class JavaScriptRequiredError(Exception):
+    """Raised when an instance answers with a page that only renders with JavaScript."""
+
+
+_http_session = None
+
+def get_http_session():
+    """
+    Returns a shared requests.Session with a connection pool, so consecutive
+    pages from the same instance reuse the same TCP/TLS connection.
+    """
+    global _http_session
+    if _http_session is None:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=16)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers.update({
+            "User-Agent": USER_AGENT,
+            "Accept": "text/html,application/xhtml+xml",
+            "Accept-Language": "en-US,en;q=0.9",
+        })
+        _http_session = session
+    return _http_session
+
+def _select_first(element, selectors):
+    """
+    Returns the first element matching any of the selectors (in order of preference).
+    """
+    for selector in selectors:
+        found = element.select_one(selector)
+        if found is not None:
+            return found
+    return None
+
+def _parse_stat(tweet, icon_selector):
+    """
+    Reads a counter next to a stat icon. Nitter renders either '<span icon></span> 12'
+    inside an .icon-container or a sibling <span>12</span>.
+    """
+    icon = tweet.select_one(icon_selector)
+    if icon is None:
+        return 0
+    sibling = icon.find_next_sibling("span")
+    text = sibling.get_text() if sibling is not None else icon.parent.get_text()
+    text_num = ''.join(c for c in text if c.isdigit())
+    return int(text_num) if text_num else 0
+
+def _find_next_page_url(soup, page_url):
+    """
+    Finds the "Load more" link. Pages after the first also carry a "Load newest"
+    link in .show-more, so links with a cursor are preferred. On the last page only
+    "Load newest" is left, which must not be followed back to the first page.
+    """
+    for selector in NEXT_PAGE_SELECTORS:
+        links = [a for a in soup.select(selector) if a.get("href")]
+        if not links:
+            continue
+        with_cursor = [a for a in links if 'cursor' in a["href"]]
+        if not with_cursor and 'cursor=' in page_url:
+            return None
+        return urljoin(page_url, (with_cursor or links)[-1]["href"])
+    return None
+
+def parse_nitter_page(html, page_url):
+    """
+    Parses a Nitter search page into the same tweet dicts the Selenium engine produces.
+    Returns (tweets, next_page_url, has_timeline).
+    """
+    soup = BeautifulSoup(html, HTML_PARSER)
+    tweets = []
+
+    tweet_elements = []
+    for selector in TWEET_SELECTORS:
+        tweet_elements = soup.select(selector)
+        if tweet_elements:
+            break
+
+    for tweet in tweet_elements:
+        content_elem = _select_first(tweet, CONTENT_SELECTORS)
+        if content_elem is None:
+            continue
+        for br in content_elem.find_all("br"):
+            br.replace_with("\n")
+        content = content_elem.get_text().strip()
+        if len(content) <= 5:
+            continue
+
+        username_elem = _select_first(tweet, USERNAME_SELECTORS)
+        username = username_elem.get_text().strip().replace('@', '') if username_elem else ""
+
+        date_elem = _select_first(tweet, DATE_SELECTORS)
+        date = "Unknown"
+        if date_elem is not None:
+            date = date_elem.get("title") or date_elem.get("datetime") or date_elem.get_text().strip() or "Unknown"
+
+        link_elem = _select_first(tweet, LINK_SELECTORS)
+        link = urljoin(page_url, link_elem["href"]) if link_elem and link_elem.get("href") else "None"
+
+        stats = {key: _parse_stat(tweet, selector) for key, selector in STAT_SELECTORS.items()}
+        truncated = any(label in a.get_text() for a in tweet.find_all("a") for label in SHOW_MORE_LABELS)
+
+        tweets.append({
+            'username': username or "Unknown",
+            'date': date,
+            'content': content,
+            'interactions': stats['replies'] + stats['retweets'] + stats['likes'],
+            'replies': stats['replies'],
+            'retweets': stats['retweets'],
+            'likes': stats['likes'],
+            'link': link,
+            'truncated': truncated
+        })
+
+    has_timeline = bool(tweet_elements) or soup.select_one(".timeline") is not None
+    return tweets, _find_next_page_url(soup, page_url), has_timeline
+
+def is_rate_limit_page(body):
+    """
+    Checks a response body (bytes) for the rate-limit notices some instances serve with HTTP 200.
+    """
+    body = body[:20000].lower()
+    return any(marker.encode() in body for marker in RATE_LIMIT_MARKERS)
+
+def parse_retry_after(value):
+    """
+    Seconds from a Retry-After header (only the delta-seconds form), or None.
+    """
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
+
+def iter_http_pages(url, page_delay=3.0, rate_limiter=None, page_timeout=15.0):
+    """
+    Generator that fetches Nitter search pages with plain HTTP requests (no browser),
+    following the "Load more" links, and yields the tweets of each page.
+    Error and rate-limit responses raise PageLoadError; JavaScriptRequiredError is
+    raised if the instance does not serve a static timeline.
+    With a page cache (see set_page_cache), cached pages are used instead of fetching
+    them and fetched pages are stored.
+    """
+    current_url = url
+    page_num = 1
+    session = get_http_session()
+
+    while True:
+        page = load_cached_page(current_url)
+        if page is None:
+            pause_before_page(current_url, page_num, page_delay, rate_limiter)
+            print(f"Fetching page {page_num}: {current_url}")
+            instance = instance_from_url(current_url)
+            page_start = time.perf_counter()
+            try:
+                with METRICS.phase("http_get", instance=instance):
+                    response = session.get(current_url, timeout=page_timeout)
+            except requests.exceptions.RequestException as e:
+                METRICS.count("page_errors", instance=instance, reason=type(e).__name__)
+                raise PageLoadError("error", f"Error while loading page: {e}")
+            METRICS.count("bytes", len(response.content), instance=instance)
+            if response.status_code >= 400:
+                rate_limited = response.status_code == 429 or is_rate_limit_page(response.content)
+                METRICS.count("page_errors", instance=instance, reason=str(response.status_code))
+                raise PageLoadError("rate_limited" if rate_limited else "error",
+                                    f"HTTP {response.status_code} for {current_url}",
+                                    parse_retry_after(response.headers.get("Retry-After")))
+
+            # Raw bytes let the parser honour <meta charset> when the header has none
+            with METRICS.phase("parse", instance=instance):
+                tweets, next_url, has_timeline = parse_nitter_page(response.content, current_url)
+
+            if not has_timeline:
+                if is_rate_limit_page(response.content):
+                    METRICS.count("page_errors", instance=instance, reason="rate_limited")
+                    raise PageLoadError("rate_limited", f"Rate-limit page from {current_url}")
+                METRICS.count("page_errors", instance=instance, reason="no_timeline")
+                if page_num == 1:
+                    raise JavaScriptRequiredError(f"No timeline markup in the response from {current_url}")
+                raise PageLoadError("error", f"No timeline markup in the response from {current_url}")
+
+            page_seconds = time.perf_counter() - page_start
+            METRICS.observe("page_seconds", page_seconds, instance=instance)
+            METRICS.count("pages", instance=instance, engine="http")
+            METRICS.count("tweets_fetched", len(tweets), instance=instance)
+
+            if next_url == current_url:
+                next_url = None
+            store_cached_page(current_url, response.content, next_url)
+            page = TweetPage(tweets, current_url, next_url, page_seconds)
+        yield page
+
+        if not page.next_url:
+            print("Did not find a link to the next page, ending.")
+            break
+
+        current_url = page.next_url
+        page_num += 1
+
+def scrape_nitter_with_http(url, max_tweets=100, page_delay=3.0, rate_limiter=None, seen_index=None, query=None):
+    """
+    Function to fetch tweets from Nitter with plain HTTP requests (see iter_http_pages).
+    Raises JavaScriptRequiredError if the instance does not serve a static timeline.
+    """
+    pages = iter_page_tweets(iter_http_pages(url, page_delay, rate_limiter), max_tweets, seen_index, query,
+                             rate_limiter=rate_limiter)
+    return [tweet for page in pages for tweet in page]
+
+# --- HYDRATION (full text of truncated tweets) ---
+
+def parse_status_content(html):
+    """
+    Returns the full text of the main tweet on a Nitter status page, or None.
+    """
+    soup = BeautifulSoup(html, HTML_PARSER)
+    content_elem = _select_first(soup, STATUS_CONTENT_SELECTORS)
+    if content_elem is None:
+        return None
+    for br in content_elem.find_all("br"):
+        br.replace_with("\n")
+    return content_elem.get_text().strip() or None
+
+def fetch_full_text(link, timeout=10.0, rate_limiter=None, registry=None):
+    """
+    Fetches a tweet's /status/ page over the pooled HTTP session (or from the page
+    cache, see set_page_cache) and returns its full text, or None if the tweet is gone.
+    Fetches are paced by the instance's token bucket when a rate limiter is given, and
+    their outcome is reported to it and to the registry like any other page load.
+    Error and rate-limit responses, and pages missing from a replayed cache, raise PageLoadError.
+    """
+    url = link.split('#', 1)[0]
+    if _page_cache is not None:
+        html = _page_cache.get(url)
+        if html is not None:
+            return parse_status_content(html)
+        if _page_cache.replay:
+            # Nothing was fetched, so the instance is not blamed; the tweet keeps its shortened text
+            raise PageLoadError("error", f"{url} is not in the page cache")
+    instance = instance_from_url(link)
+    if rate_limiter is not None:
+        with METRICS.phase("sleep", instance=instance):
+            rate_limiter.wait(instance)
+    start = time.monotonic()
+    try:
+        with METRICS.phase("hydrate_fetch", instance=instance):
+            response = get_http_session().get(url, timeout=timeout)
+        if response.status_code == 404:
+            return None
+        if response.status_code >= 400 or is_rate_limit_page(response.content):
+            rate_limited = response.status_code == 429 or is_rate_limit_page(response.content)
+            raise PageLoadError("rate_limited" if rate_limited else "error", f"HTTP {response.status_code} for {url}",
+                                parse_retry_after(response.headers.get("Retry-After")))
+    except requests.exceptions.RequestException as e:
+        error = PageLoadError("error", f"Error while loading {url}: {e}")
+    except PageLoadError as e:
+        error = e
+    else:
+        error = None
+    if error is not None:
+        if registry is not None:
+            registry.record_failure(instance, str(error), rate_limited=error.outcome == "rate_limited")
+        if rate_limiter is not None:
+            rate_limiter.record_failure(instance, error.retry_after)
+        raise error
+    if registry is not None:
+        registry.record_success(instance, (time.monotonic() - start) * 1000)
+    if rate_limiter is not None:
+        rate_limiter.record_success(instance)
+    store_cached_page(url, response.content)
+    return parse_status_content(response.content)
+
+def hydrate_truncated_tweets(tweets, max_workers=4, timeout=10.0, rate_limiter=None, registry=None):
+    """
+    Replaces the content of tweets marked as truncated ("Show more") with the full text
+    from their /status/ pages. The pages are fetched concurrently, at most `max_workers`
+    at a time, and share the instance's rate limit with the search pages (see
+    fetch_full_text); tweets whose page cannot be fetched keep the shortened text.
+    Returns the number of hydrated tweets.
+    """
+    pending = [tweet for tweet in tweets if tweet.get('truncated') and extract_status_id(tweet.get('link'))]
+    if not pending or max_workers <= 0:
+        return 0
+    hydrated = 0
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(pending))) as executor:
+        futures = [(executor.submit(fetch_full_text, tweet['link'], timeout, rate_limiter, registry), tweet)
+                   for tweet in pending]
+        for future, tweet in futures:
+            try:
+                full_text = future.result()
+            except PageLoadError as e:
+                print(f"Warning: Could not fetch the full text of {tweet['link']}: {e}")
+                METRICS.count("hydration_failures", instance=instance_from_url(tweet['link']), reason=e.outcome)
+                continue
+            if full_text:
+                tweet['content'] = full_text
+                tweet['truncated'] = False
+                hydrated += 1
+    METRICS.count("tweets_hydrated", hydrated)
+    print(f"Fetched the full text of {hydrated}/{len(pending)} truncated tweets.")
+    return hydrated
+
+
+# --- STREAMING PIPELINE ---
+
+def iter_instance_pages(url, max_tweets=100, page_delay=3.0, engine="selenium", pool=None, rate_limiter=None,
+                        seen_index=None, query=None, page_timeout=15.0, hydrate_workers=4, since=None, until=None,
+                        registry=None):
+    """
+    Streams the accepted tweets of one search URL page by page with the chosen engine.
+    With engine="http", Selenium is only used if the instance requires JavaScript.
+    When replaying a page cache, the pages come from iter_replay_pages whatever the engine.
+    """
+    if _page_cache is not None and _page_cache.replay:
+        replay_pages = iter_replay_pages(url, _page_cache)
+        yield from iter_page_tweets(replay_pages, max_tweets, seen_index, query, hydrate_workers, since, until,
+                                    rate_limiter, registry)
+        return
+    if engine == "http":
+        http_pages = iter_http_pages(url, page_delay, rate_limiter, page_timeout)
+        pages = iter_page_tweets(http_pages, max_tweets, seen_index, query, hydrate_workers, since, until,
+                                 rate_limiter, registry)
+        try:
+            first_page = next(pages, None)
+        except JavaScriptRequiredError as e:
+            print(f"{e}. Falling back to Selenium for this instance.")
+        else:
+            if first_page is not None:
+                yield first_page
+                yield from pages
+            return
+    selenium_pages = iter_selenium_pages(url, page_delay, pool, rate_limiter, page_timeout)
+    yield from iter_page_tweets(selenium_pages, max_tweets, seen_index, query, hydrate_workers, since, until,
+                                rate_limiter, registry)
+
+EMPTY_CONFIRMATIONS = 2
+MAX_CONTINUATIONS = 3
+
+def iter_tweet_pages(hashtag, max_tweets=100, page_delay=3.0, engine="selenium", pool=None,
+                     rate_limiter=None, registry=None, seen_index=None, start_url=None, hydrate_workers=4,
+                     since=None, until=None):
+    """
+    Streams the tweets for a hashtag page by page, trying different, dynamically fetched
+    Nitter instances until a working one is found.
+    With an InstanceRegistry, instances are tried in order of health score and every
+    attempt is recorded in it. With a SeenTweetIndex, paging stops at tweets collected by earlier runs.
+    With engine="http" pages are fetched without a browser; Selenium is only used
+    for instances that require JavaScript.
+    With a rate limiter, instances that fewer workers are using are tried first.
+    With start_url (a saved "Load more" cursor URL), scraping resumes from that page:
+    its own instance is tried first, then the same cursor on the other instances.
+    With since/until (dates), the search is limited to the days [since, until), both
+    through the search operators and by checking the dates of the fetched tweets.
+    A list of hashtags is searched as one OR query (see iter_batch_pages), usually with
+    max_tweets=None: paging then goes on until the caller stops it or the search runs out.
+    Every attempt ends as "success", "empty" (no results), "rate_limited" or "error".
+    Instances that answer "empty" are not penalized, and the search is given up once
+    EMPTY_CONFIRMATIONS instances agree that there are no results.
+    An instance that fails after some pages does not end the hashtag: paging continues
+    from the last cursor on the next instance (rate-limited instances are tried again
+    later, once their rate limiter allows it), up to MAX_CONTINUATIONS times.
+    Every page and failure is reported to the rate limiter's adaptive controller.
+    Once STOP_EVENT is set (Ctrl+C), no further page is handed out.
+    """
+    label = hashtag if isinstance(hashtag, str) else search_query(hashtag)
+    remaining = registry.ranked() if registry is not None else get_nitter_instances()
+    if start_url:
+        start_instance = instance_from_url(start_url)
+        remaining = [start_instance] + [instance for instance in remaining if instance != start_instance]
+    
+    cursor = start_url
+    total = 0
+    continuations = 0
+    attempt = 0
+    empty_answers = 0
+    while remaining and empty_answers < EMPTY_CONFIRMATIONS and not STOP_EVENT.is_set():
+        instance = rate_limiter.claim(remaining) if rate_limiter is not None else remaining[0]
+        remaining.remove(instance)
+        attempt += 1
+        if attempt > 1:
+            METRICS.count("instance_retries", hashtag=label)
+        print(f"\nAttempting to use instance: {instance}")
+        attempt_start = time.perf_counter()
+        outcome = "error"
+        if cursor:
+            base = urlparse(instance_base_url(instance))
+            search_url = urlparse(cursor)._replace(scheme=base.scheme, netloc=base.netloc).geturl()
+        else:
+            search_url = build_search_url(instance, hashtag, since, until)
+        fetched = 0
+        page_times = []
+        page_timeout = registry.page_timeout(instance) if registry is not None else 15.0
+        
+        try:
+            limit = None if max_tweets is None else max_tweets - total
+            for page in iter_instance_pages(search_url, limit, page_delay, engine, pool, rate_limiter,
+                                            seen_index, label, page_timeout, hydrate_workers, since, until,
+                                            registry):
+                if STOP_EVENT.is_set():
+                    outcome = "stopped"
+                    return
+                fetched += len(page)
+                total += len(page)
+                if page.seconds is not None:
+                    page_times.append(page.seconds)
+                if page.next_url:
+                    cursor = page.next_url
+                if rate_limiter is not None and page.seconds is not None:
+                    # Cached pages say nothing about the instance's rate limits
+                    rate_limiter.record_success(instance)
+                yield page
+            
+            if page_times or fetched:
+                outcome = "success"
+                print(f"Successfully fetched {fetched} tweets from instance {instance}")
+                if registry is not None:
+                    latency_ms = sum(page_times) / len(page_times) * 1000 if page_times else None
+                    registry.record_success(instance, latency_ms)
+                return
+            else:
+                outcome = "empty"
+                empty_answers += 1
+                print(f"No tweets for {search_query(hashtag)} on instance {instance}.")
                 
-            # Finding the link to the next page (More)
+        except PageLoadError as e:
+            outcome = e.outcome
+            if registry is not None:
+                registry.record_failure(instance, str(e), rate_limited=e.outcome == "rate_limited")
+            if rate_limiter is not None:
+                rate_limiter.record_failure(instance, e.retry_after)
+            if total and continuations >= MAX_CONTINUATIONS:
+                print(f"{e}. Keeping {total} tweets.")
+                return
+            if total:
+                continuations += 1
+                if e.outcome == "rate_limited":
+                    remaining.append(instance)
+                print(f"{e}. Continuing after {total} tweets from the last cursor.")
+                continue
+            print(f"{e}. Trying next instance.")
+            continue
+            
+        except Exception as e:
+            if registry is not None:
+                registry.record_failure(instance, f"{type(e).__name__}: {e}")
+            if rate_limiter is not None:
+                rate_limiter.record_failure(instance)
+            if fetched:
+                # Pages were already handed out; switching instances now would start over
+                print(f"Critical error while using instance {instance}: {e}. Keeping {fetched} tweets.")
+                return
+            print(f"Critical error while using instance {instance}: {e}. Trying next one.")
+            continue
+        
+        finally:
+            if rate_limiter is not None:
+                rate_limiter.release(instance)
+            METRICS.count("instance_attempts", instance=instance, outcome=outcome)
+            METRICS.event("instance_attempt", instance=instance, hashtag=label, outcome=outcome, tweets=fetched,
+                          seconds=round(time.perf_counter() - attempt_start, 3))
+
+def iter_tweets(hashtag, max_tweets=100, page_delay=3.0, engine="selenium", pool=None,
+                rate_limiter=None, registry=None, seen_index=None):
+    """
+    Generator version of try_different_nitter_instances: yields the tweets for a
+    hashtag one by one, fetching the next page only when needed.
+    """
+    for page in iter_tweet_pages(hashtag, max_tweets, page_delay, engine, pool, rate_limiter, registry, seen_index):
+        yield from page
+
+def try_different_nitter_instances(hashtag, max_tweets=100, page_delay=3.0, engine="selenium", pool=None,
+                                   rate_limiter=None, registry=None, seen_index=None):
+    """
+    Tries different, dynamically fetched Nitter instances until a working one is found
+    and returns all tweets for the hashtag as a list (see iter_tweet_pages).
+    """
+    return list(iter_tweets(hashtag, max_tweets, page_delay, engine, pool, rate_limiter, registry, seen_index))
+
+# --- TIME-WINDOW SHARDING ---
+
+class ShardPlanner:
+    """
+    Splits the days [since, until) into since:/until: windows, handed out newest first.
+    Each new window is sized from the tweet density seen so far, so that it holds about
+    `target` tweets. A window that fills up is cut at its oldest tweet; the older rest
+    is queued again as two halves, so dense ranges are spread over more instances.
+    Queued rests always come before new, older windows, and frontier() tells from which
+    day on the range has been scraped without gaps.
+    """
+    MAX_WINDOW_DAYS = 365
+
+    def __init__(self, since, until, initial_days=7, target=500):
+        self.since = since
+        self.until = until
+        self.window_days = max(1, initial_days)
+        self.target = target
+        self._cursor = until
+        self._queue = []
+        self._covered = []
+        self._tweets = 0
+        self._days = 0.0
+        self._lock = threading.Lock()
+
+    def next_window(self):
+        """
+        Returns the next (since, until) window, or None when the range is used up.
+        """
+        with self._lock:
+            if self._queue:
+                # Queued rests are newer than the cursor; the newest one goes first
+                self._queue.sort(key=lambda window: window[1])
+                return self._queue.pop()
+            if self._cursor <= self.since:
+                return None
+            start = max(self.since, self._cursor - timedelta(days=self.window_days))
+            window = (start, self._cursor)
+            self._cursor = start
+            return window
+
+    def report(self, window, tweets, oldest=None, full=False):
+        """
+        Feeds back how many tweets a window returned. For a window that hit its
+        limit (`full`), `oldest` is the date of its oldest tweet.
+        """
+        start, end = window
+        with self._lock:
+            covered_days = (end - start).days
+            # Days of the window that need no further scraping
+            covered = (start, end)
+            if full:
+                rest_end = min(end, oldest + timedelta(days=1)) if oldest is not None else end
+                covered = (rest_end, end)
+                if rest_end >= end:
+                    # The limit was reached within the newest day: scrape that day on its own
+                    rest_end = end - timedelta(days=1)
+                    self._queue.append((rest_end, end))
+                    covered = None
+                covered_days = max((end - rest_end).days, 1)
+                rest_days = (rest_end - start).days
+                if rest_days >= 2:
+                    middle = start + timedelta(days=rest_days // 2)
+                    self._queue += [(middle, rest_end), (start, middle)]
+                    METRICS.count("shard_splits")
+                elif rest_days == 1:
+                    self._queue.append((start, rest_end))
+            if covered is not None:
+                self._covered.append(covered)
+            self._tweets += tweets
+            self._days += covered_days
+            density = self._tweets / max(self._days, 1.0)
+            self.window_days = int(min(self.MAX_WINDOW_DAYS, max(1, self.target * 0.8 / max(density, 0.1))))
+
+    def report_failure(self, window):
+        """
+        Marks a window that could not be scraped. Its days stay a gap, so no windows
+        older than it are handed out any more.
+        """
+        with self._lock:
+            self._cursor = self.since
+            self._queue = [queued for queued in self._queue if queued[0] >= window[1]]
+
+    def frontier(self):
+        """
+        The oldest day from which on every day up to `until` has been fully scraped.
+        """
+        with self._lock:
+            frontier = self.until
+            for start, end in sorted(self._covered, key=lambda window: window[1], reverse=True):
+                if end < frontier:
+                    break
+                frontier = min(frontier, start)
+            return frontier
+
+def scrape_sharded(hashtag, since, until, shard_days=7, max_tweets=100, page_delay=3.0, engine="selenium",
+                   pool=None, rate_limiter=None, registry=None, seen_index=None, concurrency=1,
+                   hydrate_workers=4):
+    """
+    Scrapes one hashtag as many since:/until: date windows (see ShardPlanner) instead
+    of one long cursor chain. Up to `concurrency` windows are scraped at once; with a
+    rate limiter they land on different instances. Returns the merged tweets, deduplicated
+    by status ID and ordered newest first, as one TweetPage of at most max_tweets tweets.
+    Until then, the merged tweets are held in a TweetBuffer.
+    """
+    # Windows are sized so that `concurrency` of them together cover roughly max_tweets
+    planner = ShardPlanner(since, until, shard_days,
+                           target=min(500, max(50, max_tweets // max(1, concurrency))))
+    merged = TweetBuffer()
+    merged_keys = set()
+    # The day of every merged tweet, to cut the result at the frontier
+    merged_days = []
+
+    def scrape_window(window):
+        window_since, window_until = window
+        single_day = (window_until - window_since).days <= 1
+        # Single days cannot be split any further, so they are scraped to the end
+        limit = max_tweets if single_day else planner.target
+        tweets = []
+        for page in iter_tweet_pages(hashtag, limit, page_delay, engine, pool, rate_limiter, registry,
+                                     seen_index, hydrate_workers=hydrate_workers,
+                                     since=window_since, until=window_until):
+            tweets.extend(page)
+        return tweets, len(tweets) >= limit and not single_day
+
+    def contiguous_count():
+        frontier = planner.frontier()
+        return sum(1 for day in merged_days if day >= frontier)
+
+    print(f"Sharding #{hashtag} from {since} to {until} (initial windows of {planner.window_days} days)")
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        running = {}
+
+        def schedule():
+            # Only tweets newer than the frontier count; every running window may still bring planner.target
+            covered = contiguous_count()
+            while (len(running) < max(1, concurrency) and not STOP_EVENT.is_set()
+                   and covered + len(running) * planner.target < max_tweets):
+                window = planner.next_window()
+                if window is None:
+                    break
+                METRICS.count("shard_windows", hashtag=hashtag)
+                running[executor.submit(scrape_window, window)] = window
+
+        schedule()
+        while running:
             try:
-                next_page_selectors = [".show-more a", "a.more-results", "a[href*='cursor']"]
-                next_page = None
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            except BaseException:
+                stop_workers(executor, running)
+                raise
+            for future in finished:
+                window = running.pop(future)
+                try:
+                    tweets, full = future.result()
+                except Exception as e:
+                    print(f"Error while scraping window {window[0]}..{window[1]} of #{hashtag}: {e}. "
+                          f"Older windows are not scraped.")
+                    planner.report_failure(window)
+                    continue
+                dates = [tweet.get('posted_at') or parse_nitter_date(tweet['date']) for tweet in tweets]
+                for tweet, posted in zip(tweets, dates):
+                    key = tweet.get('status_id') or tweet.get('link')
+                    if key not in merged_keys:
+                        merged_keys.add(key)
+                        merged.extend(hashtag, [tweet])
+                        merged_days.append(posted.date() if posted is not None else window[0])
+                known = [d for d in dates if d is not None]
+                oldest = min(known).date() if known else None
+                planner.report(window, len(tweets), oldest, full)
+                print(f"Window {window[0]}..{window[1]} of #{hashtag}: {len(tweets)} tweets"
+                      f"{' (full, splitting the rest)' if full else ''}. Unique so far: {len(merged)}")
+            schedule()
+
+    # Tweets older than the frontier may have gaps before them, so they are left out
+    frontier = planner.frontier()
+    order = sorted((i for i, day in enumerate(merged_days) if day >= frontier),
+                   key=merged.status_ids.__getitem__, reverse=True)
+    if frontier > since and len(order) < max_tweets:
+        print(f"Only the days from {frontier} on could be scraped without gaps for #{hashtag}.")
+    return TweetPage([merged.tweet(i) for i in order[:max_tweets]])
+
+# --- BATCHED OR QUERIES ---
+
+HASHTAG_RE = re.compile(r'#(\w+)')
+
+def assign_hashtags(tweet, wanted):
+    """
+    Returns the hashtags of `wanted` (lowercase tag -> hashtag) that appear in the tweet's text.
+    """
+    tags = {tag.lower() for tag in HASHTAG_RE.findall(tweet.get('content') or "")}
+    return [wanted[tag] for tag in tags if tag in wanted]
+
+def iter_batch_pages(hashtags, limits, page_delay=3.0, engine="selenium", pool=None, rate_limiter=None,
+                     registry=None, seen_index=None, start_url=None, hydrate_workers=4, since=None, until=None):
+    """
+    Scrapes several hashtags with one "#a OR #b ..." search and assigns every tweet
+    to each of the hashtags that appear in its text, so a tweet fetched once can land
+    in several per-hashtag outputs. `limits` gives the max_tweets quota of each hashtag;
+    tweets are only assigned while their hashtag is below its quota, and paging stops
+    once every quota is met (or the search runs out, or on Ctrl+C). Fetched tweets are not
+    capped: tweets that only match full hashtags, or none, must not use up the pages a
+    rarer hashtag still needs.
+    Yields one {hashtag: TweetPage} dict per page. A hashtag's page has next_url=None
+    once it is complete, so checkpoints mark it as done; the other pages carry the
+    cursor of the OR query. With a SeenTweetIndex, tweets are marked as known per
+    hashtag and paging stops at a page on which every assigned tweet is known.
+    """
+    wanted = {hashtag.lower(): hashtag for hashtag in hashtags}
+    counts = {hashtag: 0 for hashtag in hashtags}
+    pages = iter_tweet_pages(list(hashtags), None, page_delay, engine, pool, rate_limiter,
+                             registry, None, start_url, hydrate_workers, since, until)
+    try:
+        for page in pages:
+            assigned = {hashtag: [] for hashtag in hashtags}
+            for tweet in page:
+                matched = assign_hashtags(tweet, wanted)
+                if not matched:
+                    # e.g. the hashtag is only in a quoted tweet or the cut-off part of the text
+                    METRICS.count("tweets_unassigned")
+                for hashtag in matched:
+                    if counts[hashtag] < limits[hashtag]:
+                        assigned[hashtag].append(dict(tweet))
+                        counts[hashtag] += 1
+
+            page_fully_known = False
+            if seen_index is not None:
+                for hashtag, tweets in assigned.items():
+                    known = seen_index.known(hashtag, [t['status_id'] for t in tweets if t['status_id'] is not None])
+                    for tweet in tweets:
+                        tweet['known'] = tweet['status_id'] in known
+                stored = [tweet for tweets in assigned.values() for tweet in tweets]
+                page_fully_known = bool(stored) and all(tweet['known'] for tweet in stored)
+
+            complete = all(counts[hashtag] >= limits[hashtag] for hashtag in hashtags)
+            next_url = None if complete or page_fully_known else page.next_url
+            yield {
+                hashtag: TweetPage(tweets, page.url, next_url if counts[hashtag] < limits[hashtag] else None,
+                                   page.seconds)
+                for hashtag, tweets in assigned.items()
+            }
+            print("Per-hashtag totals: " + ", ".join(f"#{h} {counts[h]}/{limits[h]}" for h in hashtags))
+
+            if page_fully_known:
+                print("All tweets on this page were collected by an earlier run, ending.")
+                break
+            if complete:
+                print("Every hashtag in the batch reached its maximum number of tweets, ending.")
+                break
+    finally:
+        pages.close()
+
+def scrape_multiple_hashtags(hashtags, max_tweets=100, delay=5.0, page_delay=3.0, engine="selenium",
+                             browser_pool_size=None, driver_max_pages=50, concurrency=1, registry=None,
+                             seen_index=None, writer=None, sample_size=5, checkpoint=None, lean_browser=False,
+                             hydrate_workers=4, since=None, until=None, shard_days=None, batch_size=None,
+                             adaptive_rate=True):
+    """
+    Fetches tweets for multiple hashtags.
+    Without a writer, the full list of tweets is returned for every hashtag. With a
+    TweetStreamWriter (see OUTPUT_WRITERS), every page is written (and recorded in the seen-tweet index) as
+    soon as it arrives, and only the first `sample_size` tweets per hashtag are kept.
+    With a RunCheckpoint, progress is saved after every written page and hashtags
+    continue from their saved cursor.
+    All Selenium scraping in the batch shares one pool of long-lived browsers
+    (using the lean profile with lean_browser=True).
+    The instance list is resolved once per batch (through `registry` if given).
+    With concurrency > 1 hashtags are scraped in parallel by a thread pool.
+    With adaptive_rate, page loads are paced per instance by token buckets whose rate
+    adapts to the instance's answers (see InstanceRateLimiter); without it, the random
+    `delay`/`page_delay` sleeps are used (and fixed-rate buckets with concurrency > 1).
+    since/until limit the search to the days [since, until). With shard_days, each hashtag
+    is instead split into date windows scraped in parallel (see scrape_sharded); hashtags
+    then run one after another and the merged result is written at once.
+    With batch_size, hashtags are scraped in groups of up to batch_size with one OR query
+    per group (see iter_batch_pages); max_tweets then applies to each hashtag of a group.
+    On Ctrl+C the worker threads are stopped (see STOP_EVENT) and joined before the
+    KeyboardInterrupt is passed on, so the writer can be closed safely.
+    """
+    STOP_EVENT.clear()
+    if isinstance(hashtags, str):
+        hashtags = [hashtags]
+    if browser_pool_size is None:
+        browser_pool_size = concurrency
+    if registry is None:
+        registry = InstanceRegistry()
+        registry.refresh()
+    
+    all_results = {}
+    rate_limiter = make_rate_limiter(page_delay, concurrency, registry, adaptive_rate)
+    
+    def store_page(hashtag, page, tweets):
+        """
+        Writes one page of a hashtag (with a writer) or collects it; adds the tweets kept to `tweets`.
+        """
+        if writer is None:
+            tweets.extend(page)
+            return
+        writer.write_page(hashtag, page)
+        if checkpoint is not None:
+            checkpoint.record_page(hashtag, page, writer)
+        if seen_index is not None:
+            seen_index.add(hashtag, [tweet['status_id'] for tweet in page])
+        tweets.extend(page[:max(0, sample_size - len(tweets))])
+    
+    def scrape_batch(i, batch):
+        print(f"\n{'='*60}")
+        print(f"Starting fetch for hashtags: {search_query(batch)} (batch {i+1}/{len(batches)})")
+        print(f"{'='*60}")
+        
+        tweets = {hashtag: [] for hashtag in batch}
+        fetched = {hashtag: 0 for hashtag in batch}
+        limits = {hashtag: max_tweets for hashtag in batch}
+        start_url = None
+        if checkpoint is not None:
+            states = [checkpoint.state(hashtag) for hashtag in batch]
+            limits = {hashtag: max_tweets - state["tweet_count"] for hashtag, state in zip(batch, states)}
+            cursors = {state["cursor"] for state in states}
+            cursor = cursors.pop() if len(cursors) == 1 else None
+            if cursor and cursor_matches_query(cursor, batch, since, until):
+                start_url = cursor
+                print(f"Resuming {search_query(batch)} from {start_url}")
+        try:
+            for pages in iter_batch_pages(batch, limits, page_delay, engine, pool, rate_limiter, registry,
+                                          seen_index, start_url, hydrate_workers, since, until):
+                for hashtag, page in pages.items():
+                    fetched[hashtag] += len(page)
+                    store_page(hashtag, page, tweets[hashtag])
+            for hashtag in batch:
+                if fetched[hashtag]:
+                    print(f"✅ Successfully fetched {fetched[hashtag]} tweets for #{hashtag}")
+                else:
+                    print(f"❌ Failed to fetch tweets for #{hashtag}")
+        except Exception as e:
+            print(f"Error while fetching tweets for {search_query(batch)}: {e}")
+        return tweets
+    
+    def scrape_hashtag(i, hashtag):
+        print(f"\n{'='*60}")
+        print(f"Starting fetch for hashtag: #{hashtag} ({i+1}/{len(hashtags)})")
+        print(f"{'='*60}")
+        
+        tweets = []
+        fetched = 0
+        start_url = None
+        limit = max_tweets
+        if checkpoint is not None:
+            state = checkpoint.state(hashtag)
+            if checkpoint.finished(hashtag):
+                print(f"#{hashtag} was already completed by the checkpointed run, skipping.")
+                return []
+            start_url = state["cursor"]
+            limit = max_tweets - state["tweet_count"]
+            if start_url and not cursor_matches_query(start_url, hashtag, since, until):
+                # e.g. the cursor of an OR query from a batched run
+                print(f"The saved cursor of #{hashtag} belongs to another search, starting over.")
+                start_url = None
+            if start_url:
+                print(f"Resuming #{hashtag} after {state['tweet_count']} tweets from {start_url}")
+        try:
+            if shard_days:
+                merged = scrape_sharded(hashtag, since, until or date.today() + timedelta(days=1), shard_days,
+                                        limit, page_delay, engine, pool, rate_limiter, registry, seen_index,
+                                        concurrency, hydrate_workers)
+                # The merge has no cursor to resume from: after Ctrl+C it is dropped and --resume starts over
+                pages = [] if STOP_EVENT.is_set() else [merged]
+            else:
+                pages = iter_tweet_pages(
+                    hashtag, 
+                    limit, 
+                    page_delay,
+                    engine,
+                    pool,
+                    rate_limiter,
+                    registry,
+                    seen_index,
+                    start_url,
+                    hydrate_workers,
+                    since,
+                    until
+                )
+            for page in pages:
+                fetched += len(page)
+                store_page(hashtag, page, tweets)
+            
+            if STOP_EVENT.is_set():
+                print(f"Stopped #{hashtag} after {fetched} tweets.")
+            elif fetched:
+                print(f"✅ Successfully fetched {fetched} tweets for #{hashtag}")
+            else:
+                print(f"❌ Failed to fetch tweets for #{hashtag}")
                 
-                for selector in next_page_selectors:
-                    try:
-                        next_page_elements = driver.find_elements(By.CSS_SELECTOR, selector)
-                        if next_page_elements:
-                            next_page = next_page_elements[0]
-                            break
-                    except: continue
+        except Exception as e:
+            print(f"Error while fetching tweets for #{hashtag}: {e}")
+        return tweets
+    
+    batches = []
+    if batch_size and not shard_days:
+        batches = [hashtags[start:start + batch_size] for start in range(0, len(hashtags), batch_size)]
+    
+    with BrowserPool(size=browser_pool_size, max_pages_per_driver=driver_max_pages, lean=lean_browser) as pool:
+        if batches and concurrency > 1:
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                futures = [executor.submit(scrape_batch, i, batch) for i, batch in enumerate(batches)]
+                try:
+                    for future in futures:
+                        all_results.update(future.result())
+                except BaseException:
+                    stop_workers(executor, futures)
+                    raise
+        elif batches:
+            for i, batch in enumerate(batches):
+                all_results.update(scrape_batch(i, batch))
+                if i < len(batches) - 1 and rate_limiter is None:
+                    sleep_time = random.uniform(delay, delay + 3.0)
+                    print(f"Waiting {sleep_time:.1f} seconds before the next batch...")
+                    time.sleep(sleep_time)
+        elif concurrency > 1 and not shard_days:
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                futures = [executor.submit(scrape_hashtag, i, hashtag) for i, hashtag in enumerate(hashtags)]
+                try:
+                    for hashtag, future in zip(hashtags, futures):
+                        all_results[hashtag] = future.result()
+                except BaseException:
+                    # Ctrl+C: the workers must be done before the caller closes the writer
+                    stop_workers(executor, futures)
+                    raise
+        else:
+            for i, hashtag in enumerate(hashtags):
+                all_results[hashtag] = scrape_hashtag(i, hashtag)
+                
+                # Delay between hashtags
+                if i < len(hashtags) - 1 and rate_limiter is None:
+                    sleep_time = random.uniform(delay, delay + 3.0)
+                    print(f"Waiting {sleep_time:.1f} seconds before the next hashtag...")
+                    time.sleep(sleep_time)
+    
+    if adaptive_rate:
+        print_page_rates(rate_limiter)
+    return all_results
+
+# --- CHECKPOINTS (resumable runs) ---
+
+class RunCheckpoint:
+    """
+    JSON checkpoint of a streaming run, rewritten after every page. For each hashtag
+    it records the next page URL (cursor), the instance, the number of tweets written
+    and the byte offset of the output file after the last complete page.
+    """
+    def __init__(self, path, data):
+        self.path = path
+        self.data = data
+        self._lock = threading.Lock()
+
+    @classmethod
+    def create(cls, state_dir, writer, hashtags, max_tweets):
+        path = os.path.join(state_dir, "checkpoints", f"{writer.prefix}_{writer.timestamp}.json")
+        data = {
+            "format": writer.extension,
+            "prefix": writer.prefix,
+            "output_dir": writer.output_dir,
+            "timestamp": writer.timestamp,
+            "max_tweets": max_tweets,
+            "next_id": writer.next_id,
+            "hashtags": {hashtag: {"cursor": None, "instance": None, "tweet_count": 0, "row_count": 0,
+                                   "output_path": None, "output_offset": 0, "done": False}
+                         for hashtag in hashtags},
+        }
+        checkpoint = cls(path, data)
+        checkpoint.save()
+        return checkpoint
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding='utf-8') as f:
+            return cls(path, json.load(f))
+
+    @staticmethod
+    def find_latest(state_dir, prefix=None):
+        """
+        Returns the newest checkpoint file (optionally for a filename prefix), or None.
+        """
+        directory = os.path.join(state_dir, "checkpoints")
+        if not os.path.isdir(directory):
+            return None
+        candidates = [
+            os.path.join(directory, name) for name in os.listdir(directory)
+            if name.endswith(".json") and (prefix is None or name.startswith(f"{prefix}_"))
+        ]
+        return max(candidates, key=os.path.getmtime) if candidates else None
+
+    def open_writer(self, only_new=False):
+        """
+        Returns a writer that continues the checkpointed output files.
+        """
+        writer = make_output_writer(self.data.get("format", "csv"), self.data["output_dir"],
+                                    self.data["prefix"], only_new)
+        writer.timestamp = self.data["timestamp"]
+        writer.next_id = self.data["next_id"]
+        for hashtag, state in self.data["hashtags"].items():
+            if state["output_path"] and os.path.exists(state["output_path"]):
+                writer.resume_file(hashtag, state["output_path"], state["output_offset"], state["row_count"])
+        return writer
+
+    def state(self, hashtag):
+        return self.data["hashtags"][hashtag]
+
+    def verify(self):
+        """
+        Checks the output file of every hashtag against its checkpointed row count (see
+        TweetStreamWriter.output_intact) before the checkpoint is trusted. A hashtag whose
+        file is missing or lost rows, done or not, starts over. Returns the hashtags reset.
+        """
+        writer_class = OUTPUT_WRITERS[self.data.get("format", "csv")]
+        reset = []
+        with self._lock:
+            for hashtag, state in self.data["hashtags"].items():
+                if not state["row_count"]:
+                    continue
+                if state["output_path"] and writer_class.output_intact(state["output_path"], state["output_offset"],
+                                                                        state["row_count"]):
+                    continue
+                print(f"The output of #{hashtag} does not hold the {state['row_count']} rows recorded in the "
+                      f"checkpoint, scraping it again.")
+                state.update(cursor=None, instance=None, tweet_count=0, row_count=0, output_path=None,
+                             output_offset=0, done=False)
+                reset.append(hashtag)
+            if reset:
+                self._save_locked()
+        return reset
+
+    def finished(self, hashtag):
+        """
+        Whether a hashtag needs no more pages: it is marked done, or its last recorded page
+        had no next page. Starting it over would append its first pages to the file again.
+        """
+        state = self.state(hashtag)
+        return state["done"] or (state["cursor"] is None and state["tweet_count"] > 0)
+
+    def pending(self):
+        return [hashtag for hashtag in self.data["hashtags"] if not self.finished(hashtag)]
+
+    def record_page(self, hashtag, page, writer):
+        """
+        Stores the progress of a hashtag after one of its pages has been written and flushed.
+        """
+        with self._lock:
+            state = self.state(hashtag)
+            state["cursor"] = page.next_url
+            state["instance"] = instance_from_url(page.url) if page.url else None
+            state["tweet_count"] += len(page)
+            state["output_path"] = writer.paths.get(hashtag)
+            state["output_offset"] = writer.offsets.get(hashtag, 0)
+            state["row_count"] = writer.row_counts.get(hashtag, 0)
+            state["done"] = page.next_url is None or state["tweet_count"] >= self.data["max_tweets"]
+            self.data["next_id"] = writer.next_id
+            self._save_locked()
+
+    def save(self):
+        with self._lock:
+            self._save_locked()
+
+    def _save_locked(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.data, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def remove(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+# --- JOB QUEUE (distributed workers) ---
+
+class JobQueue:
+    """
+    Durable SQLite queue of scraping jobs (a hashtag, optionally limited to a
+    since/until window) shared by workers on several machines. Workers lease a job
+    for `lease_seconds`, keep extending the lease while they work and acknowledge it
+    when done. Leases that expire (a crashed or stuck worker) are put back in the
+    queue, up to MAX_ATTEMPTS leases per job. The cursor of the last written page is
+    stored with the job, so a re-queued job continues where its previous worker stopped.
+    """
+    MAX_ATTEMPTS = 3
+
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # Transactions are managed by hand (BEGIN IMMEDIATE), so leasing is atomic across processes.
+        # The default rollback journal is kept: WAL does not work on network filesystems.
+        self._conn = sqlite3.connect(path, timeout=60, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._transaction():
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                " id INTEGER PRIMARY KEY AUTOINCREMENT, hashtag TEXT NOT NULL, since TEXT, until TEXT,"
+                " max_tweets INTEGER NOT NULL, state TEXT NOT NULL DEFAULT 'pending', worker TEXT,"
+                " lease_expires REAL, attempts INTEGER NOT NULL DEFAULT 0, cursor TEXT,"
+                " tweet_count INTEGER NOT NULL DEFAULT 0, error TEXT, created REAL NOT NULL, finished REAL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state, id)")
+
+    @contextmanager
+    def _transaction(self):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def enqueue(self, hashtag, max_tweets, since=None, until=None):
+        """
+        Adds a job unless the same query is already pending or running. Returns the job ID, or None.
+        """
+        since = since.isoformat() if since else None
+        until = until.isoformat() if until else None
+        with self._transaction():
+            duplicate = self._conn.execute(
+                "SELECT id FROM jobs WHERE hashtag = ? AND since IS ? AND until IS ? AND state IN ('pending', 'leased')",
+                (hashtag, since, until)
+            ).fetchone()
+            if duplicate:
+                return None
+            cursor = self._conn.execute(
+                "INSERT INTO jobs (hashtag, since, until, max_tweets, created) VALUES (?, ?, ?, ?, ?)",
+                (hashtag, since, until, max_tweets, time.time())
+            )
+            return cursor.lastrowid
 
-                if not next_page:
-                    try:
-                        next_page_elements = driver.find_elements(By.XPATH, "//a[contains(text(), 'Więcej') or contains(text(), 'More')]")
-                        if next_page_elements:
-                            next_page = next_page_elements[-1]
-                    except: pass
-                
-                if next_page and next_page.is_displayed():
-                    next_url = next_page.get_attribute("href")
-                    if next_url and next_url != current_url:
-                        current_url = next_url
-                        page_num += 1
-                        
-                        # Delay with randomness
-                        sleep_time = random.uniform(page_delay, page_delay + 2.0)
-                        print(f"Found link to the next page. Waiting {sleep_time:.1f} seconds...")
-                        time.sleep(sleep_time)
-                        continue
-                        
-                print("Did not find a link to the next page, ending.")
-                break
-                
-            except Exception as e:
-                print(f"Error while searching for the next page link: {type(e).__name__} - {e}")
-                break
-    
-    except Exception as e:
-        print(f"An unexpected error occurred in Selenium: {type(e).__name__} - {e}")
-    
-    finally:
-        if 'driver' in locals():
-            print("Closing browser...")
-            driver.quit()
-    
-    return all_tweets
+    def _requeue_expired(self, now):
+        cursor = self._conn.execute(
+            "UPDATE jobs SET state = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END,"
+            " worker = NULL, lease_expires = NULL, error = 'lease expired'"
+            " WHERE state = 'leased' AND lease_expires < ?",
+            (self.MAX_ATTEMPTS, now)
+        )
+        if cursor.rowcount:
+            print(f"Re-queued {cursor.rowcount} job(s) with an expired lease")
+            METRICS.count("leases_expired", cursor.rowcount)
+
+    def lease(self, worker, lease_seconds=300):
+        """
+        Leases the oldest pending job to `worker`. Returns the job as a dict, or None if nothing is pending.
+        """
+        now = time.time()
+        with self._transaction():
+            self._requeue_expired(now)
+            row = self._conn.execute("SELECT * FROM jobs WHERE state = 'pending' ORDER BY id LIMIT 1").fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE jobs SET state = 'leased', worker = ?, lease_expires = ?, attempts = attempts + 1"
+                " WHERE id = ?",
+                (worker, now + lease_seconds, row["id"])
+            )
+        job = dict(row)
+        job["since"] = date.fromisoformat(job["since"]) if job["since"] else None
+        job["until"] = date.fromisoformat(job["until"]) if job["until"] else None
+        return job
+
+    def _update_leased(self, sql, params, job_id, worker):
+        with self._transaction():
+            cursor = self._conn.execute(sql + " WHERE id = ? AND worker = ? AND state = 'leased'",
+                                        (*params, job_id, worker))
+            return cursor.rowcount == 1
+
+    def heartbeat(self, job_id, worker, lease_seconds=300):
+        """
+        Extends a lease. Returns False if the worker no longer holds it (it expired and was re-queued).
+        """
+        return self._update_leased("UPDATE jobs SET lease_expires = ?", (time.time() + lease_seconds,),
+                                   job_id, worker)
+
+    def record_progress(self, job_id, worker, cursor, tweet_count, lease_seconds=300):
+        """
+        Stores the next-page cursor and tweet count after a written page (and extends the lease).
+        """
+        return self._update_leased(
+            "UPDATE jobs SET cursor = ?, tweet_count = ?, lease_expires = ?",
+            (cursor, tweet_count, time.time() + lease_seconds), job_id, worker
+        )
+
+    def ack(self, job_id, worker):
+        return self._update_leased("UPDATE jobs SET state = 'done', lease_expires = NULL, finished = ?",
+                                   (time.time(),), job_id, worker)
+
+    def release(self, job_id, worker):
+        """
+        Gives an interrupted job back to the queue without counting the lease as an attempt.
+        """
+        return self._update_leased(
+            "UPDATE jobs SET state = 'pending', worker = NULL, lease_expires = NULL, attempts = attempts - 1,"
+            " error = 'interrupted'", (), job_id, worker
+        )
 
-def try_different_nitter_instances(hashtag, max_tweets=100, page_delay=3.0):
+    def fail(self, job_id, worker, error):
+        """
+        Gives a job back after an error; it is retried until it has been leased MAX_ATTEMPTS times.
+        """
+        return self._update_leased(
+            "UPDATE jobs SET state = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END,"
+            " worker = NULL, lease_expires = NULL, error = ?",
+            (self.MAX_ATTEMPTS, error), job_id, worker
+        )
+
+    def counts(self):
+        with self._lock:
+            rows = self._conn.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state").fetchall()
+        return {state: count for state, count in rows}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+def enqueue_jobs(job_queue, hashtags, max_tweets=100, since=None, until=None, shard_days=None):
     """
-    Tries different, dynamically fetched Nitter instances until a working one is found.
+    Coordinator side: adds one job per hashtag, or with shard_days one job per
+    window of shard_days days between since and until. Returns the number of new jobs.
     """
-    instances = get_nitter_instances()
-    all_tweets = []
-    
-    for instance in instances:
-        print(f"\nAttempting to use instance: {instance}")
-        search_url = f"https://{instance}/search?f=tweets&q=%23{hashtag}"
-        
-        try:
-            tweets = scrape_nitter_with_selenium(search_url, max_tweets, page_delay)
-            
-            if tweets:
-                print(f"Successfully fetched {len(tweets)} tweets from instance {instance}")
-                all_tweets = tweets
-                break
-            else:
-                print(f"Failed to fetch tweets from instance {instance}. Trying next one.")
-                
-        except Exception as e:
-            print(f"Critical error while using instance {instance}: {e}. Trying next one.")
-            continue
-    
-    return all_tweets
+    added = 0
+    for hashtag in hashtags:
+        windows = [(since, until)]
+        if shard_days:
+            end = until or date.today() + timedelta(days=1)
+            windows = []
+            window_since = since
+            while window_since < end:
+                window_until = min(window_since + timedelta(days=shard_days), end)
+                windows.append((window_since, window_until))
+                window_since = window_until
+        for window_since, window_until in windows:
+            if job_queue.enqueue(hashtag, max_tweets, window_since, window_until) is not None:
+                added += 1
+    return added
 
-def scrape_multiple_hashtags(hashtags, max_tweets=100, delay=5.0, page_delay=3.0):
+def print_queue_status(job_queue):
+    counts = job_queue.counts()
+    states = ("pending", "leased", "done", "failed")
+    print("Job queue: " + ", ".join(f"{state} {counts.get(state, 0)}" for state in states))
+
+def run_queue_worker(job_queue, worker_id, writer, lease_seconds=300, page_delay=3.0, engine="selenium",
+                     browser_pool_size=None, driver_max_pages=50, concurrency=1, registry=None, seen_index=None,
+                     lean_browser=False, hydrate_workers=4, adaptive_rate=True):
     """
-    Fetches tweets for multiple hashtags
+    Worker side: leases jobs from the queue until none are pending and scrapes each
+    one with iter_tweet_pages, writing every page through `writer`. A heartbeat thread
+    extends the lease while a job runs; if the lease is lost anyway, the job is
+    abandoned (another worker owns it now). With concurrency > 1, that many jobs run
+    at once, sharing one browser pool and per-instance rate limits (adaptive unless
+    adaptive_rate=False, see scrape_multiple_hashtags).
+    On Ctrl+C the running jobs stop after their current page and are given back to
+    the queue (their cursor is kept), and the threads are joined before the
+    KeyboardInterrupt is passed on.
+    Returns the number of completed jobs.
     """
-    if isinstance(hashtags, str):
-        hashtags = [hashtags]
-    
-    all_results = {}
-    
-    for i, hashtag in enumerate(hashtags):
+    STOP_EVENT.clear()
+    if browser_pool_size is None:
+        browser_pool_size = concurrency
+    if registry is None:
+        registry = InstanceRegistry()
+        registry.refresh()
+    rate_limiter = make_rate_limiter(page_delay, concurrency, registry, adaptive_rate)
+    completed = []
+
+    def run_job(job, pool):
+        window = f" {job['since'] or '...'}..{job['until'] or '...'}" if job["since"] or job["until"] else ""
         print(f"\n{'='*60}")
-        print(f"Starting fetch for hashtag: #{hashtag} ({i+1}/{len(hashtags)})")
+        print(f"[{worker_id}] Job {job['id']}: #{job['hashtag']}{window} (attempt {job['attempts'] + 1})")
         print(f"{'='*60}")
-        
+
+        lost = threading.Event()
+        finished = threading.Event()
+
+        def heartbeat():
+            while not finished.wait(lease_seconds / 3):
+                if not job_queue.heartbeat(job["id"], worker_id, lease_seconds):
+                    lost.set()
+                    return
+
+        heartbeat_thread = threading.Thread(target=heartbeat, name=f"heartbeat-{job['id']}", daemon=True)
+        heartbeat_thread.start()
+        tweet_count = job["tweet_count"]
         try:
-            tweets = try_different_nitter_instances(
-                hashtag, 
-                max_tweets, 
-                page_delay
-            )
-            
-            if tweets:
-                print(f"✅ Successfully fetched {len(tweets)} tweets for #{hashtag}")
-                all_results[hashtag] = tweets
-            else:
-                print(f"❌ Failed to fetch tweets for #{hashtag}")
-                all_results[hashtag] = []
-                
+            pages = iter_tweet_pages(job["hashtag"], job["max_tweets"] - tweet_count, page_delay, engine, pool,
+                                     rate_limiter, registry, seen_index, job["cursor"], hydrate_workers,
+                                     job["since"], job["until"])
+            try:
+                for page in pages:
+                    if lost.is_set() or STOP_EVENT.is_set():
+                        break
+                    writer.write_page(job["hashtag"], page)
+                    if seen_index is not None:
+                        seen_index.add(job["hashtag"], [tweet['status_id'] for tweet in page])
+                    tweet_count += len(page)
+                    if not job_queue.record_progress(job["id"], worker_id, page.next_url, tweet_count,
+                                                     lease_seconds):
+                        lost.set()
+            finally:
+                pages.close()
         except Exception as e:
-            print(f"Error while fetching tweets for #{hashtag}: {e}")
-            all_results[hashtag] = []
-        
-        # Delay between hashtags
-        if i < len(hashtags) - 1:
-            sleep_time = random.uniform(delay, delay + 3.0)
-            print(f"Waiting {sleep_time:.1f} seconds before the next hashtag...")
-            time.sleep(sleep_time)
-    
-    return all_results
+            job_queue.fail(job["id"], worker_id, f"{type(e).__name__}: {e}")
+            METRICS.count("jobs_failed")
+            print(f"[{worker_id}] Job {job['id']} failed: {e}")
+            return
+        finally:
+            finished.set()
+            heartbeat_thread.join()
+
+        if lost.is_set():
+            print(f"[{worker_id}] Lost the lease on job {job['id']}, leaving it to its new worker.")
+        elif STOP_EVENT.is_set():
+            job_queue.release(job["id"], worker_id)
+            print(f"[{worker_id}] Stopped job {job['id']} after {tweet_count} tweets, returning it to the queue.")
+        elif tweet_count:
+            job_queue.ack(job["id"], worker_id)
+            METRICS.count("jobs_done")
+            completed.append(job["id"])
+            print(f"✅ [{worker_id}] Job {job['id']} done: {tweet_count} tweets for #{job['hashtag']}")
+        else:
+            # Indistinguishable from all instances failing, so the job is retried (up to MAX_ATTEMPTS)
+            job_queue.fail(job["id"], worker_id, "no tweets fetched")
+            METRICS.count("jobs_failed")
+            print(f"❌ [{worker_id}] No tweets for job {job['id']}, returning it to the queue.")
+
+    def work(pool):
+        while not STOP_EVENT.is_set():
+            job = job_queue.lease(worker_id, lease_seconds)
+            if job is None:
+                return
+            METRICS.count("jobs_leased")
+            run_job(job, pool)
+
+    with BrowserPool(size=browser_pool_size, max_pages_per_driver=driver_max_pages, lean=lean_browser) as pool:
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+            futures = [executor.submit(work, pool) for _ in range(max(1, concurrency))]
+            try:
+                for future in futures:
+                    future.result()
+            except BaseException:
+                stop_workers(executor, futures)
+                raise
+    print(f"[{worker_id}] No pending jobs left.")
+    if adaptive_rate:
+        print_page_rates(rate_limiter)
+    return len(completed)
+
 
 # --- CSV SAVING (UPDATED) ---
 
-def save_to_separate_csvs(tweets_by_hashtag, output_dir="data", prefix="tweets"):
+CSV_FIELDNAMES = [
+    'id', 'hashtag', 'username', 'text', 'likes', 'retweets', 'replies',
+    'total_interactions', 'post_date_iso', 'text_length',
+    'word_count', 'sentiment_label', 'link'
+]
+
+class TweetStreamWriter:
     """
-    Saves processed data to separate CSV files for each hashtag, using a custom prefix.
+    Base class of the output backends. Writes tweets to one file per hashtag as they
+    arrive, one page at a time, so memory stays constant. Row IDs are global across
+    the run, as in save_to_separate_csvs.
     
-    Filename format: <prefix>_<hashtag>_<YYYYMMDD_HHMM>.csv
+    Filename format: <prefix>_<hashtag>_<YYYYMMDD_HHMM>.<extension>
+    Subclasses implement _open_file, _append, _reopen_file and _close_file. _append
+    receives the page as tweet_columns() columns, never as row dicts.
+    Once closed, a writer refuses further pages (ValueError): reopening a file would
+    start it over and lose everything written so far.
     """
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir)
-        print(f"Created directory: {output_dir}")
+    extension = None
 
-    # Concise timestamp for the entire run (e.g., 20251027_0604)
-    current_time = datetime.now().strftime("%Y%m%d_%H%M")
-    
-    fieldnames = [
-        'id', 'hashtag', 'username', 'text', 'likes', 'retweets', 'replies',
-        'total_interactions', 'post_date_iso', 'text_length',
-        'word_count', 'sentiment_label', 'link'
-    ]
-    
-    total_saved = 0
+    def __init__(self, output_dir="data", prefix="tweets", only_new=False):
+        self.output_dir = output_dir
+        self.prefix = prefix
+        self.only_new = only_new
+        # Concise timestamp for the entire run (e.g., 20251027_0604)
+        self.timestamp = datetime.now().strftime("%Y%m%d_%H%M")
+        self.next_id = 1
+        self.row_counts = {}
+        self.paths = {}
+        self.offsets = {}
+        self._handles = {}
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _check_open(self):
+        if self._closed:
+            raise ValueError(f"The {self.extension} writer is closed")
+
+    def _open(self, hashtag):
+        if not os.path.exists(self.output_dir):
+            os.makedirs(self.output_dir, exist_ok=True)
+            print(f"Created directory: {self.output_dir}")
+        filepath = os.path.join(self.output_dir, f"{self.prefix}_{hashtag}_{self.timestamp}.{self.extension}")
+        self.paths[hashtag] = filepath
+        self.row_counts[hashtag] = 0
+        self._handles[hashtag] = self._open_file(filepath)
+        return self._handles[hashtag]
+
+    def write_page(self, hashtag, tweets):
+        """
+        Transforms and appends one page of tweets. Returns the number of rows written.
+        """
+        if self.only_new:
+            tweets = [tweet for tweet in tweets if not tweet.get('known')]
+        if not tweets:
+            return 0
+        with self._lock, METRICS.phase("write_page", format=self.extension):
+            self._check_open()
+            columns = tweet_columns({hashtag: tweets}, start_id=self.next_id)
+            written = len(columns["id"])
+            self.next_id += written
+            handle = self._handles.get(hashtag) or self._open(hashtag)
+            self.offsets[hashtag] = self._append(handle, columns)
+            self.row_counts[hashtag] += written
+        METRICS.count("rows_written", written, hashtag=hashtag)
+        return written
+
+    def resume_file(self, hashtag, filepath, offset, row_count):
+        """
+        Continues the output of a hashtag from an interrupted run.
+        """
+        with self._lock:
+            self._check_open()
+            handle, filepath, offset = self._reopen_file(filepath, offset)
+            self.paths[hashtag] = filepath
+            self.offsets[hashtag] = offset
+            self.row_counts[hashtag] = row_count
+            self._handles[hashtag] = handle
+
+    @classmethod
+    def output_intact(cls, filepath, offset, row_count):
+        """
+        Whether a checkpointed output file still holds the rows the checkpoint recorded.
+        Backends that cannot count them only check that the file exists.
+        """
+        return os.path.exists(filepath)
+
+    @property
+    def total_rows(self):
+        return sum(self.row_counts.values())
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            for hashtag, handle in self._handles.items():
+                self._close_file(handle)
+                print(f"Saved {self.row_counts[hashtag]} tweets for #{hashtag} to file {self.paths[hashtag]}")
+            self._handles.clear()
+
+class CSVStreamWriter(TweetStreamWriter):
+    """
+    CSV backend: flushes after every page, so a crash keeps everything written so far.
+    """
+    extension = "csv"
+
+    def _open_file(self, filepath):
+        csvfile = open(filepath, 'w', newline='', encoding='utf-8-sig')
+        writer = csv.writer(csvfile)
+        writer.writerow(CSV_FIELDNAMES)
+        return csvfile, writer
+
+    def _append(self, handle, columns):
+        csvfile, writer = handle
+        writer.writerows(zip(*(columns[name] for name in CSV_FIELDNAMES)))
+        csvfile.flush()
+        return csvfile.tell()
+
+    def _reopen_file(self, filepath, offset):
+        # Cut off anything written after the last checkpointed page
+        os.truncate(filepath, offset)
+        csvfile = open(filepath, 'a', newline='', encoding='utf-8-sig')
+        return (csvfile, csv.writer(csvfile)), filepath, offset
+
+    def _close_file(self, handle):
+        handle[0].close()
+
+    @classmethod
+    def output_intact(cls, filepath, offset, row_count):
+        # The checkpointed offset must lie within the file and end exactly after row_count rows
+        if not os.path.exists(filepath) or os.path.getsize(filepath) < offset:
+            return False
+        with open(filepath, 'rb') as f:
+            data = f.read(offset).decode('utf-8-sig', errors='replace')
+        rows = sum(1 for _ in csv.reader(io.StringIO(data, newline='')))
+        return rows - 1 == row_count
+
+def _require_pyarrow():
+    """
+    Imports pyarrow lazily, so it is only needed for the Parquet features.
+    """
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise RuntimeError("Parquet output requires pyarrow (pip install pyarrow)") from None
+    return pyarrow, pyarrow.parquet
+
+def parquet_schema(pa):
+    """
+    Typed Arrow schema of the tweet rows: integer counters, real timestamps and
+    dictionary-encoded hashtag/username columns.
+    """
+    dictionary = pa.dictionary(pa.int32(), pa.string())
+    return pa.schema([
+        ('id', pa.int64()),
+        ('status_id', pa.int64()),
+        ('hashtag', dictionary),
+        ('username', dictionary),
+        ('text', pa.string()),
+        ('likes', pa.int64()),
+        ('retweets', pa.int64()),
+        ('replies', pa.int64()),
+        ('total_interactions', pa.int64()),
+        ('post_date_iso', pa.timestamp('s')),
+        ('text_length', pa.int32()),
+        ('word_count', pa.int32()),
+        ('sentiment_label', pa.string()),
+        ('link', pa.string()),
+    ])
+
+def _parse_iso_timestamp(value):
+    try:
+        return datetime.strptime(value, "%Y-%m-%d %H:%M:%S")
+    except (TypeError, ValueError):
+        return None
+
+def columns_to_arrow_table(columns, pa):
+    """
+    Converts transformed columns (CSV_FIELDNAMES -> list of values) to a typed Arrow table.
+    """
+    schema = parquet_schema(pa)
+    columns = dict(columns)
+    columns['status_id'] = [extract_status_id(link) for link in columns['link']]
+    columns['post_date_iso'] = [_parse_iso_timestamp(value) for value in columns['post_date_iso']]
+    return pa.Table.from_pydict({field.name: columns[field.name] for field in schema}, schema=schema)
+
+def rows_to_arrow_table(rows, pa):
+    """
+    Converts transformed rows (dicts with CSV_FIELDNAMES keys) to a typed Arrow table.
+    """
+    return columns_to_arrow_table({name: [row.get(name) for row in rows] for name in CSV_FIELDNAMES}, pa)
+
+class ParquetStreamWriter(TweetStreamWriter):
+    """
+    Parquet backend: every page becomes a row group of a typed, columnar file.
+    A Parquet file is only readable once closed, which happens at the end of the run
+    (including Ctrl+C); a resumed run continues in a new part file.
+    """
+    extension = "parquet"
+
+    def __init__(self, *args, **kwargs):
+        self._pa, self._pq = _require_pyarrow()
+        super().__init__(*args, **kwargs)
+
+    def _open_file(self, filepath):
+        return self._pq.ParquetWriter(filepath, parquet_schema(self._pa), compression='zstd')
+
+    def _append(self, handle, columns):
+        handle.write_table(columns_to_arrow_table(columns, self._pa))
+        return 0
+
+    def _reopen_file(self, filepath, offset):
+        base, extension = os.path.splitext(filepath)
+        part = 2
+        while os.path.exists(f"{base}.part{part}{extension}"):
+            part += 1
+        filepath = f"{base}.part{part}{extension}"
+        return self._open_file(filepath), filepath, 0
+
+    def _close_file(self, handle):
+        handle.close()
+
+    @classmethod
+    def output_intact(cls, filepath, offset, row_count):
+        # The rows of a hashtag are spread over the first file and its .partN files
+        _, pq = _require_pyarrow()
+        base, extension = os.path.splitext(filepath)
+        base = re.sub(r'\.part\d+$', '', base)
+        paths = [f"{base}{extension}"] + glob.glob(f"{glob.escape(base)}.part*{extension}")
+        try:
+            rows = sum(pq.ParquetFile(path).metadata.num_rows for path in paths)
+        except (OSError, ValueError):
+            # e.g. a file that was never closed has no footer
+            return False
+        return rows == row_count
+
+TWEET_STORE_SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS tweets ("
+    " status_id INTEGER PRIMARY KEY, username TEXT, text TEXT, likes INTEGER, retweets INTEGER,"
+    " replies INTEGER, total_interactions INTEGER, posted_at TEXT, text_length INTEGER, word_count INTEGER,"
+    " sentiment_label TEXT, link TEXT, first_seen REAL NOT NULL, last_seen REAL NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS tweets_username ON tweets (username COLLATE NOCASE)",
+    "CREATE INDEX IF NOT EXISTS tweets_posted_at ON tweets (posted_at)",
+    "CREATE TABLE IF NOT EXISTS tweet_hashtags ("
+    " hashtag TEXT NOT NULL, status_id INTEGER NOT NULL, PRIMARY KEY (hashtag, status_id)) WITHOUT ROWID",
+    "CREATE INDEX IF NOT EXISTS tweet_hashtags_status ON tweet_hashtags (status_id)",
+    # External-content full-text index over tweets.text, kept in sync by triggers
+    "CREATE VIRTUAL TABLE IF NOT EXISTS tweets_fts USING fts5(text, content='tweets', content_rowid='status_id')",
+    "CREATE TRIGGER IF NOT EXISTS tweets_fts_insert AFTER INSERT ON tweets BEGIN"
+    " INSERT INTO tweets_fts (rowid, text) VALUES (new.status_id, new.text); END",
+    "CREATE TRIGGER IF NOT EXISTS tweets_fts_delete AFTER DELETE ON tweets BEGIN"
+    " INSERT INTO tweets_fts (tweets_fts, rowid, text) VALUES ('delete', old.status_id, old.text); END",
+    "CREATE TRIGGER IF NOT EXISTS tweets_fts_update AFTER UPDATE OF text ON tweets"
+    " WHEN old.text IS NOT new.text BEGIN"
+    " INSERT INTO tweets_fts (tweets_fts, rowid, text) VALUES ('delete', old.status_id, old.text);"
+    " INSERT INTO tweets_fts (rowid, text) VALUES (new.status_id, new.text); END",
+]
+
+UPSERT_TWEET_SQL = (
+    "INSERT INTO tweets (status_id, username, text, likes, retweets, replies, total_interactions, posted_at,"
+    " text_length, word_count, sentiment_label, link, first_seen, last_seen)"
+    " VALUES (:status_id, :username, :text, :likes, :retweets, :replies, :total_interactions, :posted_at,"
+    " :text_length, :word_count, :sentiment_label, :link, :seen, :seen)"
+    " ON CONFLICT (status_id) DO UPDATE SET"
+    " likes = excluded.likes, retweets = excluded.retweets, replies = excluded.replies,"
+    " total_interactions = excluded.total_interactions, last_seen = excluded.last_seen,"
+    # A hydrated (longer) text replaces a truncated one, never the other way round
+    " text = CASE WHEN length(excluded.text) > length(text) THEN excluded.text ELSE text END,"
+    " text_length = CASE WHEN length(excluded.text) > length(text) THEN excluded.text_length ELSE text_length END,"
+    " word_count = CASE WHEN length(excluded.text) > length(text) THEN excluded.word_count ELSE word_count END,"
+    " posted_at = coalesce(posted_at, excluded.posted_at)"
+    " WHERE excluded.last_seen >= tweets.last_seen"
+)
+
+def open_tweet_store(path, read_only=False):
+    """
+    Opens (and creates) the SQLite tweet store. Requires SQLite with FTS5.
+    With read_only=True an existing store is opened for queries only; a missing one
+    raises FileNotFoundError instead of being created.
+    """
+    if read_only:
+        if not os.path.isfile(path):
+            raise FileNotFoundError(f"No tweet store at {path}")
+        uri = "file:" + quote(os.path.abspath(path)) + "?mode=ro"
+        conn = sqlite3.connect(uri, uri=True, timeout=30, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        return conn
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    try:
+        with conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            for statement in TWEET_STORE_SCHEMA:
+                conn.execute(statement)
+    except sqlite3.OperationalError as e:
+        conn.close()
+        if "fts5" in str(e):
+            raise RuntimeError("The SQLite store requires SQLite built with FTS5") from None
+        raise
+    return conn
+
+def upsert_tweet_rows(conn, rows, seen=None):
+    """
+    Inserts transformed rows (CSV_FIELDNAMES dicts) or refreshes the interaction counts of
+    tweets already stored, in one transaction. Rows without a status ID are skipped.
+    Returns the number of rows stored.
+    """
+    seen = seen or time.time()
+    records = []
+    hashtags = []
+    for row in rows:
+        status_id = row.get('status_id') or extract_status_id(row.get('link'))
+        if status_id is None:
+            continue
+        posted_at = _parse_iso_timestamp(row.get('post_date_iso'))
+        records.append({
+            'status_id': status_id,
+            'username': row.get('username', ''),
+            'text': row.get('text', ''),
+            'likes': int(row.get('likes') or 0),
+            'retweets': int(row.get('retweets') or 0),
+            'replies': int(row.get('replies') or 0),
+            'total_interactions': int(row.get('total_interactions') or 0),
+            'posted_at': posted_at.strftime("%Y-%m-%d %H:%M:%S") if posted_at else None,
+            'text_length': int(row.get('text_length') or 0),
+            'word_count': int(row.get('word_count') or 0),
+            'sentiment_label': row.get('sentiment_label', ''),
+            'link': row.get('link', ''),
+            'seen': seen,
+        })
+        if row.get('hashtag'):
+            hashtags.append((row['hashtag'].lstrip('#').lower(), status_id))
+    with conn:
+        conn.executemany(UPSERT_TWEET_SQL, records)
+        conn.executemany("INSERT OR IGNORE INTO tweet_hashtags (hashtag, status_id) VALUES (?, ?)", hashtags)
+    return len(records)
+
+class SQLiteStreamWriter(TweetStreamWriter):
+    """
+    SQLite backend: all hashtags go into one persistent store, <output_dir>/<prefix>.sqlite,
+    keyed on status ID, with a full-text index on the text (see query_tweet_store).
+    Every page is upserted in one transaction, so re-scraped tweets get fresh
+    interaction counts instead of duplicate rows, and a resumed run can safely
+    write a page again.
+    """
+    extension = "sqlite"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.path = os.path.join(self.output_dir, f"{self.prefix}.{self.extension}")
+        self._conn = None
+
+    def _connect(self):
+        if self._conn is None:
+            if not os.path.exists(self.output_dir):
+                os.makedirs(self.output_dir, exist_ok=True)
+                print(f"Created directory: {self.output_dir}")
+            self._conn = open_tweet_store(self.path)
+        return self._conn
+
+    def _open(self, hashtag):
+        self.paths[hashtag] = self.path
+        self.row_counts[hashtag] = 0
+        self._handles[hashtag] = self._connect()
+        return self._handles[hashtag]
+
+    def _append(self, handle, columns):
+        rows = (dict(zip(CSV_FIELDNAMES, values)) for values in zip(*(columns[name] for name in CSV_FIELDNAMES)))
+        upsert_tweet_rows(handle, rows)
+        return 0
+
+    def _reopen_file(self, filepath, offset):
+        # Pages are upserted, so nothing has to be cut off
+        return self._connect(), self.path, 0
+
+    def _close_file(self, handle):
+        # Every hashtag shares the connection; close it once
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+FTS_OPERATORS = {"AND", "OR", "NOT"}
+FTS_TOKEN_RE = re.compile(r'[()]|"[^"]*"\*?|[^\s()]+')
+FTS_BAREWORD_RE = re.compile(r'^\w+\*?$')
+FTS_PHRASE_RE = re.compile(r'^"[^"]*"\*?$')
+
+def fts_query(match):
+    """
+    Turns a --match string into a safe FTS5 query: "phrases", AND/OR/NOT, parentheses
+    and plain words (with an optional trailing * for prefixes) are kept, any other term
+    (e.g. Kosiniak-Kamysz or a column:filter) is quoted as a phrase.
+    """
+    query = ""
+    for token in FTS_TOKEN_RE.findall(match):
+        if not (token in ("(", ")") or token in FTS_OPERATORS or FTS_BAREWORD_RE.match(token)
+                or FTS_PHRASE_RE.match(token)):
+            prefix = token.endswith("*") and len(token) > 1
+            if prefix:
+                token = token[:-1]
+            token = '"' + token.replace('"', '""') + '"' + ("*" if prefix else "")
+        if query and not query.endswith("(") and token != ")":
+            query += " "
+        query += token
+    return query
+
+def query_tweet_store(path, match=None, username=None, hashtag=None, since=None, until=None, limit=20):
+    """
+    Looks tweets up in the SQLite store: `match` is an FTS5 query on the text (words,
+    "phrases", prefix*, see fts_query), the other filters use the indexes. since/until
+    are dates (posted in [since, until)). Returns the newest matching tweets as dicts,
+    each with the list of its hashtags.
+    Raises FileNotFoundError if there is no store at `path` and ValueError for a
+    query FTS5 cannot parse.
+    """
+    conditions = []
+    params = []
+    if match:
+        conditions.append("t.status_id IN (SELECT rowid FROM tweets_fts WHERE tweets_fts MATCH ?)")
+        params.append(fts_query(match))
+    if username:
+        conditions.append("t.username = ? COLLATE NOCASE")
+        params.append(username.lstrip('@'))
+    if hashtag:
+        conditions.append("t.status_id IN (SELECT status_id FROM tweet_hashtags WHERE hashtag = ?)")
+        params.append(hashtag.lstrip('#').lower())
+    if since:
+        conditions.append("t.posted_at >= ?")
+        params.append(since.isoformat())
+    if until:
+        conditions.append("t.posted_at < ?")
+        params.append(until.isoformat())
+    sql = ("SELECT t.*, (SELECT group_concat(h.hashtag, ' ') FROM tweet_hashtags h"
+           " WHERE h.status_id = t.status_id) AS hashtags FROM tweets t")
+    if conditions:
+        sql += " WHERE " + " AND ".join(conditions)
+    sql += " ORDER BY t.posted_at DESC LIMIT ?"
+    params.append(limit)
+
+    conn = open_tweet_store(path, read_only=True)
+    try:
+        rows = conn.execute(sql, params).fetchall()
+    except sqlite3.OperationalError as e:
+        if not match:
+            raise
+        raise ValueError(f"Invalid --match query {match!r}: {e}") from None
+    finally:
+        conn.close()
+    return [dict(row, hashtags=(row['hashtags'] or "").split()) for row in rows]
+
+def index_archive(paths, path):
+    """
+    Loads CSV snapshots into the SQLite store, oldest first, so the newest snapshot's
+    interaction counts win. Returns the number of tweets in the store.
+    """
+    conn = open_tweet_store(path)
+    try:
+        batch = []
+        batch_seen = None
+        read = 0
+        for source, row in iter_archive_rows(paths):
+            read += 1
+            scraped_at = parse_archive_filename(source)[1]
+            seen = scraped_at.timestamp() if scraped_at else time.time()
+            if batch and (seen != batch_seen or len(batch) >= REPROCESS_CHUNK_ROWS):
+                upsert_tweet_rows(conn, batch, batch_seen)
+                batch = []
+            batch_seen = seen
+            batch.append(normalize_archive_row(row, scraped_at))
+        if batch:
+            upsert_tweet_rows(conn, batch, batch_seen)
+        total = conn.execute("SELECT COUNT(*) FROM tweets").fetchone()[0]
+    finally:
+        conn.close()
+    print(f"Indexed {read} rows from {len(paths)} files; {path} now holds {total} tweets")
+    return total
+
+OUTPUT_WRITERS = {
+    'csv': CSVStreamWriter,
+    'parquet': ParquetStreamWriter,
+    'sqlite': SQLiteStreamWriter,
+}
+
+def make_output_writer(output_format="csv", output_dir="data", prefix="tweets", only_new=False):
+    """
+    Returns the streaming writer for an output format (see OUTPUT_WRITERS).
+    """
+    try:
+        writer_class = OUTPUT_WRITERS[output_format]
+    except KeyError:
+        raise ValueError(f"Unknown output format: {output_format}") from None
+    return writer_class(output_dir, prefix, only_new)
+
+def save_to_separate_csvs(tweets_by_hashtag, output_dir="data", prefix="tweets", only_new=False,
+                          output_format="csv"):
+    """
+    Saves processed data to separate files for each hashtag, using a custom prefix.
+    With only_new=True, tweets marked as known by the seen-tweet index are skipped.
+    output_format selects the backend (csv or parquet, see OUTPUT_WRITERS).
     
-    # Process all data at once to ensure consistent IDs and parsing
-    transformed_data = transform_tweets_for_csv(tweets_by_hashtag)
+    Filename format: <prefix>_<hashtag>_<YYYYMMDD_HHMM>.<csv|parquet>
+    """
+    writer = make_output_writer(output_format, output_dir, prefix, only_new)
+    try:
+        for hashtag, tweets in tweets_by_hashtag.items():
+            try:
+                writer.write_page(hashtag, tweets)
+            except Exception as e:
+                print(f"Error saving CSV for #{hashtag}: {e}")
+    finally:
+        writer.close()
     
-    # Group the processed data back to save them separately
-    grouped_data = {}
-    for row in transformed_data:
-        hashtag_name = row['hashtag'].lstrip('#')
-        if hashtag_name not in grouped_data:
-            grouped_data[hashtag_name] = []
-        grouped_data[hashtag_name].append(row)
+    return writer.total_rows
+
+
+# --- ARCHIVE COMPACTION ---
+
+ARCHIVE_FILENAME_RE = re.compile(r'^(?P<stem>.+?)_(?P<timestamp>\d{8}_\d{4}(?:\d{2})?)$')
+
+def parse_archive_filename(path):
+    """
+    Splits an output filename (<prefix>_<hashtag>_<timestamp> or the older
+    <hashtag>_<timestamp>) into (hashtag, scraped_at). Unknown parts are None.
+    """
+    stem = os.path.splitext(os.path.basename(path))[0]
+    match = ARCHIVE_FILENAME_RE.match(stem)
+    if not match:
+        return None, None
+    timestamp = match.group('timestamp')
+    scraped_at = datetime.strptime(timestamp, "%Y%m%d_%H%M%S" if len(timestamp) == 15 else "%Y%m%d_%H%M")
+    return match.group('stem').rsplit('_', 1)[-1], scraped_at
+
+def iter_archive_rows(paths):
+    """
+    Yields (path, row) for every row of the given CSV files, oldest snapshot first.
+    Rows without a hashtag column get it from the filename.
+    """
+    def snapshot_time(path):
+        return parse_archive_filename(path)[1] or datetime.min
+
+    for path in sorted(paths, key=snapshot_time):
+        hashtag, _ = parse_archive_filename(path)
+        with open(path, newline='', encoding='utf-8-sig') as csvfile:
+            for row in csv.DictReader(csvfile):
+                if not row.get('hashtag') and hashtag:
+                    row['hashtag'] = f"#{hashtag}"
+                yield path, row
+
+def normalize_archive_row(row, scraped_at=None):
+    """
+    Turns an archived CSV row into a clean output row (without the id column): cleaned
+    text, recomputed features and an ISO date. Relative dates are resolved against
+    the snapshot time `scraped_at`. A row whose hashtag is unknown gets an empty one.
+    """
+    text = clean_text(row.get('text', ''))
+    post_date = row.get('post_date_iso', '')
+    parsed_date = parse_nitter_date(post_date, base_time=scraped_at) if post_date else None
+    return {
+        'hashtag': row.get('hashtag', ''),
+        'username': row.get('username', ''),
+        'text': text,
+        'likes': int(row.get('likes') or 0),
+        'retweets': int(row.get('retweets') or 0),
+        'replies': int(row.get('replies') or 0),
+        'total_interactions': int(row.get('total_interactions') or 0),
+        'post_date_iso': parsed_date.strftime("%Y-%m-%d %H:%M:%S") if parsed_date else None,
+        'text_length': len(text),
+        'word_count': len(text.split()),
+        'sentiment_label': row.get('sentiment_label', ''),
+        'link': row.get('link', ''),
+    }
+
+def compact_archive(paths, destination):
+    """
+    Merges CSV snapshots into one Parquet dataset partitioned by hashtag.
+    Tweets are deduplicated by status ID (by hashtag, username and text for old files
+    without links); the newest snapshot's interaction counts win.
+    """
+    pa, pq = _require_pyarrow()
+    latest = {}
+    read = 0
+    for path, row in iter_archive_rows(paths):
+        read += 1
+        _, scraped_at = parse_archive_filename(path)
+        normalized = normalize_archive_row(row, scraped_at)
+        status_id = extract_status_id(row.get('link'))
+        key = ((normalized['hashtag'], status_id) if status_id
+               else (normalized['hashtag'], row.get('username'), normalized['text']))
+        latest[key] = normalized
+
+    rows = list(latest.values())
+    for tweet_id, row in enumerate(rows, start=1):
+        row['id'] = tweet_id
+    table = rows_to_arrow_table(rows, pa)
+    pq.write_to_dataset(table, root_path=destination, partition_cols=['hashtag'],
+                        existing_data_behavior='delete_matching')
+    print(f"Compacted {read} rows from {len(paths)} files into {len(rows)} unique tweets in {destination}")
+    return len(rows)
+
+
+# --- ARCHIVE REPROCESSING ---
+
+REPROCESS_CHUNK_ROWS = 5000
+
+def _normalize_archive_chunk(fieldnames, records, hashtag, scraped_at, first_id):
+    """
+    Process pool task: normalizes one chunk of CSV records (lists of values, which are
+    cheaper to send between processes than dicts) and returns them as row dicts.
+    """
+    rows = []
+    for number, values in enumerate(records, start=first_id):
+        row = dict(zip(fieldnames, values))
+        if not row.get('hashtag') and hashtag:
+            row['hashtag'] = f"#{hashtag}"
+        normalized = normalize_archive_row(row, scraped_at)
+        normalized['id'] = row.get('id') or number
+        rows.append(normalized)
+    return rows
+
+def iter_archive_chunks(path, chunk_rows=REPROCESS_CHUNK_ROWS):
+    """
+    Yields (fieldnames, records, first_row_number) for consecutive chunks of a CSV file.
+    """
+    with open(path, newline='', encoding='utf-8-sig') as csvfile:
+        reader = csv.reader(csvfile)
+        fieldnames = next(reader, None)
+        if fieldnames is None:
+            return
+        chunk = []
+        first = 1
+        for record in reader:
+            chunk.append(record)
+            if len(chunk) >= chunk_rows:
+                yield fieldnames, chunk, first
+                first += len(chunk)
+                chunk = []
+        if chunk:
+            yield fieldnames, chunk, first
+
+def reprocess_archive(paths, destination, workers=None, chunk_rows=REPROCESS_CHUNK_ROWS):
+    """
+    Streams CSV snapshots through clean_text, parse_nitter_date and the feature columns
+    on a process pool and writes normalized copies (same file names, the current CSV
+    columns, a hashtag on every row, ISO dates) to `destination`.
+    At most two chunks per worker are in flight, so memory stays bounded however large
+    the archive is; chunks are written in their original order.
+    """
+    destination = os.path.abspath(destination)
+    if any(os.path.dirname(os.path.abspath(path)) == destination for path in paths):
+        raise ValueError("the reprocessing destination must not be the directory of the input files")
+    os.makedirs(destination, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    max_pending = 2 * workers
+    pending = deque()
+    outputs = {}
+    written = 0
+    start = time.perf_counter()
+
+    def write_oldest():
+        nonlocal written
+        path, future, last = pending.popleft()
+        csvfile, writer = outputs[path]
+        rows = future.result()
+        writer.writerows(rows)
+        written += len(rows)
+        if last:
+            csvfile.close()
+            del outputs[path]
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for path in paths:
+            hashtag, scraped_at = parse_archive_filename(path)
+            csvfile = open(os.path.join(destination, os.path.basename(path)), 'w', newline='', encoding='utf-8-sig')
+            writer = csv.DictWriter(csvfile, fieldnames=CSV_FIELDNAMES, extrasaction='ignore')
+            writer.writeheader()
+            outputs[path] = (csvfile, writer)
+            task = None
+            for fieldnames, records, first in iter_archive_chunks(path, chunk_rows):
+                if first == 1 and hashtag is None and 'hashtag' not in fieldnames:
+                    print(f"Warning: {path} has no hashtag column and its name does not include one; "
+                          "its rows get an empty hashtag")
+                if task is not None:
+                    pending.append((path, task, False))
+                task = executor.submit(_normalize_archive_chunk, fieldnames, records, hashtag, scraped_at, first)
+                while len(pending) >= max_pending:
+                    write_oldest()
+            if task is None:
+                csvfile.close()
+                del outputs[path]
+            else:
+                pending.append((path, task, True))
+        while pending:
+            write_oldest()
+
+    seconds = time.perf_counter() - start
+    print(f"Reprocessed {written} rows from {len(paths)} files into {destination} "
+          f"in {seconds:.1f} s ({written / max(seconds, 1e-9):.0f} rows/s, {workers} processes)")
+    return written
 
-    for hashtag, rows in grouped_data.items():
-        if not rows:
-            continue
 
-        # New filename format: <prefix>_<hashtag>_<timestamp>.csv
-        filename = f"{prefix}_{hashtag}_{current_time}.csv"
-        filepath = os.path.join(output_dir, filename)
+# --- ENGAGEMENT REFRESH ---
 
+ENGAGEMENT_SCHEMA = [
+    # One row per tracked tweet with its latest observation; velocity is the change in
+    # interactions per hour between its last two observations
+    "CREATE TABLE IF NOT EXISTS tracked_tweets ("
+    " status_id INTEGER PRIMARY KEY, link TEXT NOT NULL, posted_ts REAL, observed_at REAL NOT NULL,"
+    " likes INTEGER NOT NULL, retweets INTEGER NOT NULL, replies INTEGER NOT NULL,"
+    " velocity REAL NOT NULL, failures INTEGER NOT NULL DEFAULT 0)",
+    # The time series: every observation of a tweet's counts
+    "CREATE TABLE IF NOT EXISTS engagement ("
+    " status_id INTEGER NOT NULL, observed_at REAL NOT NULL,"
+    " likes INTEGER NOT NULL, retweets INTEGER NOT NULL, replies INTEGER NOT NULL,"
+    " PRIMARY KEY (status_id, observed_at)) WITHOUT ROWID",
+]
+
+UPSERT_OBSERVATION_SQL = (
+    "INSERT INTO tracked_tweets (status_id, link, posted_ts, observed_at, likes, retweets, replies, velocity)"
+    " VALUES (:status_id, :link, :posted_ts, :observed_at, :likes, :retweets, :replies, :velocity)"
+    " ON CONFLICT (status_id) DO UPDATE SET"
+    " velocity = abs((excluded.likes + excluded.retweets + excluded.replies) - (likes + retweets + replies))"
+    "   / max((excluded.observed_at - observed_at) / 3600.0, 1 / 60.0),"
+    " likes = excluded.likes, retweets = excluded.retweets, replies = excluded.replies,"
+    " observed_at = excluded.observed_at, failures = 0,"
+    " link = CASE WHEN excluded.link != '' THEN excluded.link ELSE link END,"
+    " posted_ts = coalesce(posted_ts, excluded.posted_ts)"
+    " WHERE excluded.observed_at > tracked_tweets.observed_at"
+)
+
+class EngagementTracker:
+    """
+    SQLite time series of the interaction counts of already-collected tweets.
+    Tweets are tracked from CSV snapshots (every snapshot of a tweet is one observation)
+    or from a tweet store; refresh passes add observations from the tweets' status pages.
+
+    Which tweets are refreshed next is decided by the expected change since their last
+    observation: velocity (interactions/hour, plus VELOCITY_FLOOR so settled tweets are
+    not dropped for good) times the hours since then, damped by the tweet's age as
+    1 / (1 + age / AGE_DAMPING_HOURS). Tweets whose status page failed MAX_FAILURES
+    times in a row (e.g. deleted ones) are no longer refreshed.
+    """
+    VELOCITY_FLOOR = 0.05
+    AGE_DAMPING_HOURS = 24.0
+    MAX_FAILURES = 3
+
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self._conn = sqlite3.connect(path, timeout=30)
+        with self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            for statement in ENGAGEMENT_SCHEMA:
+                self._conn.execute(statement)
+
+    def is_tweet_store(self):
+        return self._conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'tweets'").fetchone() is not None
+
+    def record(self, observations):
+        """
+        Adds observations (dicts with status_id, link, posted_ts, observed_at, likes,
+        retweets and replies) to the time series and updates the tracked tweets. In a
+        tweet store, the stored counts are updated as well.
+        """
+        records = []
+        for observation in observations:
+            record = dict(observation)
+            interactions = record['likes'] + record['retweets'] + record['replies']
+            # A first observation only tells the average rate since the tweet was posted
+            age_hours = (record['observed_at'] - record['posted_ts']) / 3600.0 if record['posted_ts'] else None
+            record['velocity'] = interactions / max(age_hours, 1.0) if age_hours is not None else 0.0
+            records.append(record)
+        is_store = self.is_tweet_store()
+        with self._conn:
+            self._conn.executemany(UPSERT_OBSERVATION_SQL, records)
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO engagement (status_id, observed_at, likes, retweets, replies)"
+                " VALUES (:status_id, :observed_at, :likes, :retweets, :replies)", records)
+            if is_store:
+                self._conn.executemany(
+                    "UPDATE tweets SET likes = :likes, retweets = :retweets, replies = :replies,"
+                    " total_interactions = :likes + :retweets + :replies, last_seen = :observed_at"
+                    " WHERE status_id = :status_id AND last_seen <= :observed_at", records)
+        return len(records)
+
+    def record_failures(self, status_ids):
+        with self._conn:
+            self._conn.executemany("UPDATE tracked_tweets SET failures = failures + 1 WHERE status_id = ?",
+                                   [(status_id,) for status_id in status_ids])
+
+    def track_archive(self, paths):
+        """
+        Tracks the tweets of CSV snapshots; rows without a status link are skipped.
+        Returns the number of observations read.
+        """
+        observations = []
+        read = 0
+        for source, row in iter_archive_rows(paths):
+            scraped_at = parse_archive_filename(source)[1]
+            row = normalize_archive_row(row, scraped_at)
+            status_id = extract_status_id(row.get('link'))
+            if status_id is None:
+                continue
+            posted_at = _parse_iso_timestamp(row.get('post_date_iso'))
+            observations.append({
+                'status_id': status_id,
+                'link': row['link'],
+                'posted_ts': posted_at.timestamp() if posted_at else None,
+                'observed_at': scraped_at.timestamp() if scraped_at else os.path.getmtime(source),
+                'likes': int(row.get('likes') or 0),
+                'retweets': int(row.get('retweets') or 0),
+                'replies': int(row.get('replies') or 0),
+            })
+            if len(observations) >= REPROCESS_CHUNK_ROWS:
+                read += self.record(observations)
+                observations = []
+        return read + self.record(observations)
+
+    def track_store(self):
+        """
+        Tracks the tweets of the tweet store in the same database (their last counts
+        are the first observation). Returns the number of tweets read.
+        """
+        rows = self._conn.execute(
+            "SELECT status_id, link, posted_at, last_seen, likes, retweets, replies FROM tweets").fetchall()
+        observations = []
+        for status_id, link, posted_at, last_seen, likes, retweets, replies in rows:
+            posted_at = _parse_iso_timestamp(posted_at)
+            observations.append({
+                'status_id': status_id,
+                'link': link or "",
+                'posted_ts': posted_at.timestamp() if posted_at else None,
+                'observed_at': last_seen,
+                'likes': likes or 0,
+                'retweets': retweets or 0,
+                'replies': replies or 0,
+            })
+        return self.record(observations)
+
+    def due(self, budget, now=None):
+        """
+        Returns up to `budget` (status_id, link, posted_ts) of the tweets most worth
+        refreshing, highest priority first.
+        """
+        now = now or time.time()
+        return self._conn.execute(
+            "SELECT status_id, link, posted_ts FROM tracked_tweets"
+            " WHERE failures < :max_failures AND link LIKE '%/status/%'"
+            " ORDER BY (velocity + :floor) * (:now - observed_at) / 3600.0"
+            "   / (1.0 + (:now - coalesce(posted_ts, observed_at)) / 3600.0 / :damping) DESC"
+            " LIMIT :budget",
+            {'max_failures': self.MAX_FAILURES, 'floor': self.VELOCITY_FLOOR, 'now': now,
+             'damping': self.AGE_DAMPING_HOURS, 'budget': budget}
+        ).fetchall()
+
+    def summary(self, top=5):
+        tracked, observations = self._conn.execute(
+            "SELECT (SELECT COUNT(*) FROM tracked_tweets), (SELECT COUNT(*) FROM engagement)").fetchone()
+        movers = self._conn.execute(
+            "SELECT link, likes, retweets, replies, velocity FROM tracked_tweets"
+            " ORDER BY velocity DESC LIMIT ?", (top,)).fetchall()
+        return tracked, observations, movers
+
+    def close(self):
+        self._conn.close()
+
+def parse_status_counts(html):
+    """
+    Returns the replies/retweets/likes of the main tweet on a Nitter status page, or None.
+    """
+    soup = BeautifulSoup(html, HTML_PARSER)
+    main_tweet = soup.select_one(".main-tweet")
+    if main_tweet is None:
+        return None
+    return {key: _parse_stat(main_tweet, selector) for key, selector in STAT_SELECTORS.items()}
+
+def fetch_status_counts(link, instance, timeout=10.0):
+    """
+    Fetches a tweet's status page from `instance` (whichever instance the link points to)
+    and returns its counts, or None if the tweet is gone. Instance failures raise PageLoadError.
+    """
+    url = instance_base_url(instance) + urlparse(link).path
+    try:
+        with METRICS.phase("refresh_fetch", instance=instance):
+            response = get_http_session().get(url, timeout=timeout)
+    except requests.exceptions.RequestException as e:
+        raise PageLoadError("error", f"Error while loading {url}: {e}")
+    METRICS.count("bytes", len(response.content), instance=instance)
+    if response.status_code == 404:
+        return None
+    if response.status_code >= 400 or is_rate_limit_page(response.content):
+        rate_limited = response.status_code == 429 or is_rate_limit_page(response.content)
+        raise PageLoadError("rate_limited" if rate_limited else "error", f"HTTP {response.status_code} for {url}",
+                            parse_retry_after(response.headers.get("Retry-After")))
+    return parse_status_counts(response.content)
+
+STATUS_ATTEMPTS = 3
+
+def refresh_engagement(tracker, registry, budget=500, workers=8, page_delay=3.0, adaptive_rate=True):
+    """
+    One refresh pass: fetches the status pages of the `budget` tweets most worth
+    refreshing (see EngagementTracker) with up to `workers` concurrent requests, spread
+    over the healthy instances of the registry and paced per instance by the rate
+    limiter. A failed fetch is retried on up to STATUS_ATTEMPTS - 1 other instances;
+    after 2 * workers tweets in a row failed everywhere, the pass stops early.
+    The new counts are recorded as they arrive. Returns (refreshed, gone, failed).
+    """
+    due = tracker.due(budget)
+    if not due:
+        print("No tracked tweets to refresh.")
+        return 0, 0, 0
+    rate_limiter = InstanceRateLimiter(page_delay, registry=registry, adaptive=adaptive_rate)
+    print(f"Refreshing {len(due)} tweets with {workers} workers...")
+    stop = threading.Event()
+
+    def refresh_one(link):
+        tried = []
+        for _ in range(STATUS_ATTEMPTS):
+            if stop.is_set() or STOP_EVENT.is_set():
+                return None
+            candidates = [i for i in registry.ranked() if i not in tried]
+            if not candidates:
+                break
+            instance = rate_limiter.claim(candidates)
+            try:
+                rate_limiter.wait(instance)
+                start = time.monotonic()
+                counts = fetch_status_counts(link, instance, registry.page_timeout(instance))
+            except PageLoadError as e:
+                registry.record_failure(instance, str(e), rate_limited=e.outcome == "rate_limited")
+                rate_limiter.record_failure(instance, e.retry_after)
+                METRICS.count("refresh_errors", instance=instance, reason=e.outcome)
+                tried.append(instance)
+                continue
+            finally:
+                rate_limiter.release(instance)
+            registry.record_success(instance, (time.monotonic() - start) * 1000)
+            rate_limiter.record_success(instance)
+            return counts, time.time()
+        raise PageLoadError("error", f"No instance returned the status page of {link}")
+
+    refreshed = gone = failed = failed_in_row = 0
+    observations = []
+    failures = []
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = {executor.submit(refresh_one, link): (status_id, link, posted_ts)
+                   for status_id, link, posted_ts in due}
         try:
-            with open(filepath, 'w', newline='', encoding='utf-8-sig') as csvfile:
-                writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-                writer.writeheader()
-                for row in rows:
-                    writer.writerow(row)
-                    
-            print(f"Saved {len(rows)} tweets for #{hashtag} to file {filepath}")
-            total_saved += len(rows)
+            for future in as_completed(futures):
+                status_id, link, posted_ts = futures[future]
+                try:
+                    result = future.result()
+                except PageLoadError as e:
+                    print(f"Warning: {e}")
+                    failures.append(status_id)
+                    failed += 1
+                    failed_in_row += 1
+                    if failed_in_row >= 2 * workers and not stop.is_set():
+                        print("❌ No instance is returning status pages, stopping the refresh.")
+                        stop.set()
+                    continue
+                if result is None:
+                    continue
+                counts, observed_at = result
+                failed_in_row = 0
+                if counts is None:
+                    failures.append(status_id)
+                    gone += 1
+                    continue
+                observations.append(dict(counts, status_id=status_id, link=link, posted_ts=posted_ts,
+                                         observed_at=observed_at))
+                refreshed += 1
+                if len(observations) >= 100:
+                    tracker.record(observations)
+                    observations = []
+        except BaseException:
+            # Ctrl+C: keep the counts fetched so far
+            stop_workers(executor, futures)
+            tracker.record(observations)
+            raise
+    tracker.record(observations)
+    tracker.record_failures(failures)
+    METRICS.count("tweets_refreshed", refreshed)
+    seconds = time.perf_counter() - start
+    print(f"Refreshed {refreshed}/{len(due)} tweets in {seconds:.1f} s ({gone} gone, {failed} failed).")
+    if adaptive_rate:
+        print_page_rates(rate_limiter)
+    return refreshed, gone, failed
 
-        except Exception as e:
-            print(f"Error saving CSV for #{hashtag}: {e}")
-            
-    # Removed the code for saving the combined CSV file.
-    
-    return total_saved
+def print_engagement_summary(tracker, top=5):
+    tracked, observations, movers = tracker.summary(top)
+    print(f"\n📈 {tracker.path}: {tracked} tracked tweets, {observations} observations.")
+    if movers:
+        print("Fastest-moving tweets (interactions/hour):")
+        for link, likes, retweets, replies, velocity in movers:
+            print(f"  {velocity:10.1f}  {link}  (Likes: {likes}, Retweets: {retweets}, Replies: {replies})")
 
 
-def print_sample_tweets(tweets, n=5):
+def print_sample_tweets(tweets, n=5, totals=None):
     """
-    Displays sample tweets in the console
+    Displays sample tweets in the console.
+    `totals` optionally gives the full tweet count per hashtag when only samples were kept.
     """
     if not isinstance(tweets, dict):
         print("Invalid data format for display.")
@@ -599,7 +4516,8 @@ def print_sample_tweets(tweets, n=5):
             print(f"\n=== #{hashtag}: No tweets to display ===")
             continue
             
-        print(f"\n=== #{hashtag}: SAMPLE TWEETS ({min(n, len(tweet_list))}/{len(tweet_list)}) ===")
+        total = totals.get(hashtag, len(tweet_list)) if totals else len(tweet_list)
+        print(f"\n=== #{hashtag}: SAMPLE TWEETS ({min(n, len(tweet_list))}/{total}) ===")
         
         for i, tweet in enumerate(tweet_list[:n]):
             print(f"\n--- Tweet {i+1} ---")
@@ -611,39 +4529,246 @@ def print_sample_tweets(tweets, n=5):
             print(f"Interactions: {tweet['interactions']} (Replies: {tweet['replies']}, Retweets: {tweet['retweets']}, Likes: {tweet['likes']})")
             print(f"Link: {tweet['link']}")
 
+def print_stored_tweets(rows, seconds=None):
+    """
+    Displays the results of query_tweet_store in the console.
+    """
+    for row in rows:
+        hashtags = " ".join(f"#{hashtag}" for hashtag in row['hashtags'])
+        print(f"\n--- {row['posted_at'] or 'Unknown date'} @{row['username']} {hashtags} ---")
+        print(row['text'])
+        print(f"Interactions: {row['total_interactions']} (Replies: {row['replies']}, "
+              f"Retweets: {row['retweets']}, Likes: {row['likes']})")
+        print(f"Link: {row['link']}")
+    timing = f" in {seconds * 1000:.1f} ms" if seconds is not None else ""
+    print(f"\n{len(rows)} tweet(s) found{timing}")
+
 
 # === Main function ===
 def main():
     args = parse_arguments()
     print("⭐ === NITTER SCRAPER - ML/NLP VERSION (v2.1) ===")
     
+    if args.compact_archive:
+        paths = sorted(glob.glob(args.archive_glob))
+        if not paths:
+            print(f"❌ No files match {args.archive_glob}")
+            sys.exit(1)
+        compact_archive(paths, args.compact_archive)
+        return
+    
+    if args.query_store:
+        start = time.perf_counter()
+        try:
+            rows = query_tweet_store(args.query_store, args.match, args.user, args.tag, args.since, args.until,
+                                     args.limit)
+        except (FileNotFoundError, ValueError) as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+        print_stored_tweets(rows, time.perf_counter() - start)
+        return
+    
+    if args.index_archive:
+        paths = sorted(glob.glob(args.archive_glob))
+        if not paths:
+            print(f"❌ No files match {args.archive_glob}")
+            sys.exit(1)
+        index_archive(paths, args.index_archive)
+        return
+    
+    if args.reprocess:
+        paths = sorted(glob.glob(args.archive_glob))
+        if not paths:
+            print(f"❌ No files match {args.archive_glob}")
+            sys.exit(1)
+        try:
+            reprocess_archive(paths, args.reprocess, args.reprocess_workers)
+        except ValueError as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+        return
+    
+    job_queue = None
+    if args.enqueue or args.worker or args.queue_status:
+        job_queue = JobQueue(args.queue or os.path.join(args.state_dir, "jobs.sqlite"))
+    if args.enqueue or args.queue_status:
+        try:
+            if args.enqueue:
+                added = enqueue_jobs(job_queue, args.hashtags, args.max_tweets, args.since, args.until,
+                                     args.shard_days)
+                print(f"Added {added} job(s) to the queue.")
+            print_queue_status(job_queue)
+        finally:
+            job_queue.close()
+        return
+    
+    page_cache = None
+    if args.page_cache or args.replay:
+        page_cache = PageCache(os.path.join(args.state_dir, "page_cache.sqlite"), ttl=args.cache_ttl * 3600,
+                               max_bytes=args.cache_size * 1024 * 1024, replay=args.replay,
+                               workers=args.replay_workers)
+        set_page_cache(page_cache)
+    
+    if args.replay:
+        # Only the instances of the cached pages, which are never probed
+        candidates = parse_instance_list(args.instances) if args.instances else page_cache.instances()
+        if not candidates:
+            print(f"❌ The page cache {page_cache.path} is empty, nothing to replay.")
+            sys.exit(1)
+        registry = InstanceRegistry(candidates=candidates)
+    elif args.instances:
+        # A fixed (usually local) instance list gets a throwaway registry, so it never mixes with the cache
+        registry = InstanceRegistry(candidates=parse_instance_list(args.instances))
+    else:
+        registry = InstanceRegistry(os.path.join(args.state_dir, "instances.json"), ttl=args.instance_ttl * 3600)
+    
+    if args.refresh_engagement:
+        tracker = EngagementTracker(args.refresh_engagement)
+        try:
+            if tracker.is_tweet_store():
+                print(f"Tracking the tweets of the tweet store {args.refresh_engagement}...")
+                tracker.track_store()
+            else:
+                paths = sorted(glob.glob(args.archive_glob))
+                if not paths:
+                    print(f"❌ No files match {args.archive_glob}")
+                    sys.exit(1)
+                print(f"Tracking the tweets of {len(paths)} CSV file(s)...")
+                tracker.track_archive(paths)
+            registry.refresh(force=args.refresh_instances)
+            refresh_engagement(tracker, registry, budget=args.refresh_budget, workers=args.refresh_workers,
+                               page_delay=args.page_delay, adaptive_rate=not args.fixed_delays)
+            print_engagement_summary(tracker)
+        except KeyboardInterrupt:
+            print("\nInterrupted by user (Ctrl+C).")
+            sys.exit(1)
+        finally:
+            tracker.close()
+            registry.save()
+        return
+    
+    seen_index = None
+    if args.incremental or args.only_new:
+        seen_index = SeenTweetIndex(os.path.join(args.state_dir, "seen.sqlite"))
+    hashtags = args.hashtags
+    max_tweets = args.max_tweets
+    checkpoint = None
+    worker_id = f"{socket.gethostname()}-{os.getpid()}"
+    if args.worker:
+        # Every worker writes its own files; the job queue takes the place of the checkpoint
+        writer = make_output_writer(args.output_format, output_dir=args.output_dir,
+                                    prefix=f"{args.filename_prefix}_{worker_id}", only_new=args.only_new)
+    elif args.resume:
+        checkpoint_path = args.resume
+        if checkpoint_path == 'latest':
+            checkpoint_path = RunCheckpoint.find_latest(args.state_dir)
+        if not checkpoint_path or not os.path.exists(checkpoint_path):
+            print(f"❌ No checkpoint to resume in {os.path.join(args.state_dir, 'checkpoints')}")
+            sys.exit(1)
+        print(f"Resuming run from checkpoint: {checkpoint_path}")
+        checkpoint = RunCheckpoint.load(checkpoint_path)
+        checkpoint.verify()
+        hashtags = checkpoint.pending()
+        max_tweets = checkpoint.data["max_tweets"]
+        writer = checkpoint.open_writer(only_new=args.only_new)
+    else:
+        writer = make_output_writer(args.output_format, output_dir=args.output_dir,
+                                    prefix=args.filename_prefix, only_new=args.only_new)
+        checkpoint = RunCheckpoint.create(args.state_dir, writer, hashtags, max_tweets)
+    
+    metrics_dir = os.path.join(args.state_dir, "metrics")
+    metrics_file = args.metrics_file or (os.path.join(metrics_dir, "metrics.prom") if args.profile else None)
+    if args.profile:
+        METRICS.open_event_log(os.path.join(metrics_dir, "events.jsonl"))
+        METRICS.event("run_start", hashtags=hashtags, max_tweets=max_tweets, engine=args.engine,
+                      concurrency=args.concurrency, checkpoint=checkpoint.path if checkpoint else None,
+                      worker=worker_id if args.worker else None)
+    
     try:
+        registry.refresh(force=args.refresh_instances, probe=not args.replay)
+        if args.worker:
+            completed = run_queue_worker(
+                job_queue,
+                worker_id,
+                writer,
+                lease_seconds=args.lease_seconds,
+                page_delay=args.page_delay,
+                engine=args.engine,
+                browser_pool_size=args.browser_pool_size,
+                driver_max_pages=args.driver_max_pages,
+                concurrency=args.concurrency,
+                registry=registry,
+                seen_index=seen_index,
+                lean_browser=args.lean_browser,
+                hydrate_workers=args.hydration_workers,
+                adaptive_rate=not args.fixed_delays
+            )
+            writer.close()
+            print(f"\n✅ Worker {worker_id} completed {completed} job(s). Total {writer.total_rows} tweets saved.")
+            print_queue_status(job_queue)
+            return
         results = scrape_multiple_hashtags(
-            hashtags=args.hashtags,
-            max_tweets=args.max_tweets,
+            hashtags=hashtags,
+            max_tweets=max_tweets,
             delay=args.delay,
-            page_delay=args.page_delay
+            page_delay=args.page_delay,
+            engine=args.engine,
+            browser_pool_size=args.browser_pool_size,
+            driver_max_pages=args.driver_max_pages,
+            concurrency=args.concurrency,
+            registry=registry,
+            seen_index=seen_index,
+            writer=writer,
+            sample_size=args.show_samples,
+            checkpoint=checkpoint,
+            lean_browser=args.lean_browser,
+            hydrate_workers=args.hydration_workers,
+            since=args.since,
+            until=args.until,
+            shard_days=args.shard_days,
+            batch_size=args.batch_hashtags,
+            adaptive_rate=not args.fixed_delays
         )
-        total_tweets = sum(len(v) for v in results.values())
+        writer.close()
+        if checkpoint.pending():
+            print(f"\nSome hashtags are incomplete. Continue with: --resume {checkpoint.path}")
+        else:
+            checkpoint.remove()
         
-        if total_tweets > 0:
-            print_sample_tweets(results, n=args.show_samples)
-            # Pass the new 'prefix' argument to the save function
-            save_to_separate_csvs(results, 
-                                  output_dir=args.output_dir, 
-                                  prefix=args.filename_prefix)
-            print(f"\n✅ Finished successfully. Total {total_tweets} tweets fetched.")
+        if any(results.values()):
+            print_sample_tweets(results, n=args.show_samples, totals=writer.row_counts)
+            print(f"\n✅ Finished successfully. Total {writer.total_rows} tweets saved.")
         else:
             print("\n❌ No tweets fetched. Check Nitter instances and network connection.")
             
     except KeyboardInterrupt:
+        # The scraping threads were already stopped and joined (see stop_workers)
+        STOP_EVENT.set()
         print("\nInterrupted by user (Ctrl+C).")
+        if checkpoint is not None:
+            print(f"Continue with: --resume {checkpoint.path}")
         sys.exit(1)
     except Exception as e:
         print(f"\n❌ Critical error: {type(e).__name__} - {e}")
         import traceback
         traceback.print_exc()
         sys.exit(1)
+    finally:
+        writer.close()
+        registry.save()
+        if seen_index is not None:
+            seen_index.close()
+        if job_queue is not None:
+            job_queue.close()
+        if page_cache is not None:
+            page_cache.close()
+        METRICS.event("run_end", rows=writer.total_rows)
+        METRICS.close()
+        if args.profile:
+            METRICS.print_summary()
+        if metrics_file:
+            METRICS.write_prometheus(metrics_file)
+            print(f"Metrics snapshot saved to {metrics_file}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,69 @@
+"""
+Shared fixtures: the scraper module and local fake Nitter instances
+(benchmarks/fake_nitter_server.py) on free ports.
+"""
+import argparse
+import socket
+import sys
+from pathlib import Path
+
+import pytest
+
+BENCHMARKS_DIR = Path(__file__).resolve().parent.parent / "benchmarks"
+sys.path.insert(0, str(BENCHMARKS_DIR))
+
+from common import load_scraper  # noqa: E402
+import fake_nitter_server  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def scraper():
+    # Registered by name so functions sent to process pools (replay parsing) can be pickled
+    module = load_scraper()
+    sys.modules[module.__name__] = module
+    return module
+
+
+@pytest.fixture(autouse=True)
+def reset_stop_event(scraper):
+    """
+    STOP_EVENT is module-global; a test that interrupts a run must not stop the next one.
+    """
+    scraper.STOP_EVENT.clear()
+    yield
+    scraper.STOP_EVENT.clear()
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def fake_nitter():
+    """
+    Starts fake instances: fake_nitter(instances=2, pages=10, minutes_per_tweet=3.0, **faults)
+    returns their URLs. All of them serve the same timelines; they are shut down after the test.
+    """
+    servers = []
+
+    def start(instances=2, pages=10, per_page=20, minutes_per_tweet=3.0, **faults):
+        timelines = fake_nitter_server.Timelines(pages=pages, per_page=per_page,
+                                                 minutes_per_tweet=minutes_per_tweet)
+        urls = []
+        for _ in range(instances):
+            options = dict(host="127.0.0.1", port=free_port(), instances=1, dead=0, latency=0.0, jitter=0.0,
+                           rate_429=0.0, rate_503=0.0, truncate_rate=0.0, dead_mode="refuse", hang_seconds=30.0,
+                           seed=0)
+            options.update(faults)
+            for url, _, server in fake_nitter_server.start_instances(argparse.Namespace(**options), timelines):
+                urls.append(url)
+                servers.append(server)
+        return urls
+
+    yield start
+    for server in servers:
+        if server is not None:
+            server.shutdown()
+            server.server_close()
@@ -0,0 +1,21 @@
+"""
+Batched OR queries: every hashtag of a batch gets its own quota, however the
+fetched tweets are spread over the hashtags.
+"""
+
+
+def test_smaller_quota_does_not_end_paging_early(scraper, fake_nitter):
+    # About three in four tweets carry each hashtag; 200 tweets are available
+    url, = fake_nitter(instances=1, pages=10)
+    registry = scraper.InstanceRegistry(candidates=[url])
+    registry.refresh()
+    limits = {"polityka": 5, "sejm": 100}
+
+    pages = list(scraper.iter_batch_pages(["polityka", "sejm"], limits, 0.01, "http", registry=registry,
+                                          hydrate_workers=0))
+
+    totals = {hashtag: sum(len(page[hashtag]) for page in pages) for hashtag in limits}
+    assert totals == limits
+    assert pages[-1]["sejm"].next_url is None
+    links = [tweet['link'] for page in pages for tweet in page["sejm"]]
+    assert len(set(links)) == 100
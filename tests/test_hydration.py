@@ -0,0 +1,69 @@
+"""
+Hydration of truncated ("Show more") tweets from their /status/ pages.
+"""
+import sqlite3
+
+import pytest
+
+
+@pytest.fixture
+def page_cache(scraper):
+    """
+    Puts a PageCache at `path` under all fetches, closing the previous one first.
+    """
+    caches = []
+
+    def open_cache(path, replay=False):
+        while caches:
+            caches.pop().close()
+        cache = scraper.PageCache(str(path), replay=replay, workers=1)
+        caches.append(cache)
+        scraper.set_page_cache(cache)
+
+    yield open_cache
+    scraper.set_page_cache(None)
+    while caches:
+        caches.pop().close()
+
+
+def scrape(scraper, url, hydrate_workers=2, replay=False):
+    registry = scraper.InstanceRegistry(candidates=[url])
+    registry.refresh(probe=not replay)
+    pages = scraper.iter_tweet_pages("polityka", 40, 0.01, "http", registry=registry,
+                                     hydrate_workers=hydrate_workers)
+    return [tweet for page in pages for tweet in page]
+
+
+def test_rate_limited_status_page_reaches_the_limiter(scraper, fake_nitter):
+    url, = fake_nitter(instances=1, rate_429=1.0)
+    registry = scraper.InstanceRegistry(candidates=[url])
+    limiter = scraper.InstanceRateLimiter(1.0, registry=registry, adaptive=True)
+    tweets = [{'link': f'{url}/a/status/123#m', 'content': 'short…', 'truncated': True}]
+
+    assert scraper.hydrate_truncated_tweets(tweets, rate_limiter=limiter, registry=registry) == 0
+    assert limiter.rates()[url] == pytest.approx(0.5)
+    stats = registry.instances[url]
+    assert stats["failures"] == 1
+    assert stats["cooldown_until"] > 0
+
+
+def test_replay_without_a_cached_status_page_keeps_the_short_text(scraper, fake_nitter, page_cache, tmp_path):
+    url, = fake_nitter(instances=1, pages=2, truncate_rate=1.0)
+    path = tmp_path / "page_cache.sqlite"
+    page_cache(path)
+    recorded = scrape(scraper, url)
+    hydrated = [tweet for tweet in recorded if tweet['link'] and '/status/' in tweet['link']
+                and len(tweet['content']) > 80]
+    assert hydrated
+
+    missing = hydrated[0]['link']
+    with sqlite3.connect(str(path)) as conn:
+        conn.execute("DELETE FROM pages WHERE key = ?", (scraper.PageCache._key(missing.split('#', 1)[0]),))
+    conn.close()
+
+    page_cache(path, replay=True)
+    replayed = scrape(scraper, url, replay=True)
+
+    assert [tweet['link'] for tweet in replayed] == [tweet['link'] for tweet in recorded]
+    truncated = [tweet['link'] for tweet in replayed if tweet.get('truncated')]
+    assert truncated == [missing]
@@ -0,0 +1,38 @@
+"""
+InstanceRateLimiter: buckets start inside the adaptive controller's range, so a
+success never lowers the rate; without adaptation the page delay sets the rate.
+"""
+import pytest
+
+
+def test_fast_page_delay_is_clamped(scraper):
+    limiter = scraper.InstanceRateLimiter(0.05, adaptive=True)
+    limiter.wait("nitter.net")
+    assert limiter.rates()["nitter.net"] == limiter.MAX_RATE
+
+    for _ in range(limiter.INCREASE_AFTER * 3):
+        before = limiter.rates()["nitter.net"]
+        limiter.record_success("nitter.net")
+        assert limiter.rates()["nitter.net"] >= before
+
+
+def test_learned_rates_are_clamped(scraper):
+    registry = scraper.InstanceRegistry(candidates=["fast.example", "slow.example"])
+    registry.record_page_rate("fast.example", 50.0)
+    registry.record_page_rate("slow.example", 0.001)
+    limiter = scraper.InstanceRateLimiter(3.0, registry=registry, adaptive=True)
+
+    limiter.claim(["fast.example"])
+    limiter.claim(["slow.example"])
+    limiter.record_success("fast.example")
+    limiter.record_success("slow.example")
+    rates = limiter.rates()
+    assert rates["fast.example"] == limiter.MAX_RATE
+    assert rates["slow.example"] == limiter.MIN_RATE
+
+
+def test_fixed_rate_keeps_the_page_delay(scraper):
+    limiter = scraper.InstanceRateLimiter(0.05)
+    limiter.wait("nitter.net")
+    assert limiter.rates()["nitter.net"] == pytest.approx(20.0)
+
@@ -0,0 +1,37 @@
+"""
+--reprocess: normalized copies of CSV snapshots, one per input file.
+"""
+import csv
+
+
+def write_csv(path, rows):
+    with open(path, 'w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def read_rows(path):
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        return list(csv.DictReader(f))
+
+
+def test_file_without_a_hashtag_anywhere_keeps_an_empty_hashtag(scraper, tmp_path, capsys):
+    archive = tmp_path / "archive"
+    archive.mkdir()
+    named = archive / "tweets_polityka_20250101_1200.csv"
+    unnamed = archive / "export.csv"
+    row = {'username': 'a', 'text': 'Sejm  obraduje', 'likes': '1', 'post_date_iso': '2025-01-01 10:00:00',
+           'link': 'https://nitter.net/a/status/1#m'}
+    write_csv(named, [row])
+    write_csv(unnamed, [row])
+
+    written = scraper.reprocess_archive([str(named), str(unnamed)], str(tmp_path / "out"), workers=1)
+
+    assert written == 2
+    assert "export.csv has no hashtag column" in capsys.readouterr().out
+    named_row, = read_rows(tmp_path / "out" / named.name)
+    unnamed_row, = read_rows(tmp_path / "out" / unnamed.name)
+    assert named_row['hashtag'] == "#polityka"
+    assert unnamed_row['hashtag'] == ""
+    assert unnamed_row['text'] == named_row['text']
@@ -0,0 +1,117 @@
+"""
+Ctrl+C and --resume: an interrupted run must leave files and checkpoint consistent,
+and resuming it must end with every tweet exactly once.
+"""
+import csv
+import glob
+import os
+import signal
+import sys
+
+import pytest
+
+
+def read_rows(path):
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        return list(csv.DictReader(f))
+
+
+def run_main(scraper, monkeypatch, argv):
+    monkeypatch.setattr(sys, "argv", ["nitter-scraper.py"] + argv)
+    scraper.main()
+
+
+@pytest.mark.parametrize("concurrency", [1, 2])
+def test_resume_after_interrupt(scraper, fake_nitter, monkeypatch, tmp_path, concurrency):
+    urls = fake_nitter(instances=2, pages=10)
+    output_dir, state_dir = tmp_path / "data", tmp_path / "state"
+    options = ["--engine", "http", "--instances", ",".join(urls), "--max-tweets", "100", "--page-delay", "0.01",
+               "--hydration-workers", "0", "--output-dir", str(output_dir), "--state-dir", str(state_dir)]
+
+    # Ctrl+C arrives after the third page has been checkpointed
+    record_page = scraper.RunCheckpoint.record_page
+    recorded = []
+
+    def interrupting_record_page(self, hashtag, page, writer):
+        record_page(self, hashtag, page, writer)
+        recorded.append(hashtag)
+        if len(recorded) == 3:
+            os.kill(os.getpid(), signal.SIGINT)
+
+    monkeypatch.setattr(scraper.RunCheckpoint, "record_page", interrupting_record_page)
+    with pytest.raises(SystemExit):
+        run_main(scraper, monkeypatch, ["polityka", "sejm", "--concurrency", str(concurrency)] + options)
+
+    checkpoint = scraper.RunCheckpoint.load(scraper.RunCheckpoint.find_latest(str(state_dir)))
+    assert checkpoint.pending()
+    for state in checkpoint.data["hashtags"].values():
+        if state["output_path"]:
+            # The file holds at least the checkpointed rows, and no hashtag is marked done early
+            assert len(read_rows(state["output_path"])) >= state["row_count"]
+            assert not state["done"] or state["row_count"] == 100
+
+    monkeypatch.setattr(scraper.RunCheckpoint, "record_page", record_page)
+    run_main(scraper, monkeypatch, ["--resume", "latest"] + options)
+
+    assert scraper.RunCheckpoint.find_latest(str(state_dir)) is None
+    paths = sorted(glob.glob(str(output_dir / "*.csv")))
+    assert len(paths) == 2
+    for path in paths:
+        rows = read_rows(path)
+        assert len(rows) == 100
+        assert len({row["link"] for row in rows}) == 100
+
+
+def test_final_page_after_interrupt_is_not_scraped_again(scraper, fake_nitter, monkeypatch, tmp_path):
+    urls = fake_nitter(instances=1, pages=2)
+    output_dir, state_dir = tmp_path / "data", tmp_path / "state"
+    options = ["--engine", "http", "--instances", ",".join(urls), "--max-tweets", "100", "--page-delay", "0.01",
+               "--hydration-workers", "0", "--output-dir", str(output_dir), "--state-dir", str(state_dir)]
+
+    # Ctrl+C lands while the last page (no next page) is being written
+    record_page = scraper.RunCheckpoint.record_page
+
+    def interrupting_record_page(self, hashtag, page, writer):
+        if page.next_url is None:
+            scraper.STOP_EVENT.set()
+        record_page(self, hashtag, page, writer)
+        if page.next_url is None:
+            os.kill(os.getpid(), signal.SIGINT)
+
+    monkeypatch.setattr(scraper.RunCheckpoint, "record_page", interrupting_record_page)
+    with pytest.raises(SystemExit):
+        run_main(scraper, monkeypatch, ["polityka"] + options)
+    checkpoint = scraper.RunCheckpoint.load(scraper.RunCheckpoint.find_latest(str(state_dir)))
+    assert checkpoint.pending() == []
+
+    monkeypatch.setattr(scraper.RunCheckpoint, "record_page", record_page)
+    run_main(scraper, monkeypatch, ["--resume", checkpoint.path] + options)
+
+    path, = glob.glob(str(output_dir / "*.csv"))
+    rows = read_rows(path)
+    assert len(rows) == 40
+    assert len({row["link"] for row in rows}) == 40
+
+
+def test_verify_rescrapes_a_damaged_output_file(scraper, tmp_path, capsys):
+    writer = scraper.CSVStreamWriter(str(tmp_path / "data"), "tweets")
+    checkpoint = scraper.RunCheckpoint.create(str(tmp_path / "state"), writer, ["polityka"], 20)
+    tweets = [{'username': 'a', 'date': '2025-01-01 10:00:00', 'content': f'tweet {i}',
+               'link': f'https://nitter.net/a/status/{i + 1}#m'} for i in range(20)]
+    writer.write_page("polityka", tweets)
+    checkpoint.record_page("polityka", scraper.TweetPage(tweets, "https://nitter.net/search", None), writer)
+    writer.close()
+    assert checkpoint.pending() == []
+
+    path = writer.paths["polityka"]
+    with open(path, 'r+', encoding='utf-8-sig') as f:
+        lines = f.readlines()
+        f.seek(0)
+        f.truncate()
+        f.writelines(lines[:1] + lines[11:])
+    assert not scraper.CSVStreamWriter.output_intact(path, os.path.getsize(path), 20)
+
+    checkpoint = scraper.RunCheckpoint.load(checkpoint.path)
+    assert checkpoint.verify() == ["polityka"]
+    assert checkpoint.pending() == ["polityka"]
+    assert checkpoint.data["hashtags"]["polityka"]["row_count"] == 0
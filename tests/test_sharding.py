@@ -0,0 +1,51 @@
+"""
+Time-window sharding: the merged result must be the newest max_tweets tweets of the
+range, without days missing in between.
+"""
+import collections
+from datetime import date, timedelta
+
+
+def test_sharded_merge_is_contiguous(scraper, fake_nitter):
+    # 24 tweets per day over 40 days, more than max_tweets fits in
+    urls = fake_nitter(instances=3, pages=60, minutes_per_tweet=60)
+    registry = scraper.InstanceRegistry(candidates=urls)
+    registry.refresh()
+    rate_limiter = scraper.make_rate_limiter(0.01, concurrency=3, registry=registry)
+    until = date.today() + timedelta(days=1)
+    since = date.today() - timedelta(days=40)
+
+    page = scraper.scrape_sharded("polityka", since, until, shard_days=7, max_tweets=400, engine="http",
+                                  rate_limiter=rate_limiter, registry=registry, concurrency=3,
+                                  hydrate_workers=0)
+
+    assert len(page) == 400
+    assert len({tweet['status_id'] for tweet in page}) == 400
+    status_ids = [tweet['status_id'] for tweet in page]
+    assert status_ids == sorted(status_ids, reverse=True)
+
+    per_day = collections.Counter(tweet['posted_at'].date() for tweet in page)
+    days = sorted(per_day)
+    assert days == [days[0] + timedelta(days=i) for i in range(len(days))]
+    # Every day between the newest and the oldest one is complete
+    assert all(per_day[day] == 24 for day in days[1:-1])
+
+
+def test_planner_frontier_waits_for_queued_rests(scraper):
+    since, until = date(2025, 1, 1), date(2025, 1, 15)
+    planner = scraper.ShardPlanner(since, until, initial_days=7, target=100)
+    newer = planner.next_window()
+    older = planner.next_window()
+    assert newer == (date(2025, 1, 8), until)
+
+    # The newer window filled up at Jan 11, so Jan 8-11 is queued again
+    planner.report(newer, 100, oldest=date(2025, 1, 11), full=True)
+    planner.report(older, 50)
+    assert planner.frontier() == date(2025, 1, 12)
+
+    rest = planner.next_window()
+    assert rest[1] == date(2025, 1, 12)
+    planner.report(rest, 10)
+    while planner.frontier() > date(2025, 1, 8):
+        planner.report(planner.next_window(), 10)
+    assert planner.frontier() == since
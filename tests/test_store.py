@@ -0,0 +1,47 @@
+"""
+--query-store: user input must never reach FTS5 as syntax it cannot parse, and
+querying must never create a store.
+"""
+import pytest
+
+
+@pytest.fixture
+def store(scraper, tmp_path):
+    path = str(tmp_path / "tweets.sqlite")
+    conn = scraper.open_tweet_store(path)
+    scraper.upsert_tweet_rows(conn, [
+        {'link': 'https://nitter.net/a/status/101#m', 'username': 'a', 'hashtag': '#sejm',
+         'text': 'Kosiniak-Kamysz w Sejmie', 'post_date_iso': '2025-06-01 10:00:00'},
+        {'link': 'https://nitter.net/b/status/102#m', 'username': 'b', 'hashtag': '#sejm',
+         'text': 'Kosiniak odpowiada opozycji', 'post_date_iso': '2025-06-02 10:00:00'},
+    ])
+    conn.close()
+    return path
+
+
+@pytest.mark.parametrize("match, expected", [
+    ("Kosiniak-Kamysz", '"Kosiniak-Kamysz"'),
+    ("Kosiniak-Kam*", '"Kosiniak-Kam"*'),
+    ("text:sejm", '"text:sejm"'),
+    ('sejm AND ("drugiej turze" OR opozycj*)', 'sejm AND ("drugiej turze" OR opozycj*)'),
+    ('a"b', '"a""b"'),
+])
+def test_fts_query(scraper, match, expected):
+    assert scraper.fts_query(match) == expected
+
+
+def test_hyphenated_match(scraper, store):
+    assert [row['status_id'] for row in scraper.query_tweet_store(store, "Kosiniak-Kamysz")] == [101]
+    assert [row['status_id'] for row in scraper.query_tweet_store(store, "kosiniak")] == [102, 101]
+
+
+def test_unparsable_match_is_a_value_error(scraper, store):
+    with pytest.raises(ValueError):
+        scraper.query_tweet_store(store, "sejm AND")
+
+
+def test_missing_store_is_not_created(scraper, tmp_path):
+    path = tmp_path / "missing_dir" / "nope.sqlite"
+    with pytest.raises(FileNotFoundError):
+        scraper.query_tweet_store(str(path), "sejm")
+    assert not path.parent.exists()
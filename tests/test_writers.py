@@ -0,0 +1,78 @@
+"""
+Stream writers: pages reach the files as transformed columns, and closing a writer
+while worker threads still write must never truncate or reopen its files.
+"""
+import csv
+import threading
+
+import pytest
+
+
+def make_tweets(start, count):
+    return [{'username': 'a', 'date': '2025-01-01 10:00:00', 'content': f'tweet {i}',
+             'link': f'https://nitter.net/a/status/{i}#m'} for i in range(start, start + count)]
+
+
+def read_rows(path):
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        return list(csv.DictReader(f))
+
+
+def test_write_after_close_raises_and_keeps_the_file(scraper, tmp_path):
+    writer = scraper.CSVStreamWriter(str(tmp_path), "tweets")
+    writer.write_page("polityka", make_tweets(1, 20))
+    writer.close()
+
+    with pytest.raises(ValueError):
+        writer.write_page("polityka", make_tweets(21, 20))
+    assert len(read_rows(writer.paths["polityka"])) == 20
+
+
+def test_close_while_workers_write(scraper, tmp_path):
+    writer = scraper.CSVStreamWriter(str(tmp_path), "tweets")
+    hashtags = ["polityka", "sejm", "wybory"]
+    pages_written = threading.Semaphore(0)
+    refused = []
+
+    def work(hashtag):
+        page = 0
+        while True:
+            try:
+                writer.write_page(hashtag, make_tweets(page * 20 + 1, 20))
+            except ValueError:
+                refused.append(hashtag)
+                return
+            page += 1
+            pages_written.release()
+
+    threads = [threading.Thread(target=work, args=(hashtag,)) for hashtag in hashtags]
+    for thread in threads:
+        thread.start()
+    for _ in range(10):
+        pages_written.acquire()
+    writer.close()
+    for thread in threads:
+        thread.join(timeout=10)
+
+    assert sorted(refused) == sorted(hashtags)
+    assert writer.paths
+    for hashtag in writer.paths:
+        rows = read_rows(writer.paths[hashtag])
+        assert len(rows) == writer.row_counts[hashtag]
+        assert [row["text"] for row in rows] == [f"tweet {i}" for i in range(1, len(rows) + 1)]
+
+
+def test_page_columns_match_the_buffer_transform(scraper, tmp_path):
+    tweets = make_tweets(1, 5)
+    tweets[1]['date'] = "Jan 2, 2025 · 8:30 AM UTC"
+    tweets[2]['posted_at'] = scraper.datetime(2025, 1, 2, 8, 30)
+    tweets[3]['date'] = "not a date"
+    tweets[4]['likes'] = "7"
+    assert scraper.tweet_columns({"polityka": tweets}, 5) == \
+        scraper.TweetBuffer.from_tweets({"polityka": tweets}).to_columns(5)
+
+    writer = scraper.CSVStreamWriter(str(tmp_path), "tweets")
+    writer.write_page("polityka", tweets)
+    writer.close()
+    expected = scraper.transform_tweets_for_csv({"polityka": tweets})
+    assert read_rows(writer.paths["polityka"]) == [{key: str(value) for key, value in row.items()} for row in expected]